@@ -13,14 +13,16 @@ from app.db.base import Base
 from app.core.settings import settings
 
 
-DATABASE_URL: str = settings.DATABASE_URL
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL is not set in .env")
-
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# Callers may migrate another database (the tests' template) by passing
+# Config.attributes["database_url"]
+DATABASE_URL: str = config.attributes.get("database_url") or settings.DATABASE_URL
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL is not set in .env")
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 #if config.config_file_name is not None:
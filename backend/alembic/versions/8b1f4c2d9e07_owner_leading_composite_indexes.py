@@ -0,0 +1,81 @@
+"""owner-leading composite indexes for tasks and projects
+
+Revision ID: 8b1f4c2d9e07
+Revises: 270f63522dac
+Create Date: 2026-10-17 10:12:31.508214
+
+Every query filters by owner_id first, then by project, status or deadline
+and orders by id/deadline/updated_at. The single-column indexes made Postgres
+bitmap-AND low-selectivity indexes or fall back to a scan. They are replaced
+by composite indexes matching those shapes plus a partial index over open
+tasks. ix_tasks_id duplicated the primary key. ix_tasks_project_id stays for
+the ON DELETE CASCADE lookup.
+
+Indexes are built CONCURRENTLY so the upgrade doesn't block writes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1f4c2d9e07'
+down_revision: Union[str, Sequence[str], None] = '270f63522dac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_INDEXES = [
+    ('ix_projects_owner_id_id', 'projects', ['owner_id', 'id'], None),
+    ('ix_tasks_owner_id_id', 'tasks', ['owner_id', 'id'], None),
+    ('ix_tasks_owner_id_project_id_id', 'tasks', ['owner_id', 'project_id', 'id'], None),
+    ('ix_tasks_owner_id_status_deadline', 'tasks', ['owner_id', 'status', 'deadline'], None),
+    ('ix_tasks_owner_id_deadline_id', 'tasks', ['owner_id', 'deadline', 'id'], None),
+    ('ix_tasks_owner_id_updated_at_id', 'tasks', ['owner_id', 'updated_at', 'id'], None),
+    ('ix_tasks_open_owner_id_deadline', 'tasks', ['owner_id', 'deadline'], "status <> 'done'"),
+]
+
+# Made redundant by the indexes above (leading-column prefixes, the primary
+# key, or too unselective to be used on their own)
+OLD_INDEXES = [
+    ('ix_projects_owner_id', 'projects', ['owner_id']),
+    ('ix_tasks_id', 'tasks', ['id']),
+    ('ix_tasks_owner_id', 'tasks', ['owner_id']),
+    ('ix_tasks_status', 'tasks', ['status']),
+    ('ix_tasks_priority', 'tasks', ['priority']),
+    ('ix_tasks_deadline', 'tasks', ['deadline']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in NEW_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+        for name, table, _ in OLD_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in OLD_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, _, _ in NEW_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,99 @@
+"""search vectors and trigram indexes for /search
+
+Revision ID: d2e8b5c71a90
+Revises: c4d7a9e15b32
+Create Date: 2026-10-17 17:05:48.730115
+
+Adds generated tsvector columns with GIN indexes: task titles, and project
+names weighted above descriptions. Adding a STORED generated column
+rewrites the table, so run this in a quiet window on large databases.
+
+Where the pg_trgm extension is available it is installed, and trigram GIN
+indexes on tasks.title and projects.name back typo-tolerant matching.
+Elsewhere they are skipped and /search falls back to full-text prefix
+matching (app.api.v1.search checks at runtime). They are not declared on
+the models for that reason.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e8b5c71a90'
+down_revision: Union[str, Sequence[str], None] = 'c4d7a9e15b32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTORS = [
+    ('tasks', "to_tsvector('english', title)"),
+    ('projects', "setweight(to_tsvector('english', name), 'A')"
+                 " || setweight(to_tsvector('english', coalesce(description, '')), 'B')"),
+]
+TRIGRAM_INDEXES = [
+    ('ix_tasks_title_trgm', 'tasks', 'title'),
+    ('ix_projects_name_trgm', 'projects', 'name'),
+]
+
+
+def pg_trgm_available() -> bool:
+    return bool(op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, expression in SEARCH_VECTORS:
+        op.add_column(table, sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(expression, persisted=True),
+        ))
+    trigrams = pg_trgm_available()
+    if trigrams:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        for table, _ in SEARCH_VECTORS:
+            op.create_index(
+                f'ix_{table}_search_vector',
+                table,
+                ['search_vector'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        if trigrams:
+            for name, table, column in TRIGRAM_INDEXES:
+                op.create_index(
+                    name,
+                    table,
+                    [column],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension stays: other objects may have come to depend on it
+    with op.get_context().autocommit_block():
+        for name, table, _ in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        for table, _ in SEARCH_VECTORS:
+            op.drop_index(
+                f'ix_{table}_search_vector',
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    for table, _ in SEARCH_VECTORS:
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,149 @@
+"""per-project task counters kept by triggers on tasks
+
+Revision ID: e7a3c1f9b524
+Revises: d2e8b5c71a90
+Create Date: 2026-10-17 19:12:04.551306
+
+projects gets one counter column per task bucket. Statement-level AFTER
+triggers on tasks fold each statement's changed rows into per-project
+deltas, so every write path stays correct: single writes, batches, COPY
+imports and the ON DELETE CASCADE from a project. Updates that leave
+project, status and deadline alone don't touch projects at all.
+
+Applying a delta also stamps the project's change_xid, so /sync and the
+ETags (which include it) pick the new counts up. updated_at is left alone:
+it tracks edits to the project itself, and If-Match on PUT /projects checks
+only that. Project rows are locked in id order first, so two multi-project
+statements can't deadlock on them.
+
+The backfill below runs in the migration's transaction, with the triggers
+already in place. `python -m app.db.project_counts` recomputes the counters
+in batches later and reports any drift.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c1f9b524'
+down_revision: Union[str, Sequence[str], None] = 'd2e8b5c71a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CURRENT_XID = "pg_current_xact_id()::text::bigint"
+# Counter column -> the tasks it counts
+COUNTERS = [
+    ('task_count', 'true'),
+    ('not_started_count', "status = 'not_started'"),
+    ('in_progress_count', "status = 'in_progress'"),
+    ('done_count', "status = 'done'"),
+    # Open with a deadline: the tasks that can become overdue
+    ('open_with_deadline_count', "status <> 'done' AND deadline IS NOT NULL"),
+]
+EVENTS = ['INSERT', 'UPDATE', 'DELETE']
+
+# `changes` is (project_id, status, deadline, n): n is +1 for a row that
+# now counts towards the project and -1 for one that no longer does
+CHANGES = {
+    'INSERT': "SELECT project_id, status, deadline, 1 AS n FROM new_rows",
+    'DELETE': "SELECT project_id, status, deadline, -1 AS n FROM old_rows",
+    'UPDATE': """
+        SELECT o.project_id, o.status, o.deadline, -1 AS n
+          FROM old_rows o JOIN new_rows r USING (id)
+         WHERE (o.project_id, o.status, o.deadline IS NULL)
+               IS DISTINCT FROM (r.project_id, r.status, r.deadline IS NULL)
+        UNION ALL
+        SELECT r.project_id, r.status, r.deadline, 1 AS n
+          FROM old_rows o JOIN new_rows r USING (id)
+         WHERE (o.project_id, o.status, o.deadline IS NULL)
+               IS DISTINCT FROM (r.project_id, r.status, r.deadline IS NULL)
+    """,
+}
+
+
+def apply_changes(changes: str) -> str:
+    sums = ",\n".join(
+        f"coalesce(sum(n) FILTER (WHERE {condition}), 0) AS {column}"
+        for column, condition in COUNTERS
+    )
+    nonzero = " OR ".join(f"d.{column} <> 0" for column, _ in COUNTERS)
+    sets = ",\n".join(f"{column} = p.{column} + d.{column}" for column, _ in COUNTERS)
+    return f"""
+        WITH changes AS ({changes}),
+        deltas AS (
+            SELECT project_id, {sums}
+              FROM changes
+             GROUP BY project_id
+        ),
+        locked AS (
+            SELECT p.id
+              FROM projects p JOIN deltas d ON d.project_id = p.id
+             WHERE {nonzero}
+             ORDER BY p.id
+               FOR NO KEY UPDATE OF p
+        )
+        UPDATE projects p
+           SET {sets},
+               change_xid = {CURRENT_XID}
+          FROM deltas d JOIN locked l ON l.id = d.project_id
+         WHERE p.id = d.project_id;
+    """
+
+
+def counts_function() -> str:
+    branches = "\n    ELS".join(
+        f"IF TG_OP = '{event}' THEN {apply_changes(CHANGES[event])}"
+        for event in EVENTS
+    )
+    return f"""
+        CREATE FUNCTION tasks_update_project_counts() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {branches}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column, _ in COUNTERS:
+        op.add_column('projects', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(counts_function())
+    # A trigger with transition tables can only fire on one event
+    for event in EVENTS:
+        referencing = {
+            'INSERT': 'NEW TABLE AS new_rows',
+            'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+            'DELETE': 'OLD TABLE AS old_rows',
+        }[event]
+        op.execute(
+            f"CREATE TRIGGER tasks_project_counts_{event.lower()} AFTER {event} ON tasks"
+            f" REFERENCING {referencing}"
+            " FOR EACH STATEMENT EXECUTE FUNCTION tasks_update_project_counts()"
+        )
+
+    counts = ", ".join(
+        f"count(*) FILTER (WHERE {condition}) AS {column}" for column, condition in COUNTERS
+    )
+    sets = ", ".join(f"{column} = c.{column}" for column, _ in COUNTERS)
+    op.execute(
+        f"UPDATE projects p SET {sets}"
+        f" FROM (SELECT project_id, {counts} FROM tasks GROUP BY project_id) c"
+        " WHERE p.id = c.project_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in reversed(EVENTS):
+        op.execute(f"DROP TRIGGER tasks_project_counts_{event.lower()} ON tasks")
+    op.execute("DROP FUNCTION tasks_update_project_counts()")
+    for column, _ in reversed(COUNTERS):
+        op.drop_column('projects', column)
@@ -0,0 +1,60 @@
+import time
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.auth import get_current_user_id_async, keys_version, optional_security, token_expiry
+from app.core.change_feed import READY, REAUTH, ChangeFeed
+from app.core.settings import settings
+
+router = APIRouter(tags=["changes"])
+
+
+async def event_stream(feed: ChangeFeed, owner_id: str, expires_at: float | None = None):
+    """
+    The token was checked once, at connect. The stream ends with `reauth`
+    when it expires or the signing keys rotate, so the client reconnects
+    with a fresh one instead of listening on a stale one.
+    """
+    keys = keys_version()
+    # Subscribed inside the generator so the finally below always runs
+    subscription = await feed.subscribe(owner_id)
+    try:
+        # Anything before `ready` may have been missed: clients (re)load then
+        yield READY
+        while True:
+            wait = settings.CHANGE_FEED_HEARTBEAT
+            if expires_at is not None:
+                wait = max(0.0, min(wait, expires_at - time.time()))
+            frame = await subscription.next_frame(wait)
+            if frame is None:
+                return
+            if (expires_at is not None and time.time() >= expires_at) or keys_version() != keys:
+                yield REAUTH
+                return
+            yield frame
+    finally:
+        feed.unsubscribe(subscription)
+
+
+# Server-Sent Events with the caller's project and task changes, instead of
+# polling the list endpoints. Events:
+#   ready   subscribed; load or reload current state now
+#   change  {"type": "project"|"task", "action": ..., "id", "project_id"}
+#   resync  events were dropped (slow client, lost connection); reload
+#   reauth  the token expired or the keys rotated; reconnect with a new one
+# Idle streams get a comment line every CHANGE_FEED_HEARTBEAT seconds, which
+# keeps proxies from timing out and notices clients that went away.
+@router.get("/changes", response_class=StreamingResponse)
+async def stream_changes(
+    request: Request,
+    owner_id: str = Depends(get_current_user_id_async),
+    creds: HTTPAuthorizationCredentials | None = Depends(optional_security),
+):
+    expires_at = token_expiry(creds.credentials) if creds else None
+    return StreamingResponse(
+        event_stream(request.app.state.change_feed, owner_id, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.db.deps import get_db
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.dashboard import DashboardRead, ProjectRollup
+from app.schemas.project import ProjectRead
+from app.schemas.task import TaskPriority, TaskRead, TaskStatus
+from app.core.auth import get_current_user_id
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def _zero_counts(enum_cls) -> dict:
+    return {member: 0 for member in enum_cls}
+
+
+# Dashboard stats (owned by user)
+@router.get("", response_model=DashboardRead)
+def get_dashboard(
+    upcoming_days: int = Query(default=7, ge=1, le=90),
+    upcoming_limit: int = Query(default=5, ge=0, le=50),
+    recent_limit: int = Query(default=5, ge=0, le=50),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    now = datetime.now(timezone.utc)
+    window_end = now + timedelta(days=upcoming_days)
+    is_open = Task.status != TaskStatus.done
+
+    # One GROUP BY over the owner's tasks gives every rollup we need;
+    # the row count is bounded by projects x statuses x priorities.
+    rows = (
+        db.query(
+            Task.project_id,
+            Task.status,
+            Task.priority,
+            func.count(),
+            func.count().filter(and_(is_open, Task.deadline < now)),
+            func.count().filter(
+                and_(is_open, Task.deadline >= now, Task.deadline < window_end)
+            ),
+        )
+        .filter(Task.owner_id == owner_id)
+        .group_by(Task.project_id, Task.status, Task.priority)
+        .all()
+    )
+
+    projects = (
+        db.query(Project.id, Project.name)
+        .filter(Project.owner_id == owner_id)
+        .order_by(Project.id.asc())
+        .all()
+    )
+    rollups = {
+        pid: ProjectRollup(
+            project_id=pid, name=name, status_counts=_zero_counts(TaskStatus)
+        )
+        for pid, name in projects
+    }
+
+    status_counts = _zero_counts(TaskStatus)
+    priority_counts = _zero_counts(TaskPriority)
+    task_count = overdue_count = upcoming_count = 0
+
+    for project_id, task_status, priority, count, overdue, upcoming in rows:
+        task_count += count
+        overdue_count += overdue
+        upcoming_count += upcoming
+        status_counts[task_status] += count
+        priority_counts[priority] += count
+
+        rollup = rollups.get(project_id)
+        if rollup is not None:
+            rollup.task_count += count
+            rollup.overdue_count += overdue
+            rollup.status_counts[task_status] += count
+
+    upcoming_tasks = []
+    if upcoming_limit:
+        upcoming_tasks = (
+            db.query(Task)
+            .filter(
+                Task.owner_id == owner_id,
+                is_open,
+                Task.deadline >= now,
+                Task.deadline < window_end,
+            )
+            .order_by(Task.deadline.asc(), Task.id.asc())
+            .limit(upcoming_limit)
+            .all()
+        )
+
+    recent_projects = []
+    if recent_limit:
+        recent_projects = (
+            db.query(Project)
+            .filter(Project.owner_id == owner_id)
+            .order_by(Project.updated_at.desc(), Project.id.desc())
+            .limit(recent_limit)
+            .all()
+        )
+
+    return DashboardRead(
+        project_count=len(projects),
+        task_count=task_count,
+        status_counts=status_counts,
+        priority_counts=priority_counts,
+        overdue_count=overdue_count,
+        upcoming_count=upcoming_count,
+        upcoming=[TaskRead.model_validate(t) for t in upcoming_tasks],
+        projects=list(rollups.values()),
+        recent_projects=[ProjectRead.model_validate(p) for p in recent_projects],
+    )
@@ -0,0 +1,96 @@
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Iterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.api.v1.projects import PROJECT_READ_COLUMNS
+from app.api.v1.tasks import task_list_statement
+from app.db.sessions import get_database
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.task import TaskPriority, TaskStatus
+from app.core.auth import get_current_user_id
+from app.core.settings import settings
+from app.utils.serialization import csv_line, rows_to_csv, rows_to_ndjson
+
+# Full-account exports for users and the BI job. Rows are streamed from a
+# server-side cursor, so memory stays flat however many there are.
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def stream_rows(stmt, encode: Callable, header: bytes = b"") -> Iterator[bytes]:
+    """
+    Yield `stmt`'s rows in encoded batches of EXPORT_BATCH_SIZE.
+
+    The connection is checked out from the pool for as long as the response
+    is being sent and goes back as soon as the generator finishes or the
+    client disconnects (the generator is closed).
+    """
+    if header:
+        # Lets the client start before the first fetch comes back
+        yield header
+    with get_database().engine.connect() as conn:
+        result = conn.execution_options(yield_per=settings.EXPORT_BATCH_SIZE).execute(stmt)
+        for rows in result.partitions():
+            yield encode(rows)
+
+
+def export_response(stmt, fmt: ExportFormat, name: str) -> StreamingResponse:
+    if fmt == ExportFormat.csv:
+        body = stream_rows(stmt, rows_to_csv, header=csv_line(stmt.selected_columns.keys()))
+    else:
+        body = stream_rows(stmt, rows_to_ndjson)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'},
+    )
+
+
+@router.get("/projects")
+def export_projects(
+    fmt: ExportFormat = Query(default=ExportFormat.ndjson, alias="format"),
+    owner_id: str = Depends(get_current_user_id),
+):
+    stmt = (
+        select(*PROJECT_READ_COLUMNS)
+        .where(Project.owner_id == owner_id)
+        .order_by(Project.id.asc())
+    )
+    return export_response(stmt, fmt, "projects")
+
+
+# Same filters as GET /tasks
+@router.get("/tasks")
+def export_tasks(
+    fmt: ExportFormat = Query(default=ExportFormat.ndjson, alias="format"),
+    status_in: list[TaskStatus] | None = Query(default=None, alias="status"),
+    priority_in: list[TaskPriority] | None = Query(default=None, alias="priority"),
+    project_id: list[int] | None = Query(default=None),
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+    owner_id: str = Depends(get_current_user_id),
+):
+    stmt = task_list_statement(
+        owner_id,
+        status_in=status_in,
+        priority_in=priority_in,
+        project_ids=project_id,
+        deadline_from=deadline_from,
+        deadline_to=deadline_to,
+    ).order_by(Task.id.asc())
+    return export_response(stmt, fmt, "tasks")
@@ -1,28 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.deps import get_db
 from app.models.project import Project
+from app.schemas.pagination import Page
 from app.schemas.project import ProjectCreate, ProjectRead, ProjectUpdate
 from app.core.auth import get_current_user_id
+from app.core.change_feed import notifying
+from app.core.response_cache import get_response_cache, owner_scope, project_scope
+from app.utils.etag import (
+    etag_matches,
+    fingerprint_statement,
+    if_match_condition,
+    item_etag,
+    list_etag,
+    not_modified,
+    precondition_failed,
+    set_validators,
+)
+from app.utils.pagination import SortKey, bare_list, bare_list_statement, paginate
+from app.utils.serialization import read_columns, rows_to_json
+from app.utils.sync import tombstone_statement
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+PROJECT_SORT_KEY = SortKey("id", Project.id, int)
+# List endpoints select plain rows and encode them without building models
+PROJECT_READ_COLUMNS = read_columns(Project, ProjectRead)
+
+
+
+
+# ---- Write statements (one round trip each, ownership in the WHERE clause)
+# Generated columns (the search vector) are never sent back
+PROJECT_COLUMNS = tuple(c for c in Project.__table__.c if c.computed is None)
+
 
+def insert_project_statement(owner_id: str, data: dict):
+    return insert(Project).values(owner_id=owner_id, **data).returning(*PROJECT_COLUMNS)
 
 
-# ---- Helper
-def get_project_or_404(db: Session, project_id: int, owner_id: str) -> Project:
-    project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.owner_id == owner_id)
-        .first()
+def project_statement(project_id: int, owner_id: str):
+    return select(*PROJECT_COLUMNS).where(Project.id == project_id, Project.owner_id == owner_id)
+
+
+def update_project_statement(project_id: int, owner_id: str, changes: dict, precondition=None):
+    owned = [Project.id == project_id, Project.owner_id == owner_id]
+    if precondition is not None:
+        owned.append(precondition)
+    if not changes:
+        return select(*PROJECT_COLUMNS).where(*owned)
+    return (
+        update(Project)
+        .where(*owned)
+        .values(**changes)
+        .returning(*PROJECT_COLUMNS)
+        .execution_options(synchronize_session=False)
     )
-    if not project:
-        # 404 prevents leaking that another user's project exists
-        raise HTTPException(status_code=404, detail="Project not found")
-    return project
+
+
+def delete_project_statement(project_id: int, owner_id: str):
+    # Tasks go with it through ON DELETE CASCADE; the tombstone for /sync
+    # covers them too and is written by the same statement
+    deleted = (
+        delete(Project)
+        .where(Project.id == project_id, Project.owner_id == owner_id)
+        .returning(Project.id, Project.id.label("project_id"), Project.owner_id)
+        .cte("deleted")
+    )
+    return tombstone_statement("project", deleted)
+
+
+def project_not_found() -> HTTPException:
+    # 404 prevents leaking that another user's project exists
+    return HTTPException(status_code=404, detail="Project not found")
+
+
+def project_etag(project) -> str:
+    # change_xid also moves when the task counters do
+    return item_etag("project", project.id, project.updated_at, project.change_xid)
 
 
 # Create Project
@@ -33,42 +91,79 @@ def get_project_or_404(db: Session, project_id: int, owner_id: str) -> Project:
 )
 def create_project(
     data: ProjectCreate,
+    response: Response,
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    project = Project(
-        owner_id=owner_id,
-        name=data.name,
-        description=data.description,
-    )
-    db.add(project)
+    project = db.execute(notifying(
+        insert_project_statement(owner_id, data.model_dump()), owner_id, "project", "created", project_id="id"
+    )).first()
     db.commit()
-    db.refresh(project)
+    get_response_cache().bump(owner_scope(owner_id))
+    set_validators(response, project_etag(project))
     return project
 
 
 # Returns All Projects (owned by user)
-@router.get("", response_model=List[ProjectRead])
+# Passing `limit` or `after` switches to the paginated envelope; without
+# them older clients get a bare list of the first MAX_PAGE_SIZE rows.
+@router.get("", response_model=List[ProjectRead] | Page[ProjectRead])
 def list_projects(
+    request: Request,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    return (
-        db.query(Project)
-        .filter(Project.owner_id == owner_id)
-        .order_by(Project.id.asc())
-        .all()
-    )
+    # Serialized responses are cached until the owner's next project or task
+    # write (task writes change the counters)
+    cache = get_response_cache()
+    cache_key = cache.key(owner_id, request, owner_scope(owner_id))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached.response(if_none_match)
+
+    # Revalidation costs one aggregate; rows are only loaded on a miss
+    fingerprint = db.execute(fingerprint_statement(Project, Project.owner_id == owner_id)).one()
+    etag = list_etag(fingerprint, request, owner_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = select(*PROJECT_READ_COLUMNS).where(Project.owner_id == owner_id)
+    if limit is None and after is None:
+        result = bare_list(db.execute(bare_list_statement(stmt, Project.id.asc())).all())
+    else:
+        result = paginate(
+            db,
+            stmt,
+            sort=PROJECT_SORT_KEY,
+            id_column=Project.id,
+            limit=limit,
+            after=after,
+            include_total=include_total,
+        )
+    return cache.put(cache_key, etag, rows_to_json(result))
 
 
 # Get a Project By Id (owned by user)
 @router.get("/{project_id}", response_model=ProjectRead)
 def get_project(
     project_id: int,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    return get_project_or_404(db, project_id, owner_id)
+    project = db.execute(project_statement(project_id, owner_id)).first()
+    if project is None:
+        raise project_not_found()
+    etag = project_etag(project)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+    return project
 
 
 # Delete a Project (owned by user)
@@ -78,9 +173,12 @@ def delete_project(
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    project = get_project_or_404(db, project_id, owner_id)
-    db.delete(project)
+    # Its tasks go too; clients drop them along with the project
+    deleted = notifying(delete_project_statement(project_id, owner_id), owner_id, "project", "deleted")
+    if db.execute(deleted).first() is None:
+        raise project_not_found()
     db.commit()
+    get_response_cache().bump(owner_scope(owner_id), project_scope(project_id))
     return None
 
 
@@ -89,15 +187,25 @@ def delete_project(
 def update_project(
     project_id: int,
     data: ProjectUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    project = get_project_or_404(db, project_id, owner_id)
-
     update_data = data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(project, key, value)
-
-    db.commit()
-    db.refresh(project)
+    # If-Match is part of the UPDATE's WHERE, so check-and-write is atomic
+    precondition = if_match_condition(if_match, "project", project_id, Project.updated_at)
+    stmt = update_project_statement(project_id, owner_id, update_data, precondition)
+    if update_data:
+        stmt = notifying(stmt, owner_id, "project", "updated", project_id="id")
+    project = db.execute(stmt).first()
+    if project is None:
+        if precondition is not None and db.execute(project_statement(project_id, owner_id)).first():
+            raise precondition_failed()
+        raise project_not_found()
+    # An empty body is only a read: nothing to commit, announce or invalidate
+    if update_data:
+        db.commit()
+        get_response_cache().bump(owner_scope(owner_id))
+    set_validators(response, project_etag(project))
     return project
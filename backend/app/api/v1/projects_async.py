@@ -0,0 +1,159 @@
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.api.v1.projects import (
+    PROJECT_READ_COLUMNS,
+    PROJECT_SORT_KEY,
+    delete_project_statement,
+    insert_project_statement,
+    project_etag,
+    project_not_found,
+    project_statement,
+    update_project_statement,
+)
+from app.db.deps import get_async_db
+from app.models.project import Project
+from app.schemas.pagination import Page
+from app.schemas.project import ProjectCreate, ProjectRead, ProjectUpdate
+from app.core.auth import get_current_user_id_async
+from app.core.change_feed import notifying
+from app.core.response_cache import get_response_cache, owner_scope, project_scope
+from app.utils.etag import (
+    etag_matches,
+    fingerprint_statement,
+    if_match_condition,
+    list_etag,
+    not_modified,
+    precondition_failed,
+    set_validators,
+)
+from app.utils.pagination import bare_list, bare_list_statement, paginate_async
+from app.utils.serialization import rows_to_json
+
+# Same routes as app.api.v1.projects, served on the event loop (DB_MODE=async)
+router = APIRouter(prefix="/projects", tags=["projects"])
+
+
+# Create Project
+@router.post(
+    "",
+    response_model=ProjectRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_project(
+    data: ProjectCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    project = (await db.execute(notifying(
+        insert_project_statement(owner_id, data.model_dump()), owner_id, "project", "created", project_id="id"
+    ))).first()
+    await db.commit()
+    get_response_cache().bump(owner_scope(owner_id))
+    set_validators(response, project_etag(project))
+    return project
+
+
+# Returns All Projects (owned by user)
+@router.get("", response_model=List[ProjectRead] | Page[ProjectRead])
+async def list_projects(
+    request: Request,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    cache = get_response_cache()
+    cache_key = cache.key(owner_id, request, owner_scope(owner_id))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached.response(if_none_match)
+
+    fingerprint = (
+        await db.execute(fingerprint_statement(Project, Project.owner_id == owner_id))
+    ).one()
+    etag = list_etag(fingerprint, request, owner_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = select(*PROJECT_READ_COLUMNS).where(Project.owner_id == owner_id)
+    if limit is None and after is None:
+        result = bare_list((await db.execute(bare_list_statement(stmt, Project.id.asc()))).all())
+    else:
+        result = await paginate_async(
+            db,
+            stmt,
+            sort=PROJECT_SORT_KEY,
+            id_column=Project.id,
+            limit=limit,
+            after=after,
+            include_total=include_total,
+        )
+    return cache.put(cache_key, etag, rows_to_json(result))
+
+
+# Get a Project By Id (owned by user)
+@router.get("/{project_id}", response_model=ProjectRead)
+async def get_project(
+    project_id: int,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    project = (await db.execute(project_statement(project_id, owner_id))).first()
+    if project is None:
+        raise project_not_found()
+    etag = project_etag(project)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+    return project
+
+
+# Delete a Project (owned by user)
+@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    deleted = notifying(delete_project_statement(project_id, owner_id), owner_id, "project", "deleted")
+    if (await db.execute(deleted)).first() is None:
+        raise project_not_found()
+    await db.commit()
+    get_response_cache().bump(owner_scope(owner_id), project_scope(project_id))
+    return None
+
+
+# Update Project
+@router.put("/{project_id}", response_model=ProjectRead)
+async def update_project(
+    project_id: int,
+    data: ProjectUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    update_data = data.model_dump(exclude_unset=True)
+    precondition = if_match_condition(if_match, "project", project_id, Project.updated_at)
+    stmt = update_project_statement(project_id, owner_id, update_data, precondition)
+    if update_data:
+        stmt = notifying(stmt, owner_id, "project", "updated", project_id="id")
+    project = (await db.execute(stmt)).first()
+    if project is None:
+        if precondition is not None and (await db.execute(project_statement(project_id, owner_id))).first():
+            raise precondition_failed()
+        raise project_not_found()
+    # An empty body is only a read: nothing to commit, announce or invalidate
+    if update_data:
+        await db.commit()
+        get_response_cache().bump(owner_scope(owner_id))
+    set_validators(response, project_etag(project))
+    return project
@@ -0,0 +1,152 @@
+import html
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Float, and_, cast, func, literal, literal_column, or_, select, text, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.db.deps import get_db
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.pagination import Page
+from app.schemas.search import SearchHit
+from app.core.auth import get_current_user_id
+from app.utils.pagination import clamp_page_size, decode_cursor, encode_cursor
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# Control characters can't come from user text, so the snippet can be
+# HTML-escaped first and the highlights turned into <mark> after.
+HEADLINE_OPTIONS = "StartSel=\x01, StopSel=\x02, MaxWords=35, MinWords=15"
+
+
+def prefix_tsquery(q: str) -> str | None:
+    """'fix logi' -> 'fix:* & logi:*': every word, matched as a prefix."""
+    words = re.findall(r"[^\W_]+", q.lower())
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+_trigrams: bool | None = None
+
+
+def trigrams_available(db: Session) -> bool:
+    """Whether pg_trgm is installed (see migration d2e8b5c71a90); checked once per process."""
+    global _trigrams
+    if _trigrams is None:
+        _trigrams = bool(db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar())
+    return _trigrams
+
+
+def _hits(kind: str, model, project_id, title, body, owner_id: str, q: str, query, trigrams: bool):
+    match = model.search_vector.op("@@")(query)
+    rank = func.ts_rank_cd(model.search_vector, query, 32)
+    if trigrams:
+        # Typo tolerance: a word of the title close enough to the input
+        match = or_(match, literal(q).op("<%")(title))
+        rank = func.greatest(rank, func.word_similarity(q, title))
+    return select(
+        literal(kind).label("type"),
+        model.id,
+        project_id.label("project_id"),
+        title.label("title"),
+        body.label("body"),
+        cast(rank, Float).label("rank"),
+    ).where(model.owner_id == owner_id, match)
+
+
+def search_statement(owner_id: str, q: str, tsquery: str, *, trigrams: bool, page_size: int, after: dict | None):
+    """
+    Projects and tasks matching `q`, best first, as one keyset-paginated
+    list ordered by (rank desc, type, id).
+    """
+    query = func.to_tsquery(SEARCH_CONFIG, tsquery)
+    hits = union_all(
+        _hits("project", Project, Project.id, Project.name,
+              func.concat_ws(" - ", Project.name, Project.description), owner_id, q, query, trigrams),
+        _hits("task", Task, Task.project_id, Task.title, Task.title, owner_id, q, query, trigrams),
+    ).subquery("hits")
+
+    stmt = select(hits)
+    if after is not None:
+        stmt = stmt.where(or_(
+            hits.c.rank < after["rank"],
+            and_(hits.c.rank == after["rank"], tuple_(hits.c.type, hits.c.id) > tuple_(after["type"], after["id"])),
+        ))
+    order = (hits.c.rank.desc(), hits.c.type.asc(), hits.c.id.asc())
+    page = stmt.order_by(*order).limit(page_size + 1).subquery("page")
+
+    # Headlines are costly, so only the page's rows get one
+    return select(
+        page.c.type,
+        page.c.id,
+        page.c.project_id,
+        page.c.title,
+        func.ts_headline(SEARCH_CONFIG, page.c.body, query, HEADLINE_OPTIONS).label("snippet"),
+        page.c.rank,
+    ).order_by(page.c.rank.desc(), page.c.type.asc(), page.c.id.asc())
+
+
+def _search_cursor(after: str) -> dict:
+    cursor = decode_cursor(after)
+    if not (
+        isinstance(cursor.get("rank"), (int, float))
+        and cursor.get("type") in ("project", "task")
+        and isinstance(cursor.get("id"), int)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return cursor
+
+
+def _snippet(raw: str) -> str:
+    return html.escape(raw).replace("\x01", "<mark>").replace("\x02", "</mark>")
+
+
+# Ranked full-text search over the caller's project names/descriptions and
+# task titles. Every word is matched as a prefix; with pg_trgm installed,
+# near-miss spellings match too.
+@router.get("", response_model=Page[SearchHit])
+def search(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    page_size = clamp_page_size(limit)
+    tsquery = prefix_tsquery(q)
+    if tsquery is None:
+        return Page(items=[], page_size=page_size)
+
+    rows = db.execute(search_statement(
+        owner_id,
+        q,
+        tsquery,
+        trigrams=trigrams_available(db),
+        page_size=page_size,
+        after=_search_cursor(after) if after is not None else None,
+    )).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor({"rank": last.rank, "type": last.type, "id": last.id})
+    items = [
+        SearchHit(
+            type=row.type,
+            id=row.id,
+            project_id=row.project_id,
+            title=row.title,
+            snippet=_snippet(row.snippet),
+            rank=row.rank,
+        )
+        for row in rows
+    ]
+    return Page(items=items, page_size=page_size, next_cursor=next_cursor)
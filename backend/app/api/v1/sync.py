@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.v1.projects import PROJECT_READ_COLUMNS
+from app.api.v1.tasks import TASK_READ_COLUMNS
+from app.db.deps import get_db
+from app.models.project import Project
+from app.models.task import Task
+from app.models.tombstone import Tombstone
+from app.schemas.sync import SyncRead
+from app.core.auth import get_current_user_id
+from app.utils.etag import CACHE_HEADERS
+from app.utils.serialization import rows_to_json
+from app.utils.sync import SNAPSHOT_XMIN, decode_sync_cursor, encode_sync_cursor
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+def changed_statement(columns, model, owner_id: str, since: int | None):
+    stmt = select(*columns).where(model.owner_id == owner_id)
+    if since is not None:
+        stmt = stmt.where(model.change_xid >= since)
+    return stmt.order_by(model.id.asc())
+
+
+def tombstones_statement(owner_id: str, since: int):
+    return (
+        select(Tombstone.kind, Tombstone.entity_id)
+        .where(Tombstone.owner_id == owner_id, Tombstone.change_xid >= since)
+        .order_by(Tombstone.id.asc())
+    )
+
+
+# Without `since` this is a full snapshot; with the cursor of the previous
+# response it returns only what was created, updated or deleted after it.
+# Rows may repeat across rounds (clients upsert), none are skipped.
+@router.get("", response_model=SyncRead)
+def sync(
+    since: str | None = Query(default=None, description="`cursor` from the previous /sync"),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    since_xid = decode_sync_cursor(since) if since is not None else None
+
+    # Taken before reading, so writes committing meanwhile land in the next round
+    xmin = db.execute(SNAPSHOT_XMIN).scalar_one()
+
+    projects = db.execute(changed_statement(PROJECT_READ_COLUMNS, Project, owner_id, since_xid)).all()
+    tasks = db.execute(changed_statement(TASK_READ_COLUMNS, Task, owner_id, since_xid)).all()
+    deleted = {"projects": [], "tasks": []}
+    if since_xid is not None:
+        for kind, entity_id in db.execute(tombstones_statement(owner_id, since_xid)):
+            deleted[f"{kind}s"].append(entity_id)
+
+    body = rows_to_json({
+        "cursor": encode_sync_cursor(xmin),
+        "projects": projects,
+        "tasks": tasks,
+        "deleted": deleted,
+    })
+    return Response(content=body, media_type="application/json", headers=CACHE_HEADERS)
@@ -0,0 +1,171 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.api.v1.tasks import get_project_or_404
+from app.db.deps import get_db
+from app.models.task import Task
+from app.schemas.task import (
+    TaskBatchItemResult,
+    TaskBatchRequest,
+    TaskBatchResult,
+    TaskCreate,
+    TaskRead,
+    TaskUpdateItem,
+)
+from app.core.auth import get_current_user_id
+from app.core.change_feed import change_event, publish
+from app.core.response_cache import get_response_cache, owner_scope, project_scope
+from app.core.settings import settings
+
+# Multi-select moves and bulk creates: one ownership check and one
+# statement per batch instead of one request per task.
+router = APIRouter(tags=["tasks"])
+
+
+# --- Helper Functions
+def check_batch_size(payload: TaskBatchRequest) -> None:
+    if len(payload.items) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Batch exceeds {settings.MAX_BATCH_SIZE} items",
+        )
+
+
+def validation_error(index: int, exc: ValidationError) -> TaskBatchItemResult:
+    return TaskBatchItemResult(
+        index=index,
+        status=status.HTTP_422_UNPROCESSABLE_CONTENT,
+        error=json.loads(exc.json(include_url=False)),
+    )
+
+
+def batch_result(results: list[TaskBatchItemResult]) -> TaskBatchResult:
+    results.sort(key=lambda r: r.index)
+    succeeded = sum(1 for r in results if r.task is not None)
+    return TaskBatchResult(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+@router.post("/projects/{project_id}/tasks:batch", response_model=TaskBatchResult)
+def create_tasks_batch(
+    project_id: int,
+    payload: TaskBatchRequest,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    check_batch_size(payload)
+    # Ensure the project belongs to the user (once for the whole batch)
+    get_project_or_404(db, project_id, owner_id)
+
+    results: list[TaskBatchItemResult] = []
+    rows, indexes = [], []
+    for index, item in enumerate(payload.items):
+        try:
+            data = TaskCreate.model_validate(item)
+        except ValidationError as exc:
+            results.append(validation_error(index, exc))
+            continue
+        # Set ownership server-side (never trust client)
+        rows.append({"project_id": project_id, "owner_id": owner_id, **data.model_dump()})
+        indexes.append(index)
+
+    if rows:
+        # A single multi-row INSERT ... RETURNING, in input order
+        tasks = db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        for index, task in zip(indexes, tasks):
+            results.append(TaskBatchItemResult(
+                index=index,
+                status=status.HTTP_201_CREATED,
+                task=TaskRead.model_validate(task),
+            ))
+        publish(db, *(change_event(owner_id, "task", "created", project_id, task.id) for task in tasks))
+        db.commit()
+        get_response_cache().bump(owner_scope(owner_id), project_scope(project_id))
+
+    return batch_result(results)
+
+
+@router.patch("/tasks:batch", response_model=TaskBatchResult)
+def update_tasks_batch(
+    payload: TaskBatchRequest,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    check_batch_size(payload)
+
+    results: list[TaskBatchItemResult] = []
+    # Items carrying the same changes share one UPDATE (e.g. "move 50 cards
+    # to done"), so the common case is a single statement.
+    groups: dict[str, tuple[dict, list[tuple[int, int]]]] = {}
+    seen_ids: set[int] = set()
+    for index, item in enumerate(payload.items):
+        try:
+            data = TaskUpdateItem.model_validate(item)
+        except ValidationError as exc:
+            results.append(validation_error(index, exc))
+            continue
+        if data.id in seen_ids:
+            results.append(TaskBatchItemResult(
+                index=index,
+                status=status.HTTP_409_CONFLICT,
+                error="Task appears more than once in the batch",
+            ))
+            continue
+        seen_ids.add(data.id)
+
+        changes = data.model_dump(exclude_unset=True, exclude={"id"})
+        group_key = json.dumps(changes, sort_keys=True, default=str)
+        groups.setdefault(group_key, (changes, []))[1].append((index, data.id))
+
+    # Only tasks an UPDATE actually ran for are announced and invalidated;
+    # items with nothing to change are just read back.
+    changed: list[Task] = []
+    for changes, members in groups.values():
+        ids = [task_id for _, task_id in members]
+        if changes:
+            # The owner predicate is the ownership check: other users' or
+            # missing ids simply don't come back.
+            stmt = (
+                update(Task)
+                .where(Task.owner_id == owner_id, Task.id.in_(ids))
+                .values(**changes)
+                .returning(Task)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = select(Task).where(Task.owner_id == owner_id, Task.id.in_(ids))
+        found = {task.id: task for task in db.scalars(stmt).all()}
+        if changes:
+            changed.extend(found.values())
+
+        for index, task_id in members:
+            task = found.get(task_id)
+            if task is None:
+                results.append(TaskBatchItemResult(
+                    index=index,
+                    status=status.HTTP_404_NOT_FOUND,
+                    error="Task not found",
+                ))
+            else:
+                results.append(TaskBatchItemResult(
+                    index=index,
+                    status=status.HTTP_200_OK,
+                    task=TaskRead.model_validate(task),
+                ))
+
+    publish(db, *(change_event(owner_id, "task", "updated", task.project_id, task.id) for task in changed))
+    db.commit()
+    touched = {task.project_id for task in changed}
+    if touched:
+        get_response_cache().bump(owner_scope(owner_id), *(project_scope(pid) for pid in touched))
+    return batch_result(results)
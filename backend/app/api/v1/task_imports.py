@@ -0,0 +1,226 @@
+import codecs
+import csv
+import json
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy import text
+
+from app.db.sessions import get_database
+from app.schemas.task import TaskImportError, TaskImportResult, TaskImportRow
+from app.core.auth import get_current_user_id_async
+from app.core.change_feed import change_event, publish_async
+from app.core.response_cache import get_response_cache, owner_scope, project_scope
+from app.core.settings import settings
+
+# Migrations from other tools: one upload, one transaction. Rows are validated
+# as the body streams in and copied into a staging table with COPY; a single
+# INSERT ... SELECT then moves the ones in projects the caller owns.
+router = APIRouter(prefix="/import", tags=["tasks"])
+
+
+class ImportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+STAGING_TABLE = """
+CREATE TEMP TABLE task_import (
+    line integer NOT NULL,
+    project_id integer NOT NULL,
+    title varchar(200) NOT NULL,
+    status task_status NOT NULL,
+    priority task_priority NOT NULL,
+    deadline timestamptz
+) ON COMMIT DROP
+"""
+
+COPY_STAGING = "COPY task_import (line, project_id, title, status, priority, deadline) FROM STDIN"
+
+UNOWNED_LINES = """
+SELECT s.line FROM task_import s
+WHERE NOT EXISTS (
+    SELECT 1 FROM projects p WHERE p.id = s.project_id AND p.owner_id = :owner_id
+)
+ORDER BY s.line
+"""
+
+# owner_id comes from the joined project row, never from the upload
+INSERT_FROM_STAGING = """
+WITH inserted AS (
+    INSERT INTO tasks (project_id, owner_id, title, status, priority, deadline)
+    SELECT s.project_id, p.owner_id, s.title, s.status, s.priority, s.deadline
+    FROM task_import s
+    JOIN projects p ON p.id = s.project_id AND p.owner_id = :owner_id
+    ORDER BY s.line
+    RETURNING project_id
+)
+SELECT project_id, count(*) FROM inserted GROUP BY project_id
+"""
+
+
+class RecordSplitter:
+    """
+    Turns decoded chunks of an upload into (line number, record) pairs,
+    however the chunks happen to be cut. With `quoted`, a record continues
+    over newlines inside double quotes, as CSV allows.
+    """
+
+    def __init__(self, quoted: bool):
+        self.quoted = quoted
+        self.line_no = 0
+        self._partial = ""
+        self._record: list[str] = []
+        self._start = 0
+
+    def feed(self, text: str) -> list[tuple[int, str]]:
+        *lines, self._partial = (self._partial + text).split("\n")
+        return [record for line in lines if (record := self._line(line)) is not None]
+
+    def finish(self) -> list[tuple[int, str]]:
+        records = []
+        if self._partial:
+            record = self._line(self._partial)
+            self._partial = ""
+            if record is not None:
+                records.append(record)
+        if self._record:
+            # Unterminated quote: hand it over and let parsing report it
+            records.append((self._start, "\n".join(self._record)))
+            self._record = []
+        return records
+
+    def _line(self, line: str) -> tuple[int, str] | None:
+        self.line_no += 1
+        line = line.removesuffix("\r")
+        if not self._record:
+            self._start = self.line_no
+        self._record.append(line)
+        record = "\n".join(self._record)
+        if self.quoted and record.count('"') % 2:
+            return None
+        self._record = []
+        return (self._start, record) if record.strip() else None
+
+
+def parse_ndjson(record: str) -> dict:
+    try:
+        data = json.loads(record)
+    except ValueError:
+        raise ValueError("Invalid JSON")
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    return data
+
+
+def parse_csv(record: str, header: list[str]) -> dict:
+    try:
+        values = next(csv.reader([record], strict=True))
+    except csv.Error as exc:
+        raise ValueError(f"Invalid CSV: {exc}")
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    # Empty cells mean "not given", so TaskCreate defaults apply
+    return {name: value for name, value in zip(header, values) if value != ""}
+
+
+def import_format(request: Request, fmt: ImportFormat | None) -> ImportFormat:
+    if fmt is not None:
+        return fmt
+    content_type = request.headers.get("content-type", "")
+    return ImportFormat.csv if content_type.startswith("text/csv") else ImportFormat.ndjson
+
+
+@router.post("/tasks", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    fmt: ImportFormat | None = Query(default=None, alias="format"),
+    project_id: int | None = Query(default=None, description="Project for rows that don't name one"),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    """
+    Upload tasks as NDJSON (one TaskCreate object plus `project_id` per line)
+    or CSV with a header row, for any projects the caller owns. Invalid lines
+    and lines for other projects are reported by line number; the rest are
+    imported in one transaction.
+    """
+    fmt = import_format(request, fmt)
+    splitter = RecordSplitter(quoted=fmt == ImportFormat.csv)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    header: list[str] | None = None
+    errors: list[TaskImportError] = []
+    received = failed = 0
+
+    def reject(line: int, error) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.IMPORT_MAX_ERRORS:
+            errors.append(TaskImportError(line=line, error=error))
+
+    async with get_database().async_engine.connect() as conn:
+        await conn.execute(text(STAGING_TABLE))
+        raw = await conn.get_raw_connection()
+        cursor = raw.driver_connection.cursor()
+
+        async def copy_records(copy, records):
+            nonlocal header, received
+            for line, record in records:
+                if fmt == ImportFormat.csv and header is None:
+                    header = [name.strip().lower() for name in next(csv.reader([record]))]
+                    continue
+
+                received += 1
+                if received > settings.IMPORT_MAX_ROWS:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                        detail=f"Import exceeds {settings.IMPORT_MAX_ROWS} rows",
+                    )
+                try:
+                    data = parse_csv(record, header) if header is not None else parse_ndjson(record)
+                    if project_id is not None:
+                        data.setdefault("project_id", project_id)
+                    row = TaskImportRow.model_validate(data)
+                except ValueError as exc:
+                    # ValidationError is a ValueError too
+                    if isinstance(exc, ValidationError):
+                        reject(line, json.loads(exc.json(include_url=False)))
+                    else:
+                        reject(line, str(exc))
+                    continue
+                await copy.write_row((
+                    line, row.project_id, row.title, row.status.value, row.priority.value, row.deadline,
+                ))
+
+        try:
+            async with cursor.copy(COPY_STAGING) as copy:
+                async for chunk in request.stream():
+                    await copy_records(copy, splitter.feed(decoder.decode(chunk)))
+                await copy_records(copy, splitter.feed(decoder.decode(b"", final=True)))
+                await copy_records(copy, splitter.finish())
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Upload is not valid UTF-8",
+            )
+
+        for (line,) in await conn.execute(text(UNOWNED_LINES), {"owner_id": owner_id}):
+            reject(line, "Project not found")
+
+        imported = dict((await conn.execute(text(INSERT_FROM_STAGING), {"owner_id": owner_id})).all())
+        # One event per project rather than per row
+        await publish_async(conn, *(
+            change_event(owner_id, "task", "imported", pid, count=count) for pid, count in imported.items()
+        ))
+        await conn.commit()
+
+    if imported:
+        get_response_cache().bump(owner_scope(owner_id), *(project_scope(pid) for pid in imported))
+
+    errors.sort(key=lambda e: e.line)
+    return TaskImportResult(
+        received=received,
+        imported=sum(imported.values()),
+        failed=failed,
+        errors=errors,
+    )
@@ -1,15 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import case, delete, func, insert, literal, literal_column, select, update
 from sqlalchemy.orm import Session
 
 from app.db.deps import get_db
 from app.models.project import Project
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskRead, TaskUpdate
+from app.schemas.pagination import Page
+from app.schemas.task import (
+    DueBucket,
+    DueTaskPage,
+    TaskCreate,
+    TaskPriority,
+    TaskRead,
+    TaskStatus,
+    TaskUpdate,
+)
 from app.core.auth import get_current_user_id
+from app.core.change_feed import notifying
+from app.core.response_cache import get_response_cache, owner_scope, project_scope
+from app.utils.etag import (
+    etag_matches,
+    fingerprint_statement,
+    if_match_condition,
+    item_etag,
+    json_response,
+    list_etag,
+    not_modified,
+    precondition_failed,
+    set_validators,
+)
+from app.utils.pagination import SortKey, bare_list, bare_list_statement, paginate
+from app.utils.serialization import read_columns, rows_to_json
+from app.utils.sync import tombstone_statement
 
 router = APIRouter(tags=["tasks"])
 
 
+class TaskSort(str, Enum):
+    id = "id"
+    deadline = "deadline"
+    priority = "priority"
+    updated_at = "updated_at"
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+TASK_SORT_KEYS = {
+    TaskSort.id: SortKey("id", Task.id, int),
+    TaskSort.deadline: SortKey("deadline", Task.deadline, datetime.fromisoformat, nullable=True),
+    TaskSort.priority: SortKey("priority", Task.priority, TaskPriority),
+    TaskSort.updated_at: SortKey("updated_at", Task.updated_at, datetime.fromisoformat),
+}
+# List endpoints select plain rows and encode them without building models
+TASK_READ_COLUMNS = read_columns(Task, TaskRead)
+
 
 # --- Helper Functions
 def get_project_or_404(db: Session, project_id: int, owner_id: str) -> Project:
@@ -26,18 +78,227 @@ def get_project_or_404(db: Session, project_id: int, owner_id: str) -> Project:
     return project
 
 
-def get_task_or_404(db: Session, task_id: int, owner_id: str) -> Task:
-    task = (
-        db.query(Task)
-        .filter(Task.id == task_id, Task.owner_id == owner_id)
-        .first()
+def task_list_statement(
+    owner_id: str,
+    status_in: list[TaskStatus] | None = None,
+    priority_in: list[TaskPriority] | None = None,
+    project_ids: list[int] | None = None,
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+):
+    stmt = select(*TASK_READ_COLUMNS).where(Task.owner_id == owner_id)
+    if status_in:
+        stmt = stmt.where(Task.status.in_(status_in))
+    if priority_in:
+        stmt = stmt.where(Task.priority.in_(priority_in))
+    if project_ids:
+        stmt = stmt.where(Task.project_id.in_(project_ids))
+    if deadline_from is not None:
+        stmt = stmt.where(Task.deadline >= deadline_from)
+    if deadline_to is not None:
+        stmt = stmt.where(Task.deadline < deadline_to)
+    return stmt
+
+
+# --- Due dates
+# Spelled exactly like the predicate of ix_tasks_open_owner_id_deadline and
+# without a bound parameter, so the planner can match the partial index even
+# in a generic plan for a prepared statement
+TASK_IS_OPEN = Task.status != literal_column("'done'")
+# The due-date lists exclude NULL deadlines, so no NULLS LAST handling
+DUE_SORT_KEY = SortKey("deadline", Task.deadline, datetime.fromisoformat)
+
+
+def deadline_between(start: datetime | None, end: datetime | None) -> list:
+    """`start <= deadline < end`; a None bound is left open."""
+    conditions = []
+    if start is not None:
+        conditions.append(Task.deadline >= start)
+    if end is not None:
+        conditions.append(Task.deadline < end)
+    return conditions
+
+
+@dataclass(frozen=True)
+class DueWindow:
+    bucket: DueBucket
+    start: datetime | None
+    end: datetime | None
+
+
+def due_time_zone(tz: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown time zone",
+        )
+
+
+def due_windows(overdue: bool, tz: ZoneInfo, now: datetime | None = None) -> list[DueWindow]:
+    """
+    The buckets in time order. Days start at midnight in `tz`; "this week"
+    is the six days after (or before) today.
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(tz)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if overdue:
+        week_start = today - timedelta(days=6)
+        return [
+            DueWindow(DueBucket.earlier, None, week_start),
+            DueWindow(DueBucket.this_week, week_start, today),
+            DueWindow(DueBucket.today, today, now),
+        ]
+    tomorrow = today + timedelta(days=1)
+    week_end = today + timedelta(days=7)
+    return [
+        DueWindow(DueBucket.today, now, tomorrow),
+        DueWindow(DueBucket.this_week, tomorrow, week_end),
+        DueWindow(DueBucket.later, week_end, None),
+    ]
+
+
+def due_statement(owner_id: str, windows: list[DueWindow]):
+    """
+    The caller's open tasks due within `windows` (consecutive, in time
+    order), each labelled with its bucket. Only the matching range of
+    ix_tasks_open_owner_id_deadline is read.
+    """
+    if len(windows) == 1:
+        bucket = literal(windows[0].bucket.value)
+    else:
+        bucket = case(
+            *[(Task.deadline < w.end, w.bucket.value) for w in windows[:-1]],
+            else_=windows[-1].bucket.value,
+        )
+    return select(*TASK_READ_COLUMNS, bucket.label("bucket")).where(
+        Task.owner_id == owner_id,
+        TASK_IS_OPEN,
+        *deadline_between(windows[0].start, windows[-1].end),
+    )
+
+
+def due_counts_statement(owner_id: str, windows: list[DueWindow]):
+    """One row with the number of open tasks in each window."""
+    return select(
+        *[func.count().filter(*deadline_between(w.start, w.end)).label(w.bucket.value) for w in windows]
+    ).where(
+        Task.owner_id == owner_id,
+        TASK_IS_OPEN,
+        *deadline_between(windows[0].start, windows[-1].end),
     )
-    if not task:
+
+
+def due_response(page: dict, counts) -> Response:
+    # Counts come with the first page only (`counts` is None after that)
+    page["counts"] = None if counts is None else dict(counts._mapping)
+    return Response(content=rows_to_json(page), media_type="application/json")
+
+
+def select_due_windows(windows: list[DueWindow], bucket: DueBucket | None) -> list[DueWindow]:
+    if bucket is None:
+        return windows
+    selected = [w for w in windows if w.bucket == bucket]
+    if not selected:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bucket must be one of: {', '.join(w.bucket.value for w in windows)}",
         )
-    return task
+    return selected
+
+
+# --- Write statements
+# Each mutation is a single statement with the ownership predicate folded
+# in; RETURNING hands back the row, so no follow-up SELECT is needed.
+# Generated columns (the search vector) are never sent back
+TASK_COLUMNS = tuple(c for c in Task.__table__.c if c.computed is None)
+
+
+def insert_task_statement(project_id: int, owner_id: str, data: dict):
+    """
+    INSERT ... SELECT from the caller's project: yields no row when the
+    project doesn't exist or isn't theirs.
+    """
+    columns = {
+        "project_id": Project.id,
+        "owner_id": Project.owner_id,
+        **{
+            key: literal(value, Task.__table__.c[key].type)
+            for key, value in data.items()
+        },
+    }
+    source = select(*columns.values()).where(
+        Project.id == project_id, Project.owner_id == owner_id
+    )
+    return insert(Task).from_select(list(columns), source).returning(*TASK_COLUMNS)
+
+
+def task_statement(task_id: int, owner_id: str):
+    return select(*TASK_COLUMNS).where(Task.id == task_id, Task.owner_id == owner_id)
+
+
+def update_task_statement(task_id: int, owner_id: str, changes: dict, precondition=None):
+    owned = [Task.id == task_id, Task.owner_id == owner_id]
+    if precondition is not None:
+        owned.append(precondition)
+    if not changes:
+        return select(*TASK_COLUMNS).where(*owned)
+    return (
+        update(Task)
+        .where(*owned)
+        .values(**changes)
+        .returning(*TASK_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_task_statement(task_id: int, owner_id: str):
+    # The tombstone for /sync is written by the same statement
+    deleted = (
+        delete(Task)
+        .where(Task.id == task_id, Task.owner_id == owner_id)
+        .returning(Task.id, Task.project_id, Task.owner_id)
+        .cte("deleted")
+    )
+    return tombstone_statement("task", deleted)
+
+
+def task_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Task not found",
+    )
+
+
+def project_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Project not found",
+    )
+
+
+# --- Conditional requests
+def task_etag(task) -> str:
+    return item_etag("task", task.id, task.updated_at)
+
+
+def project_tasks_fingerprint_statement(project_id: int, owner_id: str):
+    """
+    Fingerprint of a project's tasks; yields no row when the project isn't
+    the caller's, so it doubles as the ownership check.
+    """
+    return (
+        select(func.count(Task.id), func.max(Task.id), func.max(Task.updated_at), func.sum(Task.change_xid))
+        .select_from(Project)
+        .outerjoin(Task, (Task.owner_id == owner_id) & (Task.project_id == Project.id))
+        .where(Project.id == project_id, Project.owner_id == owner_id)
+        .group_by(Project.id)
+    )
+
+
+def owner_tasks_fingerprint_statement(owner_id: str):
+    return fingerprint_statement(Task, Task.owner_id == owner_id)
 
 
 @router.post(
@@ -48,68 +309,201 @@ def get_task_or_404(db: Session, task_id: int, owner_id: str) -> Task:
 def create_task(
     project_id: int,
     payload: TaskCreate,
+    response: Response,
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    # Ensure the project belongs to the user
-    get_project_or_404(db, project_id, owner_id)
-
-    # Set ownership server-side (never trust client)
-    task = Task(
-        project_id=project_id,
-        owner_id=owner_id,
-        **payload.model_dump(),
-    )
-    db.add(task)
+    # Ownership is checked by the INSERT ... SELECT itself and set
+    # server-side (never trust client)
+    task = db.execute(notifying(
+        insert_task_statement(project_id, owner_id, payload.model_dump()), owner_id, "task", "created"
+    )).first()
+    if task is None:
+        raise project_not_found()
     db.commit()
-    db.refresh(task)
+    get_response_cache().bump(owner_scope(owner_id), project_scope(project_id))
+    set_validators(response, task_etag(task))
     return task
 
 
+# Passing `limit` or `after` switches to the paginated envelope; without
+# them older clients get a bare list of the first MAX_PAGE_SIZE rows.
 @router.get(
     "/projects/{project_id}/tasks",
-    response_model=list[TaskRead],
+    response_model=list[TaskRead] | Page[TaskRead],
 )
 def list_tasks_by_project(
     project_id: int,
+    request: Request,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    # Ensure the project belongs to the user
-    get_project_or_404(db, project_id, owner_id)
+    # Serialized responses are cached until the project's next task write
+    cache = get_response_cache()
+    cache_key = cache.key(owner_id, request, project_scope(project_id))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached.response(if_none_match)
 
-    return (
-        db.query(Task)
-        .filter(Task.project_id == project_id, Task.owner_id == owner_id)
-        .order_by(Task.id.asc())
-        .all()
+    # Ensure the project belongs to the user (and fingerprint its tasks)
+    fingerprint = db.execute(project_tasks_fingerprint_statement(project_id, owner_id)).first()
+    if fingerprint is None:
+        raise project_not_found()
+    etag = list_etag(fingerprint, request, owner_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = task_list_statement(owner_id, project_ids=[project_id])
+    if limit is None and after is None:
+        result = bare_list(db.execute(bare_list_statement(stmt, Task.id.asc())).all())
+    else:
+        result = paginate(
+            db,
+            stmt,
+            sort=TASK_SORT_KEYS[TaskSort.id],
+            id_column=Task.id,
+            limit=limit,
+            after=after,
+            include_total=include_total,
+        )
+    return cache.put(cache_key, etag, rows_to_json(result))
+
+
+# Returns tasks across all of the user's projects
+@router.get("/tasks", response_model=Page[TaskRead])
+def list_tasks(
+    request: Request,
+    status_in: list[TaskStatus] | None = Query(default=None, alias="status"),
+    priority_in: list[TaskPriority] | None = Query(default=None, alias="priority"),
+    project_id: list[int] | None = Query(default=None),
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+    sort: TaskSort = TaskSort.id,
+    order: SortOrder = SortOrder.asc,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    # Fingerprints the owner's whole task set; filters are covered by the
+    # query string being part of the ETag
+    etag = list_etag(db.execute(owner_tasks_fingerprint_statement(owner_id)).one(), request, owner_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = task_list_statement(
+        owner_id,
+        status_in=status_in,
+        priority_in=priority_in,
+        project_ids=project_id,
+        deadline_from=deadline_from,
+        deadline_to=deadline_to,
+    )
+    page = paginate(
+        db,
+        stmt,
+        sort=TASK_SORT_KEYS[sort],
+        id_column=Task.id,
+        limit=limit,
+        after=after,
+        descending=order == SortOrder.desc,
+        include_total=include_total,
+    )
+    return json_response(etag, rows_to_json(page))
+
+
+# Open tasks by due date, in today / this week / later (or earlier)
+# buckets of the caller's time zone. Declared before /tasks/{task_id},
+# which would otherwise take "upcoming" for an id.
+@router.get("/tasks/upcoming", response_model=DueTaskPage)
+def list_upcoming_tasks(
+    tz: str = "UTC",
+    bucket: DueBucket | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    return due_tasks(db, owner_id, overdue=False, tz=tz, bucket=bucket, limit=limit, after=after)
+
+
+# Most recently due first
+@router.get("/tasks/overdue", response_model=DueTaskPage)
+def list_overdue_tasks(
+    tz: str = "UTC",
+    bucket: DueBucket | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_current_user_id),
+):
+    return due_tasks(db, owner_id, overdue=True, tz=tz, bucket=bucket, limit=limit, after=after)
+
+
+def due_tasks(db: Session, owner_id: str, *, overdue: bool, tz: str, bucket, limit, after) -> Response:
+    windows = due_windows(overdue, due_time_zone(tz))
+    page = paginate(
+        db,
+        due_statement(owner_id, select_due_windows(windows, bucket)),
+        sort=DUE_SORT_KEY,
+        id_column=Task.id,
+        limit=limit,
+        after=after,
+        descending=overdue,
     )
+    counts = None if after else db.execute(due_counts_statement(owner_id, windows)).one()
+    return due_response(page, counts)
 
 
 @router.get("/tasks/{task_id}", response_model=TaskRead)
 def get_task(
     task_id: int,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    return get_task_or_404(db, task_id, owner_id)
+    task = db.execute(task_statement(task_id, owner_id)).first()
+    if task is None:
+        raise task_not_found()
+    etag = task_etag(task)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+    return task
 
 
 @router.patch("/tasks/{task_id}", response_model=TaskRead)
 def update_task(
     task_id: int,
     payload: TaskUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    task = get_task_or_404(db, task_id, owner_id)
-
     data = payload.model_dump(exclude_unset=True)
-    for key, value in data.items():
-        setattr(task, key, value)
-
-    db.commit()
-    db.refresh(task)
+    # If-Match is part of the UPDATE's WHERE, so check-and-write is atomic
+    precondition = if_match_condition(if_match, "task", task_id, Task.updated_at)
+    stmt = update_task_statement(task_id, owner_id, data, precondition)
+    if data:
+        stmt = notifying(stmt, owner_id, "task", "updated")
+    task = db.execute(stmt).first()
+    if task is None:
+        if precondition is not None and db.execute(task_statement(task_id, owner_id)).first():
+            raise precondition_failed()
+        raise task_not_found()
+    # An empty body is only a read: nothing to commit, announce or invalidate
+    if data:
+        db.commit()
+        get_response_cache().bump(owner_scope(owner_id), project_scope(task.project_id))
+    set_validators(response, task_etag(task))
     return task
 
 
@@ -119,8 +513,9 @@ def delete_task(
     db: Session = Depends(get_db),
     owner_id: str = Depends(get_current_user_id),
 ):
-    task = get_task_or_404(db, task_id, owner_id)
-
-    db.delete(task)
+    deleted = db.execute(notifying(delete_task_statement(task_id, owner_id), owner_id, "task", "deleted")).first()
+    if deleted is None:
+        raise task_not_found()
     db.commit()
+    get_response_cache().bump(owner_scope(owner_id), project_scope(deleted.project_id))
     return None
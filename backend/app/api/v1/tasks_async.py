@@ -0,0 +1,272 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.tasks import (
+    DUE_SORT_KEY,
+    TASK_SORT_KEYS,
+    SortOrder,
+    TaskSort,
+    delete_task_statement,
+    due_counts_statement,
+    due_response,
+    due_statement,
+    due_time_zone,
+    due_windows,
+    insert_task_statement,
+    owner_tasks_fingerprint_statement,
+    project_not_found,
+    project_tasks_fingerprint_statement,
+    select_due_windows,
+    task_etag,
+    task_list_statement,
+    task_not_found,
+    task_statement,
+    update_task_statement,
+)
+from app.db.deps import get_async_db
+from app.models.task import Task
+from app.schemas.pagination import Page
+from app.schemas.task import (
+    DueBucket,
+    DueTaskPage,
+    TaskCreate,
+    TaskPriority,
+    TaskRead,
+    TaskStatus,
+    TaskUpdate,
+)
+from app.core.auth import get_current_user_id_async
+from app.core.change_feed import notifying
+from app.core.response_cache import get_response_cache, owner_scope, project_scope
+from app.utils.etag import (
+    etag_matches,
+    if_match_condition,
+    json_response,
+    list_etag,
+    not_modified,
+    precondition_failed,
+    set_validators,
+)
+from app.utils.pagination import bare_list, bare_list_statement, paginate_async
+from app.utils.serialization import rows_to_json
+
+# Same routes as app.api.v1.tasks, served on the event loop (DB_MODE=async)
+router = APIRouter(tags=["tasks"])
+
+
+@router.post(
+    "/projects/{project_id}/tasks",
+    response_model=TaskRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_task(
+    project_id: int,
+    payload: TaskCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    # Ownership is checked by the INSERT ... SELECT itself and set
+    # server-side (never trust client)
+    task = (await db.execute(notifying(
+        insert_task_statement(project_id, owner_id, payload.model_dump()), owner_id, "task", "created"
+    ))).first()
+    if task is None:
+        raise project_not_found()
+    await db.commit()
+    get_response_cache().bump(owner_scope(owner_id), project_scope(project_id))
+    set_validators(response, task_etag(task))
+    return task
+
+
+@router.get(
+    "/projects/{project_id}/tasks",
+    response_model=list[TaskRead] | Page[TaskRead],
+)
+async def list_tasks_by_project(
+    project_id: int,
+    request: Request,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    cache = get_response_cache()
+    cache_key = cache.key(owner_id, request, project_scope(project_id))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached.response(if_none_match)
+
+    # Ensure the project belongs to the user (and fingerprint its tasks)
+    fingerprint = (
+        await db.execute(project_tasks_fingerprint_statement(project_id, owner_id))
+    ).first()
+    if fingerprint is None:
+        raise project_not_found()
+    etag = list_etag(fingerprint, request, owner_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = task_list_statement(owner_id, project_ids=[project_id])
+    if limit is None and after is None:
+        result = bare_list((await db.execute(bare_list_statement(stmt, Task.id.asc()))).all())
+    else:
+        result = await paginate_async(
+            db,
+            stmt,
+            sort=TASK_SORT_KEYS[TaskSort.id],
+            id_column=Task.id,
+            limit=limit,
+            after=after,
+            include_total=include_total,
+        )
+    return cache.put(cache_key, etag, rows_to_json(result))
+
+
+# Returns tasks across all of the user's projects
+@router.get("/tasks", response_model=Page[TaskRead])
+async def list_tasks(
+    request: Request,
+    status_in: list[TaskStatus] | None = Query(default=None, alias="status"),
+    priority_in: list[TaskPriority] | None = Query(default=None, alias="priority"),
+    project_id: list[int] | None = Query(default=None),
+    deadline_from: datetime | None = None,
+    deadline_to: datetime | None = None,
+    sort: TaskSort = TaskSort.id,
+    order: SortOrder = SortOrder.asc,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    include_total: bool = False,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    fingerprint = (await db.execute(owner_tasks_fingerprint_statement(owner_id))).one()
+    etag = list_etag(fingerprint, request, owner_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    stmt = task_list_statement(
+        owner_id,
+        status_in=status_in,
+        priority_in=priority_in,
+        project_ids=project_id,
+        deadline_from=deadline_from,
+        deadline_to=deadline_to,
+    )
+    page = await paginate_async(
+        db,
+        stmt,
+        sort=TASK_SORT_KEYS[sort],
+        id_column=Task.id,
+        limit=limit,
+        after=after,
+        descending=order == SortOrder.desc,
+        include_total=include_total,
+    )
+    return json_response(etag, rows_to_json(page))
+
+
+# Declared before /tasks/{task_id}, which would otherwise take the paths
+@router.get("/tasks/upcoming", response_model=DueTaskPage)
+async def list_upcoming_tasks(
+    tz: str = "UTC",
+    bucket: DueBucket | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    return await due_tasks(db, owner_id, overdue=False, tz=tz, bucket=bucket, limit=limit, after=after)
+
+
+@router.get("/tasks/overdue", response_model=DueTaskPage)
+async def list_overdue_tasks(
+    tz: str = "UTC",
+    bucket: DueBucket | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    after: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    return await due_tasks(db, owner_id, overdue=True, tz=tz, bucket=bucket, limit=limit, after=after)
+
+
+async def due_tasks(db: AsyncSession, owner_id: str, *, overdue: bool, tz: str, bucket, limit, after):
+    windows = due_windows(overdue, due_time_zone(tz))
+    page = await paginate_async(
+        db,
+        due_statement(owner_id, select_due_windows(windows, bucket)),
+        sort=DUE_SORT_KEY,
+        id_column=Task.id,
+        limit=limit,
+        after=after,
+        descending=overdue,
+    )
+    counts = None if after else (await db.execute(due_counts_statement(owner_id, windows))).one()
+    return due_response(page, counts)
+
+
+@router.get("/tasks/{task_id}", response_model=TaskRead)
+async def get_task(
+    task_id: int,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    task = (await db.execute(task_statement(task_id, owner_id))).first()
+    if task is None:
+        raise task_not_found()
+    etag = task_etag(task)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
+    return task
+
+
+@router.patch("/tasks/{task_id}", response_model=TaskRead)
+async def update_task(
+    task_id: int,
+    payload: TaskUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    data = payload.model_dump(exclude_unset=True)
+    precondition = if_match_condition(if_match, "task", task_id, Task.updated_at)
+    stmt = update_task_statement(task_id, owner_id, data, precondition)
+    if data:
+        stmt = notifying(stmt, owner_id, "task", "updated")
+    task = (await db.execute(stmt)).first()
+    if task is None:
+        if precondition is not None and (await db.execute(task_statement(task_id, owner_id))).first():
+            raise precondition_failed()
+        raise task_not_found()
+    # An empty body is only a read: nothing to commit, announce or invalidate
+    if data:
+        await db.commit()
+        get_response_cache().bump(owner_scope(owner_id), project_scope(task.project_id))
+    set_validators(response, task_etag(task))
+    return task
+
+
+@router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    owner_id: str = Depends(get_current_user_id_async),
+):
+    deleted = (await db.execute(
+        notifying(delete_task_statement(task_id, owner_id), owner_id, "task", "deleted")
+    )).first()
+    if deleted is None:
+        raise task_not_found()
+    await db.commit()
+    get_response_cache().bump(owner_scope(owner_id), project_scope(deleted.project_id))
+    return None
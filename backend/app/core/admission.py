@@ -0,0 +1,68 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.metrics import Counter, Gauge
+from app.core.settings import settings
+
+IN_FLIGHT = Gauge(
+    "http_db_requests_in_flight",
+    "Requests currently admitted past admission control.",
+)
+REJECTED = Counter(
+    "http_admission_rejected_total",
+    "Requests answered with 503 before reaching a route.",
+    ("reason",),
+)
+
+# Requests that never touch the database are not counted, nor are
+# long-lived /changes streams, which hold no pooled connection
+EXEMPT_PATHS = frozenset({"/health", "/metrics", "/changes"})
+
+
+def _busy_response(detail: str) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=503,
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+    )
+
+
+class AdmissionControlMiddleware:
+    """
+    Caps the number of in-flight requests so they queue here, where we can
+    fail fast, instead of inside pool.connect() on a threadpool thread.
+
+    Plain ASGI middleware: the counter only changes on the event loop thread,
+    so it needs no lock.
+    """
+
+    def __init__(self, app, max_in_flight: int):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._rejected = REJECTED.labels("in_flight_limit")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            self._rejected.inc()
+            response = _busy_response("Server busy, retry shortly.")
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            IN_FLIGHT.dec()
+
+
+async def pool_timeout_handler(request: Request, exc: Exception) -> JSONResponse:
+    """The pool had no connection within DB_POOL_TIMEOUT."""
+    REJECTED.labels("pool_timeout").inc()
+    return _busy_response("Database busy, retry shortly.")
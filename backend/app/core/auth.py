@@ -1,23 +1,19 @@
-import requests
+import time
+
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.jwks import KeyStoreUnavailable, get_key_store
+from app.core.request_metrics import record_auth
 from app.core.settings import settings
+from app.core.token_cache import token_cache
 
 security = HTTPBearer()
-_jwks_cache = None 
-
-def _get_jwks():
-    """
-    JWKS = JSON Web Key Set (public keys).
-    Clerk rotates keys; we fetch from their endpoint.
-    Cache it so we don't hit Clerk on every request.
-    """
-    global _jwks_cache
-    if _jwks_cache is None:
-        _jwks_cache = requests.get(settings.CLERK_JWKS_URL, timeout=10).json()
-    return _jwks_cache
+# For endpoints that also read the token itself; the user id dependency
+# has already rejected requests without one
+optional_security = HTTPBearer(auto_error=False)
 
 def get_current_user_id(
         creds: HTTPAuthorizationCredentials = Depends(security)
@@ -28,15 +24,78 @@ def get_current_user_id(
     - Reads Authorization: Bearer <token>
     - Verifies token signature using Clerk public keys
     - Returns the authenticated user's id (payload["sub"])
+
+    Tokens that already verified are served from `token_cache` until they
+    expire or the signing keys change.
+    """
+    start = time.perf_counter()
+    try:
+        return authenticate(creds.credentials)
+    finally:
+        record_auth(time.perf_counter() - start)
+
+
+async def get_current_user_id_async(
+        creds: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
     """
-    token = creds.credentials
-    jwks = _get_jwks()
+    Async twin of `get_current_user_id`.
+
+    Cache hits are answered on the event loop; a miss may fetch the JWKS
+    and runs RSA verification, so it's moved to the threadpool.
+    """
+    start = time.perf_counter()
+    try:
+        token = creds.credentials
+        user_id = _cached_user_id(token)
+        if user_id is not None:
+            return user_id
+        return await run_in_threadpool(_verify_token, token)
+    finally:
+        record_auth(time.perf_counter() - start)
+
+
+def authenticate(token: str) -> str:
+    """User id of a bearer token; raises the same HTTPExceptions as the dependency."""
+    user_id = _cached_user_id(token)
+    if user_id is not None:
+        return user_id
+    return _verify_token(token)
+
+
+def keys_version() -> tuple:
+    """The signing key set tokens are verified against; changes when it rotates."""
+    key_store = get_key_store()
+    return (id(key_store), key_store.generation)
+
+
+def token_expiry(token: str) -> float | None:
+    """`exp` of a token that has already been verified, if it has one."""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _cached_user_id(token: str) -> str | None:
+    return token_cache.get(token, keys_version())
+
+
+def _verify_token(token: str) -> str:
+    key_store = get_key_store()
 
     try:
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
 
-        key = next((k for k in jwks["keys"] if k.get("kid")==kid),None)
+        try:
+            key = key_store.get_key(kid)
+        except KeyStoreUnavailable:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Unable to verify tokens right now.",
+            )
         if not key:
              raise HTTPException(status_code=401, detail="Invalid token key id.")
         
@@ -55,6 +114,8 @@ def get_current_user_id(
         if not user_id:
             raise HTTPException(status_code=401, detail="Token missing subject.")
 
+        # get_key() may have refreshed the key set; cache against that version
+        token_cache.put(token, user_id, payload.get("exp"), keys_version())
         return user_id
 
     except JWTError:
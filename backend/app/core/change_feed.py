@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import psycopg
+from sqlalchemy import Text, cast, func, literal, literal_column, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import make_url
+
+from app.core.metrics import Counter, Gauge
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "tracker_changes"
+
+SUBSCRIBERS = Gauge(
+    "change_feed_subscribers",
+    "Open /changes streams in this worker.",
+)
+DELIVERED = Counter(
+    "change_feed_events_total",
+    "Change events queued to /changes streams.",
+)
+OVERFLOWS = Counter(
+    "change_feed_overflows_total",
+    "Streams that fell too far behind and were told to resync.",
+)
+
+# One statement whatever the number of events. NOTIFY is transactional:
+# Postgres delivers the payloads when the writer commits, never on rollback.
+_NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+
+def change_event(owner_id: str, type: str, action: str, project_id: int, id: int | None = None, **extra) -> dict:
+    return {"owner_id": owner_id, "type": type, "action": action, "id": id, "project_id": project_id, **extra}
+
+
+def _notify_params(events) -> dict:
+    return {"channel": CHANNEL, "payloads": [json.dumps(event, separators=(",", ":")) for event in events]}
+
+
+def publish(db, *events: dict) -> None:
+    """Queue change events on the writer's transaction; call before commit."""
+    if settings.CHANGE_FEED_ENABLED and events:
+        db.execute(_NOTIFY, _notify_params(events))
+
+
+async def publish_async(db, *events: dict) -> None:
+    if settings.CHANGE_FEED_ENABLED and events:
+        await db.execute(_NOTIFY, _notify_params(events))
+
+
+def notifying(stmt, owner_id: str, type: str, action: str, *, project_id: str = "project_id"):
+    """
+    `stmt`, a write with RETURNING id (and `project_id`), with the NOTIFY
+    folded in: each returned row sends its change event from the same
+    statement, so a single write stays one round trip plus the commit. The
+    rows come back as before, with an extra `notified` column.
+    """
+    if not settings.CHANGE_FEED_ENABLED:
+        return stmt
+    written = stmt.cte("written")
+    fixed = json.dumps({"owner_id": owner_id, "type": type, "action": action}, separators=(",", ":"))
+    payload = cast(literal(fixed), JSONB).op("||")(func.jsonb_build_object(
+        literal_column("'id'"), written.c.id, literal_column("'project_id'"), written.c[project_id],
+    ))
+    return select(written, func.pg_notify(literal(CHANNEL), cast(payload, Text)).label("notified"))
+
+
+def sse_frame(event: str, data: str) -> bytes:
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+READY = sse_frame("ready", "{}")
+RESYNC = sse_frame("resync", "{}")
+REAUTH = sse_frame("reauth", "{}")
+HEARTBEAT = b": ping\n\n"
+
+
+class Subscription:
+    """
+    One /changes stream. Frames wait in a bounded queue; a client that
+    can't keep up loses its backlog and gets a single resync instead, so
+    one slow reader never holds memory or delays the others.
+    """
+
+    def __init__(self, owner_id: str, max_queue: int):
+        self.owner_id = owner_id
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=max_queue)
+        # Events may have been missed: resync once the feed is listening again
+        self.missed = False
+
+    def put(self, frame: bytes | None) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            OVERFLOWS.inc()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(frame if frame is None else RESYNC)
+
+    async def next_frame(self, heartbeat: float) -> bytes | None:
+        """The next frame, a heartbeat after `heartbeat` idle seconds, or None once closed."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), heartbeat)
+        except TimeoutError:
+            return HEARTBEAT
+
+
+class ChangeFeed:
+    """
+    Fans Postgres notifications out to the streams of one worker.
+
+    A single dedicated connection LISTENs on CHANNEL, started with the first
+    subscriber and kept until `close()`. It reconnects on any failure, backing
+    off up to `max_reconnect_delay`. Notifications sent while it was down are
+    gone, so once it listens again every stream that was open meanwhile is
+    told to resync.
+    """
+
+    def __init__(
+        self, conninfo: str, *, max_queue: int, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0
+    ):
+        self.conninfo = conninfo
+        self.max_queue = max_queue
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._subscribers: defaultdict[str, set[Subscription]] = defaultdict(set)
+        self._listening = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def listening(self) -> bool:
+        return self._listening.is_set()
+
+    def subscriber_count(self, owner_id: str | None = None) -> int:
+        if owner_id is not None:
+            return len(self._subscribers.get(owner_id, ()))
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    async def subscribe(self, owner_id: str) -> Subscription:
+        subscription = Subscription(owner_id, self.max_queue)
+        self._subscribers[owner_id].add(subscription)
+        SUBSCRIBERS.inc()
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+        try:
+            # Events committed from here on reach this stream; if the
+            # database is down it gets a resync once we reconnect
+            await asyncio.wait_for(self._listening.wait(), settings.DB_POOL_TIMEOUT)
+        except TimeoutError:
+            subscription.missed = True
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subs = self._subscribers.get(subscription.owner_id)
+        if subs is not None and subscription in subs:
+            subs.remove(subscription)
+            SUBSCRIBERS.dec()
+            if not subs:
+                del self._subscribers[subscription.owner_id]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._listening.clear()
+        for subs in self._subscribers.values():
+            for subscription in subs:
+                subscription.put(None)
+        SUBSCRIBERS.dec(self.subscriber_count())
+        self._subscribers.clear()
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            subs = self._subscribers.get(event.pop("owner_id"))
+        except (ValueError, KeyError, AttributeError):
+            logger.warning("Ignoring malformed change notification %r", payload)
+            return
+        if not subs:
+            return
+        frame = sse_frame("change", json.dumps(event, separators=(",", ":")))
+        for subscription in subs:
+            subscription.put(frame)
+        DELIVERED.inc(len(subs))
+
+    def _mark_missed(self) -> None:
+        for subs in self._subscribers.values():
+            for subscription in subs:
+                subscription.missed = True
+
+    def _resync_missed(self) -> None:
+        for subs in self._subscribers.values():
+            for subscription in subs:
+                if subscription.missed:
+                    subscription.missed = False
+                    subscription.put(RESYNC)
+
+    async def _listen(self) -> None:
+        delay = self.reconnect_delay
+        try:
+            while True:
+                try:
+                    async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+                        await conn.execute(f"LISTEN {CHANNEL}")
+                        delay = self.reconnect_delay
+                        self._listening.set()
+                        self._resync_missed()
+                        async for notify in conn.notifies():
+                            self.dispatch(notify.payload)
+                except Exception:
+                    # Anything but cancellation: a dead listener would leave
+                    # every stream silent until the process restarts
+                    logger.warning("Change feed connection lost, reconnecting in %.1fs", delay, exc_info=True)
+                self._listening.clear()
+                self._mark_missed()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            self._listening.clear()
+            self._task = None
+
+
+def listen_conninfo(database_url: str) -> str:
+    # The SQLAlchemy URL names a driver; psycopg wants a plain libpq URI
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def build_change_feed() -> ChangeFeed:
+    return ChangeFeed(
+        listen_conninfo(settings.DATABASE_URL),
+        max_queue=settings.CHANGE_FEED_QUEUE_SIZE,
+        reconnect_delay=settings.CHANGE_FEED_RECONNECT_DELAY,
+    )
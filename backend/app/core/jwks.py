@@ -0,0 +1,214 @@
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from jose import jwk
+from jose.exceptions import JOSEError
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A fetcher returns the JWKS document and, when the source says so, how many
+# seconds it may be cached for (None = use the configured default).
+Fetcher = Callable[[], tuple[dict, Optional[float]]]
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class KeyStoreUnavailable(Exception):
+    """Raised when no signing keys could be loaded at all."""
+
+
+def parse_max_age(cache_control: str | None) -> float | None:
+    if not cache_control:
+        return None
+    if "no-store" in cache_control.lower() or "no-cache" in cache_control.lower():
+        return 0.0
+    match = _MAX_AGE_RE.search(cache_control)
+    return float(match.group(1)) if match else None
+
+
+def http_fetcher(url: str, timeout: float) -> Fetcher:
+    def fetch():
+        import requests
+
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.json(), parse_max_age(response.headers.get("Cache-Control"))
+
+    return fetch
+
+
+def file_fetcher(path: str | Path) -> Fetcher:
+    """Read a JWKS document from disk (local development and tests)."""
+    def fetch():
+        return json.loads(Path(path).read_text()), None
+
+    return fetch
+
+
+def fetcher_for_url(url: str) -> Fetcher:
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return file_fetcher(parsed.path)
+    return http_fetcher(url, settings.JWKS_FETCH_TIMEOUT)
+
+
+class JWKSKeyStore:
+    """
+    Cache of JWKS signing keys, parsed once and indexed by `kid`.
+
+    - Keys expire after the source's Cache-Control max-age (clamped to
+      [JWKS_MIN_TTL, JWKS_MAX_TTL]) or JWKS_CACHE_TTL.
+    - Shortly before expiry a background thread refreshes them, so request
+      threads keep using the current keys instead of waiting on the fetch.
+    - An unknown `kid` forces a refresh (Clerk rotated its keys), at most once
+      per JWKS_MIN_REFRESH_INTERVAL so bogus tokens can't hammer the source.
+    - Only one fetch is ever in flight; concurrent callers wait for it and
+      reuse its result.
+    - If a refresh fails the previous keys keep being served.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        *,
+        default_ttl: float | None = None,
+        min_ttl: float | None = None,
+        max_ttl: float | None = None,
+        min_refresh_interval: float | None = None,
+        refresh_ahead: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetcher = fetcher
+        self._default_ttl = settings.JWKS_CACHE_TTL if default_ttl is None else default_ttl
+        self._min_ttl = settings.JWKS_MIN_TTL if min_ttl is None else min_ttl
+        self._max_ttl = settings.JWKS_MAX_TTL if max_ttl is None else max_ttl
+        self._min_refresh_interval = (
+            settings.JWKS_MIN_REFRESH_INTERVAL
+            if min_refresh_interval is None
+            else min_refresh_interval
+        )
+        self._refresh_ahead = (
+            settings.JWKS_REFRESH_AHEAD if refresh_ahead is None else refresh_ahead
+        )
+        self._clock = clock
+
+        self._keys: dict[str, jwk.Key] = {}
+        self._expires_at = 0.0
+        self._last_attempt = float("-inf")
+        self._generation = 0
+
+        self._lock = threading.Lock()
+        self._background: threading.Thread | None = None
+
+    @property
+    def generation(self) -> int:
+        """Incremented every time a fetch changes the set of keys."""
+        return self._generation
+
+    def get_key(self, kid: str | None) -> jwk.Key | None:
+        now = self._clock()
+        if now >= self._expires_at:
+            self._refresh()
+        elif now >= self._expires_at - self._refresh_ahead:
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and kid is not None:
+            # Possibly a freshly rotated key
+            self._refresh(force=True)
+            key = self._keys.get(kid)
+        return key
+
+    def refresh(self) -> None:
+        """Fetch the key set now (used to prewarm and by the background thread)."""
+        self._refresh(force=True)
+
+    # ---- internals
+
+    def _refresh(self, force: bool = False) -> None:
+        with self._lock:
+            # Re-check under the lock: another thread may have just fetched
+            now = self._clock()
+            if force:
+                if now - self._last_attempt >= self._min_refresh_interval:
+                    self._fetch_locked()
+            elif now >= self._expires_at:
+                self._fetch_locked()
+
+        if not self._keys:
+            raise KeyStoreUnavailable("Unable to load signing keys.")
+
+    def _fetch_locked(self) -> None:
+        self._last_attempt = self._clock()
+        try:
+            document, max_age = self._fetcher()
+            keys = self._parse(document)
+        except Exception:
+            logger.exception("JWKS refresh failed")
+            # Serve the old keys and retry after the rate limit window
+            self._expires_at = self._last_attempt + self._min_refresh_interval
+            return
+
+        ttl = self._default_ttl if max_age is None else max_age
+        ttl = max(self._min_ttl, min(ttl, self._max_ttl))
+        self._expires_at = self._last_attempt + ttl
+        if keys.keys() != self._keys.keys():
+            self._generation += 1
+        self._keys = keys
+
+    @staticmethod
+    def _parse(document: dict) -> dict[str, jwk.Key]:
+        keys = {}
+        for data in document.get("keys", []):
+            kid = data.get("kid")
+            if not kid or data.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwk.construct(data, algorithm=data.get("alg", "RS256"))
+            except JOSEError:
+                logger.warning("Skipping unusable JWKS key %s", kid)
+        return keys
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            if self._clock() - self._last_attempt < self._min_refresh_interval:
+                return
+            self._background = threading.Thread(
+                target=self._background_refresh, name="jwks-refresh", daemon=True
+            )
+            self._background.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._refresh(force=True)
+        except KeyStoreUnavailable:
+            pass
+
+
+_key_store: JWKSKeyStore | None = None
+_key_store_lock = threading.Lock()
+
+
+def get_key_store() -> JWKSKeyStore:
+    global _key_store
+    if _key_store is None:
+        with _key_store_lock:
+            if _key_store is None:
+                _key_store = JWKSKeyStore(fetcher_for_url(settings.CLERK_JWKS_URL))
+    return _key_store
+
+
+def set_key_store(store: JWKSKeyStore | None) -> None:
+    """Swap the process-wide key store (tests, or a custom fetcher)."""
+    global _key_store
+    _key_store = store
@@ -0,0 +1,389 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+
+from app.core.auth import authenticate
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile-token"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+SQL_NAME_LIMIT = 300
+
+try:
+    from anyio._backends._asyncio import WorkerThread
+
+    # Sync handlers and dependencies run inside this frame on a worker
+    # thread; its `context` local is the request's copied context
+    _WORKER_RUN = WorkerThread.run.__code__
+except (ImportError, AttributeError):  # pragma: no cover - other anyio layouts
+    _WORKER_RUN = None
+
+_profile: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+
+
+# ---- Access
+
+def profile_token(ttl: float, secret: str | None = None) -> str:
+    """A PROFILE_HEADER value that allows profiling any request for `ttl` seconds."""
+    expires = str(int(time.time() + ttl))
+    return f"{expires}.{_signature(secret or settings.PROFILING_SECRET, expires)}"
+
+
+def _signature(secret: str, expires: str) -> str:
+    return hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+
+
+def verify_profile_token(value: str, secret: str | None) -> bool:
+    if not secret:
+        return False
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(secret, expires))
+
+
+# ---- Sampling
+
+class RequestProfile:
+    """
+    Samples one request's stacks every `interval` seconds on a helper thread.
+
+    The request's task is followed on the event loop: while it runs, the
+    loop thread's stack is recorded from the middleware frame down; while it
+    waits, its chain of awaited coroutines is, plus the stack of a worker
+    thread running its sync code (found through the context anyio copies
+    into the worker). A statement in flight is added as a `SQL ...` leaf.
+    Each sample weighs the wall time since the previous one.
+    """
+
+    def __init__(self, name: str, root, *, interval: float, max_seconds: float):
+        self.name = name
+        self.root = root
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.loop_thread = threading.get_ident()
+        self.task = asyncio.current_task()
+        self.samples: list[tuple] = []
+        self.weights: list[float] = []
+        self.statements: list[tuple[float, float, str]] = []
+        self._sql: tuple[float, str] | None = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.started = time.perf_counter()
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self.started
+        self._stopped.set()
+        self._thread.join()
+        if self._sql is not None:
+            self.sql_finished()
+
+    # SQL annotations; a request runs its statements one at a time
+    def sql_started(self, statement: str) -> None:
+        self._sql = (time.perf_counter(), " ".join(statement.split())[:SQL_NAME_LIMIT])
+
+    def sql_finished(self) -> None:
+        if self._sql is not None:
+            start, statement = self._sql
+            self._sql = None
+            self.statements.append((start - self.started, time.perf_counter() - self.started, statement))
+
+    def _run(self) -> None:
+        last = self.started
+        deadline = self.started + self.max_seconds
+        while not self._stopped.wait(self.interval):
+            now = time.perf_counter()
+            if now > deadline:
+                return
+            stack = self._sample()
+            if stack:
+                self.samples.append(stack)
+                self.weights.append(now - last)
+            last = now
+
+    def _sample(self) -> tuple | None:
+        frames = sys._current_frames()
+        running = _stack(frames.get(self.loop_thread))
+        stack = _from_root(running, self.root)
+        if stack is None:
+            stack = _from_root(_awaited(self.task.get_coro()), self.root)
+            if stack is None:
+                return None
+            worker = self._worker_stack(frames)
+            stack = stack + worker if worker else stack + ["[await]"]
+        keys = [frame if isinstance(frame, str) else frame.f_code for frame in stack]
+        sql = self._sql
+        if sql is not None:
+            keys.append("SQL " + sql[1])
+        return tuple(keys)
+
+    def _worker_stack(self, frames: dict) -> list | None:
+        if _WORKER_RUN is None:
+            return None
+        for thread_id, frame in frames.items():
+            if thread_id == self.loop_thread:
+                continue
+            stack = _stack(frame)
+            for i, f in enumerate(stack):
+                if f.f_code is _WORKER_RUN:
+                    context = f.f_locals.get("context")
+                    if context is not None and context.get(_profile) is self:
+                        return stack[i + 1:]
+                    break
+        return None
+
+    def speedscope(self) -> dict:
+        frames: list[dict] = []
+        index: dict = {}
+
+        def frame_id(key) -> int:
+            found = index.get(key)
+            if found is None:
+                if isinstance(key, str):
+                    frames.append({"name": key})
+                else:
+                    frames.append({"name": key.co_qualname, "file": key.co_filename, "line": key.co_firstlineno})
+                found = index[key] = len(frames) - 1
+            return found
+
+        samples = [[frame_id(key) for key in stack] for stack in self.samples]
+        events = []
+        for start, end, statement in self.statements:
+            sql = frame_id("SQL " + statement)
+            events.append({"type": "O", "frame": sql, "at": start})
+            events.append({"type": "C", "frame": sql, "at": end})
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": self.name,
+            "exporter": "project-management-tracker",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(self.weights),
+                    "samples": samples,
+                    "weights": self.weights,
+                },
+                {
+                    "type": "evented",
+                    "name": f"{self.name} (SQL)",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "events": events,
+                },
+            ],
+        }
+
+
+def _stack(frame) -> list:
+    """Frames from the outermost to `frame`."""
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _awaited(coro) -> list:
+    """Frames of a suspended task, following what each coroutine awaits."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return stack
+
+
+def _from_root(stack: list, root) -> list | None:
+    for i, frame in enumerate(stack):
+        if frame is root:
+            return stack[i:]
+    return None
+
+
+# ---- SQL hooks
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is not None:
+        profile.sql_started(statement)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is not None:
+        profile.sql_finished()
+
+
+def _handle_error(context):
+    profile = _profile.get()
+    if profile is not None:
+        profile.sql_finished()
+
+
+def instrument_engine(engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+# ---- Middleware
+
+def _add_header(send, name: bytes, value: bytes):
+    async def send_with_header(message):
+        if message["type"] == "http.response.start":
+            message["headers"] = [*message.get("headers", ()), (name, value)]
+        await send(message)
+
+    return send_with_header
+
+
+def _profile_name(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-") or "root"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand. A request is profiled when it
+    carries a valid `X-Profile-Token` (see `profile_token`) or `?profile=1`
+    from a user in PROFILING_ADMIN_USER_IDS, and fewer than
+    PROFILING_MAX_CONCURRENT are already being profiled (otherwise it is
+    served normally, marked `X-Profile: busy`).
+
+    The speedscope profile either replaces the response body (the
+    original status is in `X-Profiled-Status`) or, with PROFILING_DIR, is
+    written there and named in `X-Profile`.
+
+    Only added when PROFILING_ENABLED, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app, *, secret: str | None, admin_user_ids, directory: str | None,
+                 interval: float, max_concurrent: int, max_seconds: float):
+        self.app = app
+        self.secret = secret
+        self.admin_user_ids = frozenset(admin_user_ids)
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.max_seconds = max_seconds
+        self.active = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        # Counted on the event loop thread only, so no lock
+        if self.active >= self.max_concurrent:
+            await self.app(scope, receive, _add_header(send, b"x-profile", b"busy"))
+            return
+        self.active += 1
+        try:
+            await self._profiled(scope, receive, send)
+        finally:
+            self.active -= 1
+
+    async def _requested(self, scope) -> bool:
+        bearer = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return verify_profile_token(value.decode("latin-1"), self.secret)
+            if name == b"authorization":
+                bearer = value.decode("latin-1")
+        if not self.admin_user_ids or b"profile" not in scope["query_string"]:
+            return False
+        if dict(parse_qsl(scope["query_string"].decode("latin-1"))).get("profile") not in ("1", "true"):
+            return False
+        scheme, _, token = (bearer or "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            user_id = await run_in_threadpool(authenticate, token)
+        except HTTPException:
+            # The route rejects the request itself
+            return False
+        return user_id in self.admin_user_ids
+
+    async def _profiled(self, scope, receive, send):
+        name = f"{scope['method']} {scope['path']}"
+        profile = RequestProfile(name, sys._getframe(), interval=self.interval, max_seconds=self.max_seconds)
+        filename = None
+        if self.directory is not None:
+            filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{_profile_name(scope['path'])}-{uuid.uuid4().hex[:8]}.speedscope.json"
+            target = _add_header(send, b"x-profile", filename.encode())
+        else:
+            status = {}
+
+            async def target(message):
+                # The real response is dropped; the profile is sent instead
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+
+        token = _profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, target)
+        finally:
+            profile.stop()
+            _profile.reset(token)
+
+        document = json.dumps(profile.speedscope(), separators=(",", ":")).encode()
+        logger.info("Profiled %s: %d samples, %d SQL statements", name, len(profile.samples), len(profile.statements))
+        if filename is not None:
+            await run_in_threadpool(self._store, filename, document)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(document)).encode()),
+                (b"x-profiled-status", str(status.get("code", 500)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": document})
+
+    def _store(self, filename: str, document: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / filename).write_bytes(document)
+
+
+def add_profiling(app) -> None:
+    """Add the middleware; the lifespan hooks the engines once they exist."""
+    app.add_middleware(
+        ProfilingMiddleware,
+        secret=settings.PROFILING_SECRET,
+        admin_user_ids=settings.PROFILING_ADMIN_USER_IDS,
+        directory=settings.PROFILING_DIR,
+        interval=settings.PROFILING_INTERVAL,
+        max_concurrent=settings.PROFILING_MAX_CONCURRENT,
+        max_seconds=settings.PROFILING_MAX_SECONDS,
+    )
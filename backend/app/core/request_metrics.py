@@ -0,0 +1,183 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Every metric here is labelled with the route template (`/tasks/{task_id}`),
+# never the raw path, so the number of series stays fixed.
+LABELS = ("method", "route")
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from routing to the last byte of the response.",
+    LABELS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    LABELS,
+)
+SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request.",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+SQL_DURATION = Histogram(
+    "http_request_sql_seconds",
+    "Total time per request spent executing SQL statements.",
+    LABELS,
+)
+POOL_WAIT = Histogram(
+    "http_request_pool_wait_seconds",
+    "Total time per request spent waiting for a pooled connection.",
+    LABELS,
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+AUTH_DURATION = Histogram(
+    "http_request_auth_seconds",
+    "Time per request spent authenticating the bearer token.",
+    LABELS,
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+OVER_BUDGET = Counter(
+    "http_request_sql_budget_exceeded_total",
+    "Requests that ran more than SQL_QUERY_BUDGET statements.",
+    LABELS,
+)
+
+
+class RequestStats:
+    """Per-request accumulators, filled in by the hooks below."""
+
+    __slots__ = ("statements", "sql_seconds", "sql_started", "pool_wait", "auth_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.sql_started = 0.0
+        self.pool_wait = 0.0
+        self.auth_seconds = 0.0
+
+
+# Set for the duration of a route. Sync dependencies and handlers run on the
+# threadpool with a copy of the context, and SQLAlchemy's async greenlets
+# inherit it, so all of them see (and add to) the same RequestStats.
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request() -> RequestStats | None:
+    return _current.get()
+
+
+def record_pool_wait(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+def record_auth(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.auth_seconds += seconds
+
+
+# ---- SQL hooks
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_seconds += time.perf_counter() - stats.sql_started
+
+
+def _handle_error(context):
+    stats = _current.get()
+    if stats is not None and stats.sql_started:
+        stats.sql_seconds += time.perf_counter() - stats.sql_started
+
+
+def instrument_engine(engine) -> None:
+    """Count and time the statements `engine` runs on behalf of a request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# ---- Routes
+
+class _RouteMetrics:
+    """The metric children of one (method, route), resolved once at startup."""
+
+    __slots__ = ("method", "route", "duration", "in_flight", "statements", "sql", "pool_wait", "auth", "over_budget")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.duration = REQUEST_DURATION.labels(method, route)
+        self.in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+        self.statements = SQL_STATEMENTS.labels(method, route)
+        self.sql = SQL_DURATION.labels(method, route)
+        self.pool_wait = POOL_WAIT.labels(method, route)
+        self.auth = AUTH_DURATION.labels(method, route)
+        self.over_budget = OVER_BUDGET.labels(method, route)
+
+    def observe(self, seconds: float, stats: RequestStats) -> None:
+        self.duration.observe(seconds)
+        self.statements.observe(stats.statements)
+        self.sql.observe(stats.sql_seconds)
+        self.pool_wait.observe(stats.pool_wait)
+        self.auth.observe(stats.auth_seconds)
+        budget = settings.SQL_QUERY_BUDGET
+        if budget and stats.statements > budget:
+            self.over_budget.inc()
+            logger.warning(
+                "%s %s ran %d SQL statements (budget %d, %.1f ms in SQL, %.1f ms total)",
+                self.method, self.route, stats.statements, budget,
+                stats.sql_seconds * 1000, seconds * 1000,
+            )
+
+
+def _instrumented(app, by_method: dict[str, _RouteMetrics]):
+    async def instrumented(scope, receive, send):
+        metrics = by_method.get(scope["method"])
+        if metrics is None:
+            await app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        metrics.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await app(scope, receive, send)
+        finally:
+            metrics.in_flight.dec()
+            _current.reset(token)
+            metrics.observe(time.perf_counter() - start, stats)
+
+    return instrumented
+
+
+def instrument_routes(app) -> None:
+    """
+    Wrap the ASGI app of every API route. This runs after routing, so the
+    template is known without matching the path again; the wrapper covers
+    dependencies (auth, session), the handler and sending the response.
+    """
+    for route in app.router.routes:
+        if isinstance(route, APIRoute):
+            by_method = {method: _RouteMetrics(method, route.path) for method in route.methods}
+            route.app = _instrumented(route.app, by_method)
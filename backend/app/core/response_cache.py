@@ -0,0 +1,280 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from fastapi import Request, Response
+
+from app.core.metrics import Counter, Gauge
+from app.core.settings import settings
+from app.utils.etag import etag_matches, json_response, not_modified
+
+logger = logging.getLogger(__name__)
+
+LOOKUPS = Counter(
+    "response_cache_lookups_total",
+    "Response cache lookups by result (hit/miss).",
+    ("result",),
+)
+EVICTIONS = Counter(
+    "response_cache_evictions_total",
+    "Entries dropped from the in-process response cache to stay within bounds.",
+)
+CACHED_BYTES = Gauge(
+    "response_cache_bytes",
+    "Bytes held by the in-process response cache.",
+)
+CACHED_ENTRIES = Gauge(
+    "response_cache_entries",
+    "Entries held by the in-process response cache.",
+)
+_HITS = LOOKUPS.labels("hit")
+_MISSES = LOOKUPS.labels("miss")
+
+
+class MemoryBackend:
+    """
+    Per-process LRU bounded by entry count and total bytes; entries also
+    expire after `ttl` seconds. Only correct with a single worker: other
+    processes never see its generation bumps.
+
+    Generations live in their own LRU of `max_generations` scopes. Every
+    bump takes the next value of one process-wide counter, and a scope with
+    no generation reads as the counter's value at the last eviction. An
+    evicted scope therefore reads its own last value or a newer one: its
+    entries can miss once, but never come back stale.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, *, ttl: float | None = None, max_generations: int | None = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_generations = max_generations or 10 * max_entries
+        self.size_bytes = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        self._counter = 0
+        self._evicted_floor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.size_bytes -= len(value)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= len(old[1])
+            self._entries[key] = (expires, value)
+            self.size_bytes += len(value)
+            while self.size_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted)
+                EVICTIONS.inc()
+
+    def generations(self, scopes: list[str]) -> list[int]:
+        with self._lock:
+            result = []
+            for scope in scopes:
+                generation = self._generations.get(scope)
+                if generation is None:
+                    result.append(self._evicted_floor)
+                else:
+                    self._generations.move_to_end(scope)
+                    result.append(generation)
+            return result
+
+    def bump(self, scopes: list[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._counter += 1
+                self._generations[scope] = self._counter
+                self._generations.move_to_end(scope)
+            while len(self._generations) > self.max_generations:
+                self._generations.popitem(last=False)
+                self._evicted_floor = self._counter
+
+
+class RedisBackend:
+    """
+    Store shared by every worker. Entries expire after `ttl` seconds and the
+    server's maxmemory policy (allkeys-lru) bounds memory; generation
+    counters are plain INCR keys. `client` is anything with the redis-py
+    get/set/mget/incr methods, so tests can hand in a local stand-in.
+    """
+
+    def __init__(self, client=None, *, url: str | None = None, ttl: int = 300, prefix: str = "rc:"):
+        if client is None:
+            # Optional dependency, only needed when this backend is selected
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def generations(self, scopes: list[str]) -> list[int]:
+        values = self.client.mget([f"{self.prefix}gen:{scope}" for scope in scopes])
+        return [int(value or 0) for value in values]
+
+    def bump(self, scopes: list[str]) -> None:
+        for scope in scopes:
+            self.client.incr(f"{self.prefix}gen:{scope}")
+
+
+class CachedEntry(NamedTuple):
+    etag: str
+    body: bytes
+
+    def response(self, if_none_match: str | None) -> Response:
+        if etag_matches(if_none_match, self.etag):
+            return not_modified(self.etag)
+        return json_response(self.etag, self.body)
+
+
+def owner_scope(owner_id: str) -> str:
+    return f"owner:{owner_id}"
+
+
+def project_scope(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized list responses.
+
+    Keys combine the owner, path, query string and the current generation of
+    every scope the response depends on. Writers bump those generations after
+    committing, so older entries simply become unreachable and age out;
+    nothing is deleted eagerly. Backend errors degrade to a cache bypass.
+
+    With `backend=None` the cache is disabled but `put` still builds the
+    response, so handlers use one code path either way.
+    """
+
+    def __init__(self, backend: MemoryBackend | RedisBackend | None):
+        self.backend = backend
+
+    def key(self, owner_id: str, request: Request, *scopes: str) -> str | None:
+        if self.backend is None:
+            return None
+        try:
+            generations = self.backend.generations(list(scopes))
+        except Exception:
+            logger.warning("Response cache unavailable", exc_info=True)
+            return None
+        raw = "|".join((
+            owner_id,
+            request.url.path,
+            request.url.query,
+            *(f"{scope}={gen}" for scope, gen in zip(scopes, generations)),
+        ))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str | None) -> CachedEntry | None:
+        if key is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            logger.warning("Response cache unavailable", exc_info=True)
+            value = None
+        if value is None:
+            _MISSES.inc()
+            return None
+        _HITS.inc()
+        etag, _, body = value.partition(b"\n")
+        return CachedEntry(etag.decode(), body)
+
+    def put(self, key: str | None, etag: str, body: bytes) -> Response:
+        """Store an encoded response body and return it."""
+        if key is not None:
+            try:
+                self.backend.set(key, etag.encode() + b"\n" + body)
+            except Exception:
+                logger.warning("Response cache unavailable", exc_info=True)
+        return json_response(etag, body)
+
+    def bump(self, *scopes: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.bump(list(scopes))
+        except Exception:
+            # Entries for these scopes stay reachable until they expire
+            logger.error("Response cache invalidation failed for %s", scopes, exc_info=True)
+
+    def stats(self) -> dict:
+        hits, misses = _HITS.value, _MISSES.value
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": EVICTIONS.value,
+        }
+
+
+def build_response_cache() -> ResponseCache:
+    backend = settings.RESPONSE_CACHE_BACKEND
+    if backend == "memory":
+        return ResponseCache(MemoryBackend(
+            max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl=settings.RESPONSE_CACHE_TTL,
+        ))
+    if backend == "redis":
+        return ResponseCache(RedisBackend(url=settings.RESPONSE_CACHE_URL, ttl=settings.RESPONSE_CACHE_TTL))
+    return ResponseCache(None)
+
+
+_response_cache: ResponseCache | None = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = build_response_cache()
+    return _response_cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """Swap the process-wide response cache (tests, or a custom backend)."""
+    global _response_cache
+    _response_cache = cache
+
+
+def _memory_backend() -> MemoryBackend | None:
+    backend = _response_cache.backend if _response_cache is not None else None
+    return backend if isinstance(backend, MemoryBackend) else None
+
+
+CACHED_BYTES.set_function(lambda: getattr(_memory_backend(), "size_bytes", 0))
+CACHED_ENTRIES.set_function(lambda: len(_memory_backend() or ()))
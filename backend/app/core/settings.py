@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 import os
-from typing import List, Optional
+from typing import List, Literal, Optional
 import json
 
 class Settings(BaseSettings):
@@ -12,12 +12,96 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str 
 
+    # "sync" serves CRUD routes from the threadpool with a blocking Session,
+    # "async" serves them on the event loop with an AsyncSession.
+    DB_MODE: Literal["sync", "async"] = "sync"
+
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 5
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side statement_timeout for every connection (0 = no limit)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Connections opened per pool at startup, before the worker accepts
+    # requests (None = DB_POOL_SIZE, 0 = connect on demand)
+    DB_PREWARM_CONNECTIONS: Optional[int] = None
+
+    # AnyIO threadpool used for sync routes and dependencies
+    THREADPOOL_SIZE: int = 40
+    # In-flight request cap before answering 503 (None = pool capacity, 0 = off)
+    MAX_IN_FLIGHT_REQUESTS: Optional[int] = None
+    ADMISSION_RETRY_AFTER: int = 1
+
     CLERK_JWKS_URL: str 
     CLERK_ISSUER: str 
     CLERK_AUDIENCE: Optional[str] = None
 
+    # JWKS key store (seconds)
+    JWKS_CACHE_TTL: float = 3600
+    JWKS_MIN_TTL: float = 60
+    JWKS_MAX_TTL: float = 86400
+    JWKS_REFRESH_AHEAD: float = 60
+    JWKS_MIN_REFRESH_INTERVAL: float = 30
+    JWKS_FETCH_TIMEOUT: float = 5
+    # Fetch the keys at startup instead of on the first request
+    JWKS_PREWARM: bool = True
+
+    # Verified-token cache (0 disables it)
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_CLOCK_SKEW: float = 30
+
     CORS_ORIGINS: List[str] = []
 
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+
+    # Largest accepted batch for the tasks:batch endpoints
+    MAX_BATCH_SIZE: int = 500
+
+    # Rows fetched per server-side cursor round trip by the /export endpoints
+    EXPORT_BATCH_SIZE: int = 2000
+
+    # Bulk task import: rows accepted per upload, per-line errors reported
+    IMPORT_MAX_ROWS: int = 100000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # /changes stream: NOTIFY on every write (off = no extra statement),
+    # frames buffered per slow client before it is told to resync, idle
+    # seconds between heartbeats, delay before LISTEN reconnects
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_QUEUE_SIZE: int = 100
+    CHANGE_FEED_HEARTBEAT: float = 15
+    CHANGE_FEED_RECONNECT_DELAY: float = 1
+
+    # Per-route latency, SQL, pool-wait and auth metrics on /metrics; requests
+    # running more than SQL_QUERY_BUDGET statements are logged (0 = no limit)
+    REQUEST_METRICS_ENABLED: bool = True
+    SQL_QUERY_BUDGET: int = 0
+
+    # On-demand profiling of single requests (speedscope JSON). Requested
+    # with an X-Profile-Token signed by PROFILING_SECRET, or ?profile=1 from
+    # one of PROFILING_ADMIN_USER_IDS. Profiles replace the response body
+    # unless PROFILING_DIR is set.
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: Optional[str] = None
+    PROFILING_ADMIN_USER_IDS: List[str] = []
+    PROFILING_DIR: Optional[str] = None
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_MAX_CONCURRENT: int = 1
+    PROFILING_MAX_SECONDS: float = 30
+
+    # Cache of serialized list responses: "none", "memory" (opt in for a
+    # single worker only: other workers never see its invalidations) or
+    # "redis" (shared by all workers, needs the redis package). Entries of
+    # both expire after RESPONSE_CACHE_TTL seconds
+    RESPONSE_CACHE_BACKEND: Literal["memory", "redis", "none"] = "none"
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_URL: Optional[str] = None
+    RESPONSE_CACHE_TTL: int = 300
+
     
 
 settings = Settings()
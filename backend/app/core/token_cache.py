@@ -0,0 +1,104 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from app.core.settings import settings
+
+
+class VerifiedTokenCache:
+    """
+    Bounded, thread-safe LRU of tokens that already passed verification.
+
+    Entries are keyed by a SHA-256 of the token plus the issuer/audience it
+    was checked against, so raw tokens are never kept in memory and changing
+    those settings can't reuse an old verdict. Each entry dies at the token's
+    `exp` minus the clock skew allowance. The whole cache is dropped when the
+    signing key set changes (`keys_version` differs from the one stored).
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        clock_skew: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_size = max_size
+        self.clock_skew = clock_skew
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+        self._keys_version: Hashable = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _cache_key(token: str) -> bytes:
+        digest = hashlib.sha256()
+        digest.update(token.encode())
+        digest.update(b"\0" + (settings.CLERK_ISSUER or "").encode())
+        digest.update(b"\0" + (settings.CLERK_AUDIENCE or "").encode())
+        return digest.digest()
+
+    def get(self, token: str, keys_version: Hashable) -> str | None:
+        if self.max_size <= 0:
+            return None
+        key = self._cache_key(token)
+        with self._lock:
+            if keys_version != self._keys_version:
+                self._entries.clear()
+                self._keys_version = keys_version
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            user_id, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user_id
+
+    def put(self, token: str, user_id: str, exp, keys_version: Hashable) -> None:
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        expires_at = exp - self.clock_skew
+        if self._clock() >= expires_at:
+            return
+
+        key = self._cache_key(token)
+        with self._lock:
+            if keys_version != self._keys_version:
+                self._entries.clear()
+                self._keys_version = keys_version
+            self._entries[key] = (user_id, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+token_cache = VerifiedTokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    clock_skew=settings.TOKEN_CACHE_CLOCK_SKEW,
+)
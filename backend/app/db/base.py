@@ -1,5 +1,9 @@
 from sqlalchemy.orm import DeclarativeBase
 
+# The writing transaction's id (xid8, as a bigint). Stamped on every insert
+# and update of a synced table; see app/utils/sync.py for how it's read.
+CURRENT_XID = "pg_current_xact_id()::text::bigint"
+
+
 class Base(DeclarativeBase):
     pass
-
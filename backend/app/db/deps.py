@@ -1,12 +1,14 @@
-from typing import Generator
-from app.db.sessions import SessionLocal
+from typing import AsyncGenerator, Generator
+from app.db.sessions import get_database
 
 def get_db() -> Generator:
-    db = SessionLocal()
+    db = get_database().SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 
-
+async def get_async_db() -> AsyncGenerator:
+    async with get_database().AsyncSessionLocal() as db:
+        yield db
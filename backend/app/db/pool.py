@@ -0,0 +1,64 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.request_metrics import record_pool_wait
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT.",
+    ("engine",),
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ("engine",),
+)
+POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Maximum connections the pool may hold (pool_size + max_overflow).",
+    ("engine",),
+)
+
+
+class _TimedCheckoutMixin:
+    """Records how long each checkout waited for a connection."""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(waited)
+            record_pool_wait(waited)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def register_pool_gauges(label: str, engine, capacity: int) -> None:
+    """
+    Expose saturation of `engine`'s pool. The checked-out count is read at
+    scrape time, through the engine since dispose() replaces the pool.
+    """
+    POOL_CHECKED_OUT.labels(label).set_function(lambda: engine.pool.checkedout())
+    POOL_CAPACITY.labels(label).set(capacity)
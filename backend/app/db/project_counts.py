@@ -0,0 +1,168 @@
+"""
+Recompute the per-project task counters and report drift.
+
+The counters on projects are kept by triggers on tasks (migration
+e7a3c1f9b524). This walks the projects in id order, `--batch-size` at a
+time, and compares each stored counter with a fresh count of its tasks.
+Unless `--check` is given, drifted projects are corrected. Each batch is
+one short transaction that locks its project rows first, so concurrent task
+writes wait for it instead of racing it.
+
+    python -m app.db.project_counts
+    python -m app.db.project_counts --check --batch-size 5000
+
+With `--check` the exit status is 1 when any project has drifted.
+"""
+import argparse
+import sys
+from dataclasses import dataclass, field
+
+from sqlalchemy import and_, bindparam, func, literal_column, select, true, update
+from sqlalchemy.orm import Session
+
+from app.core.response_cache import get_response_cache, owner_scope
+from app.db.base import CURRENT_XID
+from app.db.sessions import get_database
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.task import TaskStatus
+
+# Counter column -> the tasks it counts. Must match the trigger function.
+COUNTERS = {
+    "task_count": true(),
+    "not_started_count": Task.status == TaskStatus.not_started,
+    "in_progress_count": Task.status == TaskStatus.in_progress,
+    "done_count": Task.status == TaskStatus.done,
+    "open_with_deadline_count": and_(Task.status != TaskStatus.done, Task.deadline.is_not(None)),
+}
+
+
+@dataclass(frozen=True)
+class Drift:
+    project_id: int
+    owner_id: str
+    stored: dict[str, int]
+    actual: dict[str, int]
+
+    def describe(self) -> str:
+        changes = ", ".join(
+            f"{name} {self.stored[name]} -> {self.actual[name]}"
+            for name in COUNTERS
+            if self.stored[name] != self.actual[name]
+        )
+        return f"project {self.project_id} (owner {self.owner_id}): {changes}"
+
+
+@dataclass
+class ReconcileResult:
+    checked: int = 0
+    drifted: list[Drift] = field(default_factory=list)
+
+
+def batch_ids_statement(after_id: int, batch_size: int, *, lock: bool):
+    stmt = select(Project.id).where(Project.id > after_id).order_by(Project.id).limit(batch_size)
+    # NO KEY UPDATE, like the triggers' own updates; task inserts only need
+    # KEY SHARE on their project, so they aren't blocked by it
+    return stmt.with_for_update(key_share=True) if lock else stmt
+
+
+def compare_statement(first_id: int, last_id: int):
+    """Stored and recounted values for the projects with ids in [first_id, last_id]."""
+    actual = (
+        select(Task.project_id, *[func.count().filter(c).label(name) for name, c in COUNTERS.items()])
+        .where(Task.project_id.between(first_id, last_id))
+        .group_by(Task.project_id)
+        .subquery()
+    )
+    return (
+        select(
+            Project.id,
+            Project.owner_id,
+            *[Project.__table__.c[name] for name in COUNTERS],
+            *[func.coalesce(actual.c[name], 0).label(f"actual_{name}") for name in COUNTERS],
+        )
+        .outerjoin(actual, actual.c.project_id == Project.id)
+        .where(Project.id.between(first_id, last_id))
+        .order_by(Project.id)
+    )
+
+
+def fix_statement():
+    """executemany UPDATE setting every counter; stamps change_xid like the triggers do."""
+    table = Project.__table__
+    return (
+        update(table)
+        .where(table.c.id == bindparam("drifted_id"))
+        .values(
+            **{name: bindparam(f"new_{name}") for name in COUNTERS},
+            change_xid=literal_column(CURRENT_XID),
+        )
+    )
+
+
+def reconcile_batch(db: Session, after_id: int, batch_size: int, *, fix: bool) -> tuple[int | None, int, list[Drift]]:
+    """
+    Check the next batch of projects after `after_id`. Returns the last id
+    checked (None when there were none left), how many were checked and the
+    drifted ones. The caller commits.
+    """
+    ids = db.scalars(batch_ids_statement(after_id, batch_size, lock=fix)).all()
+    if not ids:
+        return None, 0, []
+
+    drifted = []
+    for row in db.execute(compare_statement(ids[0], ids[-1])):
+        stored = {name: row._mapping[name] for name in COUNTERS}
+        actual = {name: row._mapping[f"actual_{name}"] for name in COUNTERS}
+        if stored != actual:
+            drifted.append(Drift(row.id, row.owner_id, stored, actual))
+
+    if fix and drifted:
+        db.execute(fix_statement(), [
+            {"drifted_id": d.project_id, **{f"new_{name}": d.actual[name] for name in COUNTERS}}
+            for d in drifted
+        ])
+    return ids[-1], len(ids), drifted
+
+
+def reconcile(session_factory, *, batch_size: int = 1000, fix: bool = True, report=None) -> ReconcileResult:
+    """Walk every project in batches; `report` is called with each Drift."""
+    result = ReconcileResult()
+    after_id = 0
+    while True:
+        with session_factory() as db:
+            last_id, checked, drifted = reconcile_batch(db, after_id, batch_size, fix=fix)
+            db.commit()
+        if last_id is None:
+            return result
+        if fix and drifted:
+            # Only reaches other workers with a shared (redis) cache backend
+            get_response_cache().bump(*{owner_scope(d.owner_id) for d in drifted})
+        if report is not None:
+            for drift in drifted:
+                report(drift)
+        result.checked += checked
+        result.drifted.extend(drifted)
+        after_id = last_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--check", action="store_true", help="only report drift, don't correct it")
+    args = parser.parse_args()
+
+    result = reconcile(
+        get_database().SessionLocal,
+        batch_size=args.batch_size,
+        fix=not args.check,
+        report=lambda drift: print(drift.describe()),
+    )
+    action = "found" if args.check else "fixed"
+    print(f"Checked {result.checked} projects, {action} drift in {len(result.drifted)}")
+    if args.check and result.drifted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
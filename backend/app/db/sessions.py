@@ -1,9 +1,107 @@
+import asyncio
+import threading
+
+import anyio.to_thread
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.settings import settings
+from app.core.request_metrics import instrument_engine
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, register_pool_gauges
+
+
+def engine_options() -> dict:
+    options = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+def pool_capacity() -> int:
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+
+class Database:
+    """
+    The process's engines and session factories. Nothing here connects
+    until the first checkout (or `prewarm`).
+    """
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url, poolclass=InstrumentedQueuePool, **engine_options())
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        # postgresql+psycopg:// resolves to psycopg3's async driver here.
+        self.async_engine = create_async_engine(
+            url, poolclass=InstrumentedAsyncQueuePool, **engine_options()
+        )
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False
+        )
+
+        register_pool_gauges("sync", self.engine, pool_capacity())
+        register_pool_gauges("async", self.async_engine, pool_capacity())
+        instrument_engine(self.engine)
+        instrument_engine(self.async_engine.sync_engine)
+
+    async def prewarm(self, connections: int, *, use_async: bool) -> None:
+        """
+        Open `connections` connections at once in the sync pool (and the async
+        one if `use_async`) and return them, so the first requests find them
+        idle instead of paying for connect, auth and first-connect setup.
+        """
+        if connections <= 0:
+            return
+        opened = await asyncio.gather(
+            *(anyio.to_thread.run_sync(self.engine.connect) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        if use_async:
+            opened += await asyncio.gather(
+                *(self.async_engine.connect().start() for _ in range(connections)),
+                return_exceptions=True,
+            )
+        errors = [conn for conn in opened if isinstance(conn, BaseException)]
+        for conn in opened:
+            if not isinstance(conn, BaseException):
+                closed = conn.close()
+                if asyncio.iscoroutine(closed):
+                    await closed
+        if errors:
+            raise errors[0]
+
+
+_database: Database | None = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = Database(settings.DATABASE_URL)
+    return _database
+
 
+def set_database(database: Database | None) -> None:
+    """Swap the process-wide Database (tests, benchmarks)."""
+    global _database
+    _database = database
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind = engine)
 
+def __getattr__(name: str):
+    # `from app.db.sessions import engine` etc. still work, but build the
+    # Database on first access instead of at import
+    if name in ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal"):
+        return getattr(get_database(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,31 +1,163 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.settings import settings
-from app.api.v1.projects import router as projects_router
-from app.api.v1.tasks import router as tasks_router
+if TYPE_CHECKING:
+    from app.db.sessions import Database
 
+# Everything else (settings, the database layer, jose, the routers and what
+# they pull in) is imported by create_app() and the lifespan, so importing
+# this module stays cheap for uvicorn's master process, tests and scripts.
 
+logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    import anyio.to_thread
 
-app = FastAPI(title="Project Management Tracker")
+    from app.core.settings import settings
+    from app.db.sessions import get_database
 
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # Engines are built here, not at import; uvicorn only starts accepting
+    # connections once this returns, so the first request finds them warm
+    database = get_database()
+    if settings.PROFILING_ENABLED:
+        from app.core.profiling import instrument_engine
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"])
+        instrument_engine(database.engine)
+        instrument_engine(database.async_engine.sync_engine)
+    await prewarm(database, use_async=app.state.db_mode == "async")
+    yield
+    await app.state.change_feed.close()
+    # Async connections are bound to this event loop; don't let them outlive it
+    await database.async_engine.dispose()
 
 
+async def prewarm(database: "Database", *, use_async: bool) -> None:
+    """
+    Fill the pool(s), fetch the JWKS and configure the ORM mappers before
+    serving. A failure is logged and the worker starts anyway: requests
+    connect and fetch on demand.
+    """
+    from fastapi.concurrency import run_in_threadpool
+    from sqlalchemy.orm import configure_mappers
 
+    from app.core.jwks import KeyStoreUnavailable, get_key_store
+    from app.core.settings import settings
 
-app.include_router(projects_router)
-app.include_router(tasks_router)
+    start = time.perf_counter()
+    # Otherwise done by the first query that touches a model
+    configure_mappers()
+    connections = settings.DB_PREWARM_CONNECTIONS
+    if connections is None:
+        connections = settings.DB_POOL_SIZE
+    try:
+        await database.prewarm(connections, use_async=use_async)
+    except Exception:
+        logger.warning("Could not prewarm database connections", exc_info=True)
+    if settings.JWKS_PREWARM:
+        try:
+            await run_in_threadpool(get_key_store().refresh)
+        except KeyStoreUnavailable:
+            logger.warning("No signing keys at startup; the first requests will retry the fetch")
+    logger.info("Prewarmed in %.0f ms", (time.perf_counter() - start) * 1000)
 
 
-@app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+def metrics():
+    from fastapi.responses import PlainTextResponse
+
+    from app.core.metrics import REGISTRY
+
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def create_app(db_mode: str | None = None) -> FastAPI:
+    """
+    Build the API. `db_mode` overrides settings.DB_MODE and picks whether the
+    project/task CRUD routes run sync (threadpool) or async (event loop).
+    """
+    from fastapi.middleware.cors import CORSMiddleware
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    from app.api.v1.changes import router as changes_router
+    from app.api.v1.dashboard import router as dashboard_router
+    from app.api.v1.exports import router as exports_router
+    from app.api.v1.search import router as search_router
+    from app.api.v1.sync import router as sync_router
+    from app.api.v1.task_batches import router as task_batches_router
+    from app.api.v1.task_imports import router as task_imports_router
+    from app.core.admission import AdmissionControlMiddleware, pool_timeout_handler
+    from app.core.change_feed import build_change_feed
+    from app.core.request_metrics import instrument_routes
+    from app.core.settings import settings
+    from app.db.sessions import pool_capacity
+
+    db_mode = db_mode or settings.DB_MODE
+
+    app = FastAPI(title="Project Management Tracker", lifespan=lifespan)
+    app.state.db_mode = db_mode
+    # Per-worker fan-out of LISTEN/NOTIFY; connects on the first /changes
+    app.state.change_feed = build_change_feed()
+
+    if settings.PROFILING_ENABLED:
+        from app.core.profiling import add_profiling
+
+        # Innermost, so only requests admitted to a route are profiled
+        add_profiling(app)
+
+    max_in_flight = settings.MAX_IN_FLIGHT_REQUESTS
+    if max_in_flight is None:
+        max_in_flight = pool_capacity()
+    if max_in_flight > 0:
+        app.add_middleware(AdmissionControlMiddleware, max_in_flight=max_in_flight)
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+    # Added last so it wraps admission control and 503s carry CORS headers
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag"])
+
+    # Only the CRUD routers of the mode in use are imported
+    if db_mode == "async":
+        from app.api.v1.projects_async import router as projects_router
+        from app.api.v1.tasks_async import router as tasks_router
+    else:
+        from app.api.v1.projects import router as projects_router
+        from app.api.v1.tasks import router as tasks_router
+    app.include_router(projects_router)
+    app.include_router(tasks_router)
+    app.include_router(task_batches_router)
+    app.include_router(dashboard_router)
+    app.include_router(exports_router)
+    app.include_router(task_imports_router)
+    app.include_router(changes_router)
+    app.include_router(sync_router)
+    app.include_router(search_router)
+
+    app.get("/health")(health_check)
+    app.get("/metrics", include_in_schema=False)(metrics)
+    if settings.REQUEST_METRICS_ENABLED:
+        instrument_routes(app)
+    return app
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` builds the default app on first access, so
+    # importing this module (tests, scripts, create_app callers) stays cheap
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
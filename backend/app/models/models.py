@@ -1,2 +1,3 @@
 from app.models.project import Project  # noqa: F401
-from app.models.task import Task        # noqa: F401
\ No newline at end of file
+from app.models.task import Task        # noqa: F401
+from app.models.tombstone import Tombstone  # noqa: F401
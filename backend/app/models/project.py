@@ -1,17 +1,22 @@
 from datetime import datetime
 
-from sqlalchemy import String, Text, DateTime, func
+from sqlalchemy import BigInteger, Computed, Index, Integer, String, Text, DateTime, func, literal_column, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
+from app.db.base import Base, CURRENT_XID
 
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_owner_id_id", "owner_id", "id"),
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    owner_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    owner_id: Mapped[str] = mapped_column(String(255), nullable=False)
 
     name: Mapped[str] = mapped_column(String(120), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -23,6 +28,33 @@ class Project(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+    # Last writing transaction, for /sync. Not indexed: an owner has few
+    # projects, so ix_projects_owner_id_id narrows a sync enough
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, server_default=text(CURRENT_XID), onupdate=literal_column(CURRENT_XID), nullable=False
+    )
+
+    # Task totals, kept by statement-level triggers on tasks (migration
+    # e7a3c1f9b524) so every write path updates them; never written here.
+    # `python -m app.db.project_counts` recomputes them and reports drift.
+    task_count: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    not_started_count: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    in_progress_count: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    done_count: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    # Open tasks with a deadline, i.e. the ones that can become overdue
+    open_with_deadline_count: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+
+    # Full-text search (/search), names weighted above descriptions. As on
+    # tasks, deferred, and the trigram index on name isn't declared here.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', name), 'A')"
+            " || setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     # relationships
     tasks = relationship(
@@ -1,18 +1,38 @@
 from datetime import datetime
 
 from app.schemas.task import TaskPriority, TaskStatus
-from sqlalchemy import Enum as SAEnum, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Enum as SAEnum, BigInteger, Computed, DateTime, ForeignKey, Index, Integer, String, literal_column, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
-from app.db.base import Base
+from app.db.base import Base, CURRENT_XID
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Every query is owner-scoped, so indexes lead with owner_id and end with
+    # the column the list endpoints order or page by (see migration 8b1f4c2d9e07).
+    __table_args__ = (
+        Index("ix_tasks_owner_id_id", "owner_id", "id"),
+        Index("ix_tasks_owner_id_project_id_id", "owner_id", "project_id", "id"),
+        Index("ix_tasks_owner_id_status_deadline", "owner_id", "status", "deadline"),
+        Index("ix_tasks_owner_id_deadline_id", "owner_id", "deadline", "id"),
+        Index("ix_tasks_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        Index("ix_tasks_owner_id_change_xid", "owner_id", "change_xid"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        # Open work only: overdue/upcoming lookups skip finished tasks
+        Index(
+            "ix_tasks_open_owner_id_deadline",
+            "owner_id",
+            "deadline",
+            postgresql_where=text("status <> 'done'"),
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
 
+    # Kept on its own for the ON DELETE CASCADE lookup when a project is deleted
     project_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("projects.id", ondelete="CASCADE"),
@@ -21,21 +41,19 @@ class Task(Base):
     )
 
    
-    owner_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    owner_id: Mapped[str] = mapped_column(String(255), nullable=False)
 
     title: Mapped[str] = mapped_column(String(200), nullable=False)
 
     status: Mapped[TaskStatus] = mapped_column(
         SAEnum(TaskStatus, name="task_status"),
         nullable=False,
-        index=True,
         default=TaskStatus.not_started,
     )
 
     priority: Mapped[TaskPriority] = mapped_column(
         SAEnum(TaskPriority, name="task_priority"),
         nullable=False,
-        index=True,
         default=TaskPriority.medium,
     )
 
@@ -43,7 +61,6 @@ class Task(Base):
     deadline: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
-        index=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
@@ -57,6 +74,22 @@ class Task(Base):
         onupdate=func.now(),
         nullable=False,
     )
+    # Last writing transaction, for /sync
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=text(CURRENT_XID),
+        onupdate=literal_column(CURRENT_XID),
+        nullable=False,
+    )
+
+    # Full-text search (/search). Deferred so ORM loads don't fetch it.
+    # The trigram index on title exists only where pg_trgm is installed
+    # (migration d2e8b5c71a90), so it isn't declared here.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english', title)", persisted=True),
+        deferred=True,
+    )
 
     # relationships
     project = relationship("Project", back_populates="tasks", passive_deletes=True)
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, CURRENT_XID
+
+
+class Tombstone(Base):
+    """
+    A deleted project or task, kept so /sync can tell clients about it.
+    Tasks removed by their project's cascade get no row of their own.
+    """
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_owner_id_change_xid", "owner_id", "change_xid"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    owner_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    # "project" or "task"
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    project_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default=text(CURRENT_XID), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+from app.schemas.project import ProjectRead
+from app.schemas.task import TaskPriority, TaskRead, TaskStatus
+
+
+class ProjectRollup(BaseModel):
+    project_id: int
+    name: str
+    task_count: int = 0
+    status_counts: dict[TaskStatus, int]
+    overdue_count: int = 0
+
+
+class DashboardRead(BaseModel):
+    project_count: int
+    task_count: int
+    status_counts: dict[TaskStatus, int]
+    priority_counts: dict[TaskPriority, int]
+    overdue_count: int
+    upcoming_count: int
+    upcoming: list[TaskRead]
+    projects: list[ProjectRollup]
+    # Most recently updated first
+    recent_projects: list[ProjectRead]
@@ -21,5 +21,10 @@ class ProjectRead(BaseModel):
     description: str | None = None
     created_at: datetime
     updated_at: datetime
+    task_count: int = 0
+    not_started_count: int = 0
+    in_progress_count: int = 0
+    done_count: int = 0
+    open_with_deadline_count: int = 0
 
     model_config = {"from_attributes": True}
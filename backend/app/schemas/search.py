@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    type: Literal["project", "task"]
+    id: int
+    # A project's own id for project hits
+    project_id: int
+    title: str
+    # HTML-escaped excerpt with the matched words wrapped in <mark>
+    snippet: str
+    rank: float
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from app.schemas.project import ProjectRead
+from app.schemas.task import TaskRead
+
+
+class SyncDeleted(BaseModel):
+    projects: list[int]
+    # A deleted project's tasks are not listed; drop them with the project
+    tasks: list[int]
+
+
+class SyncRead(BaseModel):
+    # Pass back as `since` next time
+    cursor: str
+    projects: list[ProjectRead]
+    tasks: list[TaskRead]
+    deleted: SyncDeleted
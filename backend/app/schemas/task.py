@@ -1,6 +1,9 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from enum import Enum
+from typing import Any
+
+from app.schemas.pagination import Page
 
 
 class TaskStatus(str, Enum):
@@ -42,3 +45,60 @@ class TaskRead(BaseModel):
     deadline: datetime | None = None
     created_at: datetime
     updated_at: datetime
+
+
+class DueBucket(str, Enum):
+    # /tasks/upcoming: due later today, in the next six days, or after that
+    # /tasks/overdue: due earlier today, in the previous six days, or before
+    today = "today"
+    this_week = "this_week"
+    later = "later"
+    earlier = "earlier"
+
+
+class DueTaskRead(TaskRead):
+    bucket: DueBucket
+
+
+class DueTaskPage(Page[DueTaskRead]):
+    # Open tasks per bucket, counted for the first page only
+    counts: dict[DueBucket, int] | None = None
+
+
+class TaskUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBatchRequest(BaseModel):
+    # Items are validated one by one so a bad item fails alone
+    items: list[dict[str, Any]]
+
+
+class TaskBatchItemResult(BaseModel):
+    index: int
+    status: int
+    task: TaskRead | None = None
+    error: Any = None
+
+
+class TaskBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[TaskBatchItemResult]
+
+
+class TaskImportRow(TaskCreate):
+    project_id: int
+
+
+class TaskImportError(BaseModel):
+    line: int
+    error: Any
+
+
+class TaskImportResult(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    # Capped at IMPORT_MAX_ERRORS; `failed` is always the full count
+    errors: list[TaskImportError]
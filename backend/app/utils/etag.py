@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+import hashlib
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import false, func, select
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Owner-scoped responses: the browser may keep them but must revalidate
+CACHE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def _micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def fingerprint_statement(model, *where):
+    """
+    (count, max id, max updated_at, sum of change_xid) over a scope. Any
+    insert, update or delete inside the scope changes at least one of them:
+    a write stamps its rows with its own transaction id, even where
+    updated_at (the transaction's start) doesn't move the maximum.
+    """
+    return select(
+        func.count(model.id),
+        func.max(model.id),
+        func.max(model.updated_at),
+        func.sum(model.change_xid),
+    ).where(*where)
+
+
+def list_etag(fingerprint, request: Request, owner_id: str) -> str:
+    """
+    Strong ETag for a list response. The query string is part of it, since
+    paging and filter parameters change the representation.
+    """
+    count, max_id, max_updated_at, xid_sum = fingerprint
+    raw = "|".join((
+        owner_id,
+        request.url.path,
+        request.url.query,
+        str(count),
+        str(max_id),
+        str(_micros(max_updated_at)) if max_updated_at else "",
+        str(xid_sum),
+    ))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def item_etag(kind: str, item_id: int, updated_at: datetime, revision: int | None = None) -> str:
+    """
+    The version is readable so If-Match can go straight into a WHERE clause.
+    `revision` marks changes to derived fields (a project's task counters):
+    it changes the tag for If-None-Match, but If-Match only checks
+    updated_at, so those changes don't fail an edit.
+    """
+    if revision is None:
+        return f'"{kind}-{item_id}-{_micros(updated_at)}"'
+    return f'"{kind}-{item_id}-{_micros(updated_at)}.{revision}"'
+
+
+def _entity_tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    tags = [tag.removeprefix("W/") for tag in _entity_tags(if_none_match)]
+    return "*" in tags or etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, **CACHE_HEADERS},
+    )
+
+
+def json_response(etag: str, body: bytes) -> Response:
+    """Pre-encoded JSON body with its validators."""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, **CACHE_HEADERS},
+    )
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers.update(CACHE_HEADERS)
+
+
+def if_match_condition(if_match: str | None, kind: str, item_id: int, column):
+    """
+    WHERE clause enforcing an If-Match precondition on one row, or None when
+    there is nothing to enforce. Strong comparison: weak or foreign tags
+    never match.
+    """
+    if if_match is None:
+        return None
+    tags = _entity_tags(if_match)
+    if "*" in tags:
+        return None
+
+    prefix = f'"{kind}-{item_id}-'
+    versions = []
+    for tag in tags:
+        if tag.startswith(prefix) and tag.endswith('"'):
+            try:
+                micros = tag[len(prefix):-1].partition(".")[0]
+                versions.append(EPOCH + timedelta(microseconds=int(micros)))
+            except ValueError:
+                continue
+    return column.in_(versions) if versions else false()
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource has been modified",
+    )
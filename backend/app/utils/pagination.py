@@ -0,0 +1,206 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    A column a list endpoint can be ordered by.
+
+    `parse` turns the JSON value stored in a cursor back into something the
+    column can be compared with. Rows are always tie-broken by their id.
+    """
+    name: str
+    column: Any
+    parse: Callable[[Any], Any]
+    nullable: bool = False
+
+
+def clamp_page_size(limit: int | None) -> int:
+    if limit is None:
+        return settings.DEFAULT_PAGE_SIZE
+    return max(1, min(limit, settings.MAX_PAGE_SIZE))
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        payload = None
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return payload
+
+
+def _after_condition(sort: SortKey, id_column, value, last_id: int, descending: bool):
+    """
+    WHERE clause selecting rows strictly after (value, last_id) in the order
+    produced by `_order_by`. NULL sort values always sort last.
+    """
+    next_id = id_column < last_id if descending else id_column > last_id
+    if value is None:
+        return and_(sort.column.is_(None), next_id)
+
+    past = sort.column < value if descending else sort.column > value
+    condition = or_(past, and_(sort.column == value, next_id))
+    if sort.nullable:
+        return or_(condition, sort.column.is_(None))
+    # Implied by the OR, but a plain range the index scan can start from
+    # instead of filtering every row before the cursor
+    reached = sort.column <= value if descending else sort.column >= value
+    return and_(reached, condition)
+
+
+def _order_by(sort: SortKey, id_column, descending: bool) -> list:
+    if sort.column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    column = sort.column.desc() if descending else sort.column.asc()
+    if sort.nullable:
+        column = column.nulls_last()
+    return [column, id_column.desc() if descending else id_column.asc()]
+
+
+def _cursor_filter(sort: SortKey, id_column, after: str, descending: bool):
+    cursor = decode_cursor(after)
+    if cursor.get("s") != sort.name or cursor.get("d") != descending:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested sort",
+        )
+    try:
+        value = cursor.get("v")
+        value = None if value is None else sort.parse(value)
+        last_id = int(cursor["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return _after_condition(sort, id_column, value, last_id, descending)
+
+
+def page_statement(stmt, *, sort: SortKey, id_column, page_size: int, after: str | None, descending: bool):
+    """Apply the cursor, ordering and a one-row lookahead limit to `stmt`."""
+    if after:
+        stmt = stmt.where(_cursor_filter(sort, id_column, after, descending))
+    return stmt.order_by(*_order_by(sort, id_column, descending)).limit(page_size + 1)
+
+
+def bare_list_statement(stmt, *order_by):
+    """
+    The unpaginated list older clients get. Fetches one row past
+    MAX_PAGE_SIZE so `bare_list` can tell a complete list from a cut one.
+    """
+    return stmt.order_by(*order_by).limit(settings.MAX_PAGE_SIZE + 1)
+
+
+def bare_list(rows: list) -> list:
+    """
+    Rows of `bare_list_statement`. A list longer than MAX_PAGE_SIZE is
+    refused rather than silently cut short: the client has to page it.
+    """
+    if len(rows) > settings.MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {settings.MAX_PAGE_SIZE} results; page through them with limit and after",
+        )
+    return rows
+
+
+def count_statement(stmt):
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def page_envelope(rows: list, *, sort: SortKey, id_column, page_size: int, descending: bool, total: int | None) -> dict:
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            "s": sort.name,
+            "d": descending,
+            "v": getattr(last, sort.name),
+            "id": getattr(last, id_column.key),
+        })
+
+    return {
+        "items": rows,
+        "page_size": page_size,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+
+
+def paginate(
+    db: Session,
+    stmt,
+    *,
+    sort: SortKey,
+    id_column,
+    limit: int | None,
+    after: str | None,
+    descending: bool = False,
+    include_total: bool = False,
+) -> dict:
+    """
+    Keyset-paginate a select() of columns.
+
+    Returns the `{items, page_size, total, next_cursor}` envelope. `total` is
+    only counted when asked for, since it costs a second scan of the filtered
+    rows.
+    """
+    page_size = clamp_page_size(limit)
+    total = db.scalar(count_statement(stmt)) if include_total else None
+    rows = db.execute(
+        page_statement(stmt, sort=sort, id_column=id_column, page_size=page_size, after=after, descending=descending)
+    ).all()
+    return page_envelope(list(rows), sort=sort, id_column=id_column, page_size=page_size, descending=descending, total=total)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt,
+    *,
+    sort: SortKey,
+    id_column,
+    limit: int | None,
+    after: str | None,
+    descending: bool = False,
+    include_total: bool = False,
+) -> dict:
+    """`paginate` for an AsyncSession."""
+    page_size = clamp_page_size(limit)
+    total = await db.scalar(count_statement(stmt)) if include_total else None
+    rows = (await db.execute(
+        page_statement(stmt, sort=sort, id_column=id_column, page_size=page_size, after=after, descending=descending)
+    )).all()
+    return page_envelope(list(rows), sort=sort, id_column=id_column, page_size=page_size, descending=descending, total=total)
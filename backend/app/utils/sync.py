@@ -0,0 +1,43 @@
+from fastapi import HTTPException, status
+from sqlalchemy import insert, literal, select, text
+
+from app.models.tombstone import Tombstone
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Every transaction that had not finished when this snapshot was taken has
+# an id >= its xmin. A client holding xmin from its last sync therefore gets
+# every later write by asking for change_xid >= xmin, including writes that
+# committed after that sync read the tables. Rows written by transactions
+# still running at the time are sent again next round; clients upsert.
+SNAPSHOT_XMIN = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+def encode_sync_cursor(xmin: int) -> str:
+    return encode_cursor({"x": xmin})
+
+
+def decode_sync_cursor(cursor: str) -> int:
+    xmin = decode_cursor(cursor).get("x")
+    if not isinstance(xmin, int) or isinstance(xmin, bool):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return xmin
+
+
+def tombstone_statement(kind: str, deleted):
+    """
+    Record the rows of `deleted`, a DELETE ... RETURNING id, project_id,
+    owner_id CTE, as tombstones. The DELETE runs as part of this statement;
+    it returns the deleted (id, project_id) pairs.
+    """
+    return (
+        insert(Tombstone)
+        .from_select(
+            ["owner_id", "kind", "entity_id", "project_id"],
+            select(deleted.c.owner_id, literal(kind), deleted.c.id, deleted.c.project_id),
+        )
+        .returning(Tombstone.entity_id.label("id"), Tombstone.project_id)
+        .add_cte(deleted)
+    )
@@ -0,0 +1,502 @@
+"""
+Throughput and latency of every projects.py / tasks.py endpoint under
+concurrent clients, against a real uvicorn worker and DATABASE_URL.
+
+Seeds `--owners` owners x `--projects` projects, with `--tasks` tasks per
+project on average. Owners are Zipf-skewed (`--skew`): a few heavy users
+hold most tasks and send most requests. Tokens are signed locally and
+checked against a JWKS file, so auth runs for real. Each endpoint is then
+driven by `--clients` concurrent clients for `--duration` seconds.
+
+Reports requests/s, p50/p95/p99 latency, errors, database round trips per
+request (statements plus commits, measured in-process with the response
+cache off, i.e. the miss path) and the server's peak RSS. Results are
+compared with the baseline in benchmarks/baselines/; any endpoint worse by
+more than `--threshold` is flagged and the exit status is 1.
+
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+from itertools import accumulate
+from pathlib import Path
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.testclient import TestClient
+from jose import jwk, jwt
+from sqlalchemy import delete, event, text
+
+from app.core.jwks import JWKSKeyStore, file_fetcher, set_key_store
+from app.core.response_cache import ResponseCache, set_response_cache
+from app.core.settings import settings
+from app.db.sessions import SessionLocal, async_engine, engine
+from app.main import create_app
+from app.models.project import Project
+from app.models.tombstone import Tombstone
+
+PREFIX = "bench_api_"
+KID = "bench-api"
+BASELINE = Path(__file__).parent / "baselines" / "bench_api.json"
+
+
+# ---- Auth
+
+class Signer:
+    """An RSA key whose public half is written to a JWKS file."""
+
+    def __init__(self, directory: str):
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = private.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+        public_jwk.update({"kid": KID, "use": "sig"})
+        self.jwks_path = Path(directory) / "jwks.json"
+        self.jwks_path.write_text(json.dumps({"keys": [public_jwk]}))
+
+    @property
+    def jwks_url(self) -> str:
+        return self.jwks_path.as_uri()
+
+    def token(self, owner_id: str) -> str:
+        claims = {"sub": owner_id, "iss": settings.CLERK_ISSUER, "exp": int(time.time()) + 3600}
+        if settings.CLERK_AUDIENCE:
+            claims["aud"] = settings.CLERK_AUDIENCE
+        return jwt.encode(claims, self.private_pem, algorithm="RS256", headers={"kid": KID})
+
+
+# ---- Dataset
+
+def zipf_counts(total: int, n: int, skew: float) -> list[int]:
+    """`total` split over n ranks with weight 1/rank**skew, at least 1 each."""
+    weights = [1 / rank ** skew for rank in range(1, n + 1)]
+    scale = total / sum(weights)
+    return [max(1, round(w * scale)) for w in weights]
+
+
+def seed(owners: list[str], task_counts: list[int], projects: int) -> None:
+    with SessionLocal() as db:
+        db.execute(text("""
+            INSERT INTO projects (owner_id, name, description)
+            SELECT o, 'Project ' || p, 'Seeded by bench_api'
+            FROM unnest(CAST(:owners AS text[])) o, generate_series(1, :projects) p
+        """), {"owners": owners, "projects": projects})
+        db.execute(text("""
+            WITH quota AS (
+                SELECT * FROM unnest(CAST(:owners AS text[]), CAST(:counts AS int[])) AS q(owner_id, n)
+            ), numbered AS (
+                SELECT id, owner_id, row_number() OVER (PARTITION BY owner_id ORDER BY id) - 1 AS k
+                FROM projects WHERE owner_id LIKE :prefix || '%'
+            )
+            INSERT INTO tasks (project_id, owner_id, title, status, priority, deadline)
+            SELECT p.id, q.owner_id, 'Task ' || i,
+                   (ARRAY['not_started', 'in_progress', 'done'])[1 + i % 3]::task_status,
+                   (ARRAY['low', 'medium', 'high', 'urgent'])[1 + i % 4]::task_priority,
+                   CASE WHEN i % 5 > 0 THEN now() + (i % 60 - 20) * interval '1 day' END
+            FROM quota q
+            CROSS JOIN LATERAL generate_series(1, q.n) i
+            JOIN numbered p ON p.owner_id = q.owner_id AND p.k = i % :projects
+        """), {"owners": owners, "counts": task_counts, "prefix": PREFIX, "projects": projects})
+        db.commit()
+        db.execute(text("ANALYZE projects"))
+        db.execute(text("ANALYZE tasks"))
+        db.commit()
+
+
+def sample_ids(per_owner: int) -> tuple[dict, dict]:
+    """Up to `per_owner` project and task ids of each seeded owner."""
+    sql = """
+        SELECT owner_id, array_agg(id) FROM (
+            SELECT owner_id, id, row_number() OVER (PARTITION BY owner_id ORDER BY id) AS n
+            FROM {table} WHERE owner_id LIKE :prefix || '%'
+        ) s WHERE n <= :n GROUP BY owner_id
+    """
+    with SessionLocal() as db:
+        params = {"prefix": PREFIX, "n": per_owner}
+        projects = dict(db.execute(text(sql.format(table="projects")), params).all())
+        tasks = dict(db.execute(text(sql.format(table="tasks")), params).all())
+    return projects, tasks
+
+
+def cleanup() -> None:
+    with SessionLocal() as db:
+        db.execute(delete(Project).where(Project.owner_id.like(PREFIX + "%")))
+        db.execute(delete(Tombstone).where(Tombstone.owner_id.like(PREFIX + "%")))
+        db.commit()
+
+
+# ---- Scenarios
+# Each returns (method, path, json body) for a request as `owner`, or None
+# when it has nothing left to do. Creates feed the matching deletes, which
+# run later, so deletes never touch the seeded rows.
+
+class Targets:
+    def __init__(self, projects: dict, tasks: dict):
+        self.projects = projects
+        self.tasks = tasks
+        self.created = {"project": deque(), "task": deque()}
+
+    def take(self, kind: str):
+        created = self.created[kind]
+        return created.popleft() if created else None
+
+
+def scenarios(targets: Targets) -> dict:
+    def project_of(owner, rng):
+        return rng.choice(targets.projects[owner])
+
+    def task_of(owner, rng):
+        return rng.choice(targets.tasks[owner])
+
+    def delete_created(kind, path):
+        def build(owner, rng):
+            created = targets.take(kind)
+            if created is None:
+                return None
+            owner_id, entity_id = created
+            return owner_id, "DELETE", path.format(entity_id), None
+        return build
+
+    return {
+        "GET /projects": lambda owner, rng: ("GET", "/projects?limit=50", None),
+        "POST /projects": lambda owner, rng: ("POST", "/projects", {"name": f"Load {rng.random():.6f}"}),
+        "GET /projects/{id}": lambda owner, rng: ("GET", f"/projects/{project_of(owner, rng)}", None),
+        "PUT /projects/{id}": lambda owner, rng: (
+            "PUT", f"/projects/{project_of(owner, rng)}", {"description": f"Updated {rng.random():.6f}"},
+        ),
+        "POST /projects/{id}/tasks": lambda owner, rng: (
+            "POST", f"/projects/{project_of(owner, rng)}/tasks", {"title": f"Load {rng.random():.6f}"},
+        ),
+        "GET /projects/{id}/tasks": lambda owner, rng: (
+            "GET", f"/projects/{project_of(owner, rng)}/tasks?limit=50", None,
+        ),
+        "GET /tasks": lambda owner, rng: ("GET", "/tasks?limit=50", None),
+        "GET /tasks filtered": lambda owner, rng: (
+            "GET", "/tasks?status=not_started&status=in_progress&sort=deadline&limit=50", None,
+        ),
+        "GET /tasks/{id}": lambda owner, rng: ("GET", f"/tasks/{task_of(owner, rng)}", None),
+        "PATCH /tasks/{id}": lambda owner, rng: (
+            "PATCH", f"/tasks/{task_of(owner, rng)}", {"status": rng.choice(["in_progress", "done"])},
+        ),
+        "DELETE /tasks/{id}": delete_created("task", "/tasks/{}"),
+        "DELETE /projects/{id}": delete_created("project", "/projects/{}"),
+    }
+
+
+def build_request(build, owner: str, rng: random.Random):
+    """(owner, method, path, body); deletes pick the owner of what they remove."""
+    spec = build(owner, rng)
+    if spec is None or len(spec) == 4:
+        return spec
+    return (owner, *spec)
+
+
+def remember(targets: Targets, name: str, owner: str, response: httpx.Response) -> None:
+    if response.status_code != 201:
+        return
+    if name == "POST /projects":
+        targets.created["project"].append((owner, response.json()["id"]))
+    elif name == "POST /projects/{id}/tasks":
+        targets.created["task"].append((owner, response.json()["id"]))
+
+
+# ---- Round trips (in-process)
+
+class RoundTrips:
+    def __init__(self):
+        self.count = 0
+
+    def _hit(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self._hit)
+            event.listen(target, "commit", self._hit)
+        return self
+
+    def __exit__(self, *exc):
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", self._hit)
+            event.remove(target, "commit", self._hit)
+
+
+def measure_round_trips(signer, db_mode, owners, weights, targets, samples, seed_value) -> dict:
+    set_key_store(JWKSKeyStore(file_fetcher(signer.jwks_path)))
+    set_response_cache(ResponseCache(None))
+    tokens = {owner: signer.token(owner) for owner in owners}
+    rng = random.Random(seed_value)
+    trips = {}
+    try:
+        with TestClient(create_app(db_mode=db_mode)) as client, RoundTrips() as counter:
+            for name, build in scenarios(targets).items():
+                counter.count = sent = 0
+                for _ in range(samples):
+                    spec = build_request(build, rng.choices(owners, cum_weights=weights)[0], rng)
+                    if spec is None:
+                        break
+                    owner, method, path, body = spec
+                    response = client.request(
+                        method, path, json=body, headers={"Authorization": f"Bearer {tokens[owner]}"},
+                    )
+                    remember(targets, name, owner, response)
+                    sent += 1
+                trips[name] = counter.count / sent if sent else None
+    finally:
+        set_key_store(None)
+        set_response_cache(None)
+    return trips
+
+
+# ---- Server
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """One uvicorn worker in a child process, so its RSS is its own."""
+
+    def __init__(self, signer: Signer, db_mode: str):
+        self.port = free_port()
+        env = {**os.environ, "DB_MODE": db_mode, "CLERK_JWKS_URL": signer.jwks_url}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app",
+             "--port", str(self.port), "--log-level", "warning", "--no-access-log"],
+            env=env,
+        )
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def wait_ready(self, timeout: float = 30) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                if httpx.get(self.base_url + "/health").status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError("Server did not become ready")
+
+    def reset_peak_rss(self) -> None:
+        # "5" resets VmHWM (Linux); otherwise peaks accumulate over phases
+        try:
+            Path(f"/proc/{self.process.pid}/clear_refs").write_text("5")
+        except OSError:
+            pass
+
+    def peak_rss_mib(self) -> float | None:
+        try:
+            status = Path(f"/proc/{self.process.pid}/status").read_text()
+        except OSError:
+            return None
+        for line in status.splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+        return None
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+# ---- Load
+
+async def drive(base_url, name, build, targets, owners, weights, tokens, clients, duration, seed_value):
+    latencies: list[float] = []
+    errors = defaultdict(int)
+
+    async def client_loop(http, rng, deadline):
+        while time.perf_counter() < deadline:
+            spec = build_request(build, rng.choices(owners, cum_weights=weights)[0], rng)
+            if spec is None:
+                return
+            owner, method, path, body = spec
+            start = time.perf_counter()
+            try:
+                response = await http.request(
+                    method, path, json=body, headers={"Authorization": f"Bearer {tokens[owner]}"},
+                )
+            except httpx.TransportError as exc:
+                errors[type(exc).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] += 1
+            remember(targets, name, owner, response)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            client_loop(http, random.Random(seed_value + i), deadline) for i in range(clients)
+        ))
+        elapsed = time.perf_counter() - start
+    return latencies, dict(errors), elapsed
+
+
+def percentile(ms: list[float], p: float) -> float:
+    return ms[min(len(ms) - 1, int(len(ms) * p))]
+
+
+def summarize(latencies, errors, elapsed) -> dict:
+    ms = sorted(t * 1000 for t in latencies)
+    if not ms:
+        return {"requests": 0, "errors": sum(errors.values()), "rps": 0.0}
+    return {
+        "requests": len(ms),
+        "errors": sum(errors.values()),
+        "error_codes": errors,
+        "rps": len(ms) / elapsed,
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": percentile(ms, 0.50),
+        "p95_ms": percentile(ms, 0.95),
+        "p99_ms": percentile(ms, 0.99),
+    }
+
+
+# ---- Baseline
+
+def regressions(result: dict, base: dict, threshold: float) -> list[str]:
+    found = []
+    if base.get("p95_ms") and result.get("p95_ms", 0) > base["p95_ms"] * (1 + threshold):
+        found.append(f"p95 {base['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+    if base.get("rps") and result["rps"] < base["rps"] * (1 - threshold):
+        found.append(f"rps {base['rps']:.0f} -> {result['rps']:.0f}")
+    # Round trips are deterministic: any increase is a regression
+    if base.get("round_trips") is not None and result.get("round_trips") is not None:
+        if result["round_trips"] > base["round_trips"] + 0.01:
+            found.append(f"round trips {base['round_trips']:.1f} -> {result['round_trips']:.1f}")
+    if base.get("peak_rss_mib") and result.get("peak_rss_mib"):
+        if result["peak_rss_mib"] > base["peak_rss_mib"] * (1 + threshold):
+            found.append(f"peak RSS {base['peak_rss_mib']:.0f} -> {result['peak_rss_mib']:.0f} MiB")
+    if result["errors"] > base.get("errors", 0):
+        found.append(f"errors {base.get('errors', 0)} -> {result['errors']}")
+    return found
+
+
+def fmt(value, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--owners", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=5, help="projects per owner")
+    parser.add_argument("--tasks", type=int, default=20, help="tasks per project, on average")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent over owners")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5, help="seconds per endpoint")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default=settings.DB_MODE)
+    parser.add_argument("--trip-samples", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    config = {key: getattr(args, key) for key in ("owners", "projects", "tasks", "skew", "clients", "duration", "db_mode")}
+    owners = [f"{PREFIX}{rank}" for rank in range(1, args.owners + 1)]
+    task_counts = zipf_counts(args.owners * args.projects * args.tasks, args.owners, args.skew)
+    # Heavy owners also send the most requests
+    weights = list(accumulate(zipf_counts(10 ** 6, args.owners, args.skew)))
+
+    cleanup()
+    start = time.perf_counter()
+    seed(owners, task_counts, args.projects)
+    print(f"seeded {args.owners * args.projects:,} projects, {sum(task_counts):,} tasks "
+          f"(heaviest owner {task_counts[0]:,}) in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        signer = Signer(directory)
+        tokens = {owner: signer.token(owner) for owner in owners}
+        server = Server(signer, args.db_mode)
+        try:
+            projects, tasks = sample_ids(per_owner=50)
+            targets = Targets(projects, tasks)
+            trips = measure_round_trips(signer, args.db_mode, owners, weights, targets, args.trip_samples, args.seed)
+
+            server.wait_ready()
+            # Warm the pool, JWKS and token cache before measuring
+            asyncio.run(drive(server.base_url, "GET /projects", scenarios(targets)["GET /projects"], targets,
+                              owners, weights, tokens, args.clients, 1.0, args.seed))
+            for offset, (name, build) in enumerate(scenarios(targets).items()):
+                server.reset_peak_rss()
+                latencies, errors, elapsed = asyncio.run(drive(
+                    server.base_url, name, build, targets, owners, weights, tokens,
+                    args.clients, args.duration, args.seed + 1000 * (offset + 1),
+                ))
+                results[name] = {
+                    **summarize(latencies, errors, elapsed),
+                    "round_trips": trips[name],
+                    "peak_rss_mib": server.peak_rss_mib(),
+                }
+        finally:
+            server.stop()
+            cleanup()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() and not args.save_baseline else None
+    if baseline is not None and baseline.get("config") != config:
+        print(f"note: baseline was recorded with {baseline.get('config')}; comparing anyway")
+
+    print(f"{'endpoint':<28}{'reqs':>8}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'trips':>7}{'RSS MiB':>9}")
+    flagged = {}
+    for name, r in results.items():
+        print(f"{name:<28}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9.0f}{fmt(r.get('p50_ms'), '.1f'):>9}"
+              f"{fmt(r.get('p95_ms'), '.1f'):>9}{fmt(r.get('p99_ms'), '.1f'):>9}"
+              f"{fmt(r['round_trips'], '.1f'):>7}{fmt(r['peak_rss_mib'], '.0f'):>9}")
+        if baseline is not None and name in baseline["results"]:
+            found = regressions(r, baseline["results"][name], args.threshold)
+            if found:
+                flagged[name] = found
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(exist_ok=True)
+        stored = {name: {k: v for k, v in r.items() if k != "error_codes"} for name, r in results.items()}
+        args.baseline.write_text(json.dumps({"config": config, "results": stored}, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+    elif baseline is None:
+        print(f"no baseline at {args.baseline}; run with --save-baseline to record one")
+    elif flagged:
+        print(f"\nregressions beyond {args.threshold:.0%}:")
+        for name, found in flagged.items():
+            print(f"  {name}: {'; '.join(found)}")
+        sys.exit(1)
+    else:
+        print(f"\nno regressions beyond {args.threshold:.0%} against {args.baseline.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Throughput and peak RSS of the task export: the streaming /export/tasks path
+(server-side cursor, encoded in batches) versus buffering the whole list with
+.all() the way the list endpoints do.
+
+Seeds `--tasks` rows for a throwaway owner in DATABASE_URL and removes them
+after. Streaming runs first, since ru_maxrss only ever grows.
+
+    python -m benchmarks.bench_export --tasks 1000000
+"""
+import argparse
+import resource
+import time
+
+from sqlalchemy import delete, text
+
+from app.api.v1.exports import stream_rows
+from app.api.v1.tasks import task_list_statement
+from app.db.sessions import SessionLocal
+from app.models.project import Project
+from app.models.task import Task
+from app.utils.serialization import rows_to_json, rows_to_ndjson
+
+OWNER_ID = "bench_export"
+
+
+def peak_rss_mb() -> float:
+    # Linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(name, produce, tasks):
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    first_chunk_at = None
+    size = 0
+    for chunk in produce():
+        if first_chunk_at is None:
+            first_chunk_at = time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<10}{tasks / elapsed:>12,.0f}{size / elapsed / 2**20:>10.1f}"
+        f"{first_chunk_at * 1000:>14.1f}{peak_rss_mb():>14.1f}{peak_rss_mb() - rss_before:>12.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=100)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        db.execute(text("""
+            INSERT INTO projects (owner_id, name)
+            SELECT :owner_id, 'project ' || p FROM generate_series(1, :projects) p
+        """), {"owner_id": OWNER_ID, "projects": args.projects})
+        db.execute(text("""
+            INSERT INTO tasks (project_id, owner_id, title, status, priority, deadline)
+            SELECT p.id, :owner_id, 'task ' || n,
+                   (ARRAY['not_started', 'in_progress', 'done'])[1 + n % 3]::task_status,
+                   (ARRAY['low', 'medium', 'high', 'urgent'])[1 + n % 4]::task_priority,
+                   CASE WHEN n % 4 = 0 THEN NULL ELSE now() + n * interval '1 minute' END
+            FROM generate_series(1, :tasks) n
+            JOIN projects p ON p.owner_id = :owner_id
+             AND p.name = 'project ' || (1 + n % :projects)
+        """), {"owner_id": OWNER_ID, "tasks": args.tasks, "projects": args.projects})
+        db.commit()
+        db.execute(text("ANALYZE tasks"))
+        db.commit()
+
+    stmt = task_list_statement(OWNER_ID).order_by(Task.id.asc())
+
+    def buffered():
+        with SessionLocal() as db:
+            yield rows_to_json(db.execute(stmt).all())
+
+    try:
+        print(f"{args.tasks:,} tasks")
+        print(f"{'path':<10}{'rows/s':>12}{'MiB/s':>10}{'first byte ms':>14}{'peak RSS MB':>14}{'RSS +MB':>12}")
+        run("stream", lambda: stream_rows(stmt, rows_to_ndjson), args.tasks)
+        run("buffered", buffered, args.tasks)
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(Project).where(Project.owner_id == OWNER_ID))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Ingest rate of a task migration: one POST /projects/{id}/tasks per row versus
+a single NDJSON upload to /import/tasks (COPY into a staging table, then one
+INSERT ... SELECT).
+
+Both go through the app in-process with auth overridden, against DATABASE_URL.
+The row-at-a-time path gets fewer rows since it is the slow one.
+
+    python -m benchmarks.bench_import --rows 100000 --single-rows 2000
+"""
+import argparse
+import json
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.core.auth import get_current_user_id, get_current_user_id_async
+from app.db.sessions import SessionLocal
+from app.main import create_app
+from app.models.project import Project
+
+OWNER_ID = "bench_import"
+
+
+def task(i: int) -> dict:
+    return {
+        "title": f"imported {i}",
+        "status": ("not_started", "in_progress", "done")[i % 3],
+        "priority": ("low", "medium", "high", "urgent")[i % 4],
+        "deadline": None if i % 4 == 0 else "2030-01-02T03:04:05Z",
+    }
+
+
+def report(name, rows, elapsed, baseline=None):
+    rate = rows / elapsed
+    speedup = f"{rate / baseline:>9.1f}x" if baseline else ""
+    print(f"{name:<18}{rows:>10,}{elapsed:>10.2f}{rate:>12,.0f}{speedup}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--single-rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.dependency_overrides[get_current_user_id] = lambda: OWNER_ID
+    app.dependency_overrides[get_current_user_id_async] = lambda: OWNER_ID
+
+    try:
+        with TestClient(app) as client:
+            single = client.post("/projects", json={"name": "row at a time"}).json()["id"]
+            bulk = client.post("/projects", json={"name": "bulk"}).json()["id"]
+
+            print(f"{'path':<18}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'speedup':>10}")
+            start = time.perf_counter()
+            for i in range(args.single_rows):
+                r = client.post(f"/projects/{single}/tasks", json=task(i))
+                assert r.status_code == 201, r.text
+            baseline = report("POST per row", args.single_rows, time.perf_counter() - start)
+
+            body = "\n".join(json.dumps(task(i)) for i in range(args.rows)).encode()
+            start = time.perf_counter()
+            r = client.post("/import/tasks", content=body, params={"project_id": bulk})
+            elapsed = time.perf_counter() - start
+            assert r.json()["imported"] == args.rows, r.text
+            report("/import/tasks", args.rows, elapsed, baseline)
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(Project).where(Project.owner_id == OWNER_ID))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency of /search's query on a large dataset: `--tasks` rows spread over
+`--owners` owners (plus one heavy owner holding `--heavy-share` of them),
+titles drawn from a small vocabulary so common words match many rows.
+
+Seeds into DATABASE_URL and removes the rows after. Reports p50/p95 per
+query shape for a typical and the heavy owner, and whether pg_trgm was used.
+
+    python -m benchmarks.bench_search --tasks 1000000
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import delete, text
+
+from app.api.v1.search import prefix_tsquery, search_statement, trigrams_available
+from app.db.sessions import SessionLocal
+from app.models.project import Project
+
+PREFIX = "bench_search_"
+HEAVY_OWNER = PREFIX + "heavy"
+TYPICAL_OWNER = PREFIX + "7"
+
+VOCABULARY = [
+    "fix", "login", "logout", "deploy", "release", "notes", "dashboard", "invoice", "export", "import",
+    "refactor", "billing", "onboarding", "email", "template", "search", "index", "migrate", "database",
+    "cache", "review", "design", "mobile", "layout", "report", "metrics", "alerts", "signup", "password",
+    "reset", "upload", "avatar", "profile", "settings", "webhook", "retry", "queue", "worker", "sync",
+    "calendar", "reminder", "deadline", "kanban", "board", "column", "filter", "sort", "pagination",
+]
+
+QUERIES = {
+    "common word": "fix",
+    "short prefix": "lo",
+    "two words": "deploy rel",
+    "rare": "webhook retry queue",
+}
+
+
+def timed(db, owner_id, q, repeat):
+    trigrams = trigrams_available(db)
+    stmt = search_statement(owner_id, q, prefix_tsquery(q), trigrams=trigrams, page_size=50, after=None)
+    db.execute(stmt).all()  # warm
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.execute(stmt).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--projects-per-owner", type=int, default=5)
+    parser.add_argument("--heavy-share", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    heavy_tasks = int(args.tasks * args.heavy_share)
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        db.execute(text("""
+            INSERT INTO projects (owner_id, name, description)
+            SELECT o, initcap(v[1 + (p * 7) % array_length(v, 1)]) || ' ' || p,
+                   'Work on ' || v[1 + (p * 13) % array_length(v, 1)] || ' and ' || v[1 + (p * 17) % array_length(v, 1)]
+            FROM (SELECT :prefix || n AS o FROM generate_series(1, :owners) n
+                  UNION ALL SELECT :heavy) owners,
+                 generate_series(1, :projects) p,
+                 (SELECT CAST(:vocabulary AS text[]) AS v) vocab
+        """), {"prefix": PREFIX, "owners": args.owners, "heavy": HEAVY_OWNER,
+               "projects": args.projects_per_owner, "vocabulary": VOCABULARY})
+        # The heavy owner's rows first, then the rest spread evenly over owners
+        db.execute(text("""
+            WITH numbered AS (
+                SELECT id, owner_id, row_number() OVER (PARTITION BY owner_id ORDER BY id) - 1 AS k
+                FROM projects WHERE owner_id LIKE :prefix || '%'
+            )
+            INSERT INTO tasks (project_id, owner_id, title, status, priority)
+            SELECT p.id, p.owner_id,
+                   v[1 + (n * 7) % array_length(v, 1)] || ' ' || v[1 + (n * 31) % array_length(v, 1)]
+                   || ' ' || v[1 + (n * 101) % array_length(v, 1)] || ' #' || n,
+                   (ARRAY['not_started', 'in_progress', 'done'])[1 + n % 3]::task_status,
+                   (ARRAY['low', 'medium', 'high', 'urgent'])[1 + n % 4]::task_priority
+            FROM (SELECT n, CASE WHEN n <= :heavy_tasks THEN :heavy
+                                 ELSE :prefix || (1 + n % :owners) END AS owner_id
+                  FROM generate_series(1, :tasks) n) t
+            JOIN numbered p ON p.owner_id = t.owner_id AND p.k = t.n % :projects,
+            (SELECT CAST(:vocabulary AS text[]) AS v) vocab
+        """), {"prefix": PREFIX, "owners": args.owners, "heavy": HEAVY_OWNER, "heavy_tasks": heavy_tasks,
+               "tasks": args.tasks, "projects": args.projects_per_owner, "vocabulary": VOCABULARY})
+        db.commit()
+        db.execute(text("ANALYZE projects"))
+        db.execute(text("ANALYZE tasks"))
+        db.commit()
+        print(f"seeded {args.tasks:,} tasks in {time.perf_counter() - start:.0f}s; "
+              f"pg_trgm: {'yes' if trigrams_available(db) else 'no (prefix full-text only)'}")
+
+        try:
+            typical = (args.tasks - heavy_tasks) // args.owners
+            print(f"{'query':<14}{'owner':>22}{'p50 ms':>10}{'p95 ms':>10}")
+            for label, owner_id in ((f"typical ({typical:,})", TYPICAL_OWNER), (f"heavy ({heavy_tasks:,})", HEAVY_OWNER)):
+                for name, q in QUERIES.items():
+                    p50, p95 = timed(db, owner_id, q, args.repeat)
+                    print(f"{name:<14}{label:>22}{p50:>10.1f}{p95:>10.1f}")
+        finally:
+            db.rollback()
+            db.execute(delete(Project).where(Project.owner_id.like(PREFIX + "%")))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
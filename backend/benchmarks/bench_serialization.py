@@ -0,0 +1,105 @@
+"""
+Per-row cost of a task list response: ORM entities validated into TaskRead
+and encoded the way FastAPI's response_model path does (before), versus
+plain rows encoded in bulk by pydantic-core (after).
+
+Seeds one project with `--rows` tasks in DATABASE_URL and removes it after.
+
+    python -m benchmarks.bench_serialization --rows 5000 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select, text
+
+from app.api.v1.tasks import TASK_READ_COLUMNS
+from app.db.sessions import SessionLocal
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.task import TaskRead
+from app.utils.serialization import rows_to_json
+
+OWNER_ID = "bench_serialization"
+TASK_LIST = TypeAdapter(list[TaskRead])
+
+
+def fetch_entities(db, project_id):
+    return db.scalars(select(Task).where(Task.project_id == project_id).order_by(Task.id)).all()
+
+
+def encode_entities(tasks) -> bytes:
+    # What FastAPI does with a response_model: validate, dump to JSON-able
+    # python, then json.dumps in JSONResponse.render
+    content = TASK_LIST.dump_python(TASK_LIST.validate_python(tasks, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fetch_rows(db, project_id):
+    return db.execute(
+        select(*TASK_READ_COLUMNS).where(Task.project_id == project_id).order_by(Task.id)
+    ).all()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def measure(fetch, encode, project_id, repeat):
+    fetch_times, encode_times, body = [], [], b""
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            rows, fetch_time = timed(fetch, db, project_id)
+            body, encode_time = timed(encode, rows)
+        fetch_times.append(fetch_time)
+        encode_times.append(encode_time)
+    return statistics.median(fetch_times), statistics.median(encode_times), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        project = Project(owner_id=OWNER_ID, name="bench")
+        db.add(project)
+        db.flush()
+        db.execute(text("""
+            INSERT INTO tasks (project_id, owner_id, title, status, priority, deadline)
+            SELECT :project_id, :owner_id, 'task ' || n,
+                   (ARRAY['not_started', 'in_progress', 'done'])[1 + n % 3]::task_status,
+                   (ARRAY['low', 'medium', 'high', 'urgent'])[1 + n % 4]::task_priority,
+                   CASE WHEN n % 4 = 0 THEN NULL ELSE now() + n * interval '1 hour' END
+            FROM generate_series(1, :rows) n
+        """), {"project_id": project.id, "owner_id": OWNER_ID, "rows": args.rows})
+        db.commit()
+        project_id = project.id
+
+    try:
+        results = {
+            "ORM + TaskRead": measure(fetch_entities, encode_entities, project_id, args.repeat),
+            "rows + to_json": measure(fetch_rows, rows_to_json, project_id, args.repeat),
+        }
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(Project).where(Project.owner_id == OWNER_ID))
+            db.commit()
+
+    bodies = {body for _, _, body in results.values()}
+    print(f"{args.rows} rows, median of {args.repeat}; bodies identical: {len(bodies) == 1}")
+    print(f"{'path':<18}{'fetch us/row':>14}{'encode us/row':>15}{'total ms':>10}")
+    for name, (fetch_time, encode_time, _) in results.items():
+        print(
+            f"{name:<18}{fetch_time / args.rows * 1e6:>14.2f}"
+            f"{encode_time / args.rows * 1e6:>15.2f}{(fetch_time + encode_time) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Worker startup: import time, time until a new uvicorn worker accepts
+requests, and the latency of its first authenticated requests compared with
+steady state. Runs against DATABASE_URL.
+
+Each configuration starts `--runs` fresh workers:
+
+  cold       DB_PREWARM_CONNECTIONS=0, JWKS_PREWARM=false: the first
+             request connects to the database and fetches the JWKS
+  prewarmed  the defaults: both happen during startup, before the worker
+             reports ready
+
+The JWKS is served over local HTTP with `--jwks-latency-ms` of delay, to
+stand in for the identity provider. With a local database connecting is
+cheap; a DATABASE_URL across a network (TLS, auth) widens the gap.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --jwks-latency-ms 150
+"""
+import argparse
+import http.server
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.bench_api import Signer, free_port
+
+CONFIGS = {
+    "cold": {"DB_PREWARM_CONNECTIONS": "0", "JWKS_PREWARM": "false"},
+    "prewarmed": {},
+}
+FIRST_REQUESTS = ("/projects", "/tasks", "/dashboard")
+
+
+def import_seconds(statement: str, runs: int) -> float:
+    """Median wall time of `statement` in a fresh interpreter."""
+    script = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        times.append(float(out.stdout))
+    return statistics.median(times)
+
+
+def serve_jwks(path: str, latency: float) -> http.server.ThreadingHTTPServer:
+    body = open(path, "rb").read()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_worker(env: dict) -> tuple[subprocess.Popen, str, float]:
+    """Spawn a worker; returns it with its URL and the seconds until /health answered."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    deadline = start + 30
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Worker exited during startup")
+        try:
+            if httpx.get(url + "/health").status_code == 200:
+                return process, url, time.perf_counter() - start
+        except httpx.TransportError:
+            time.sleep(0.005)
+    process.kill()
+    raise RuntimeError("Worker did not become ready")
+
+
+def run_once(env: dict, token: str, steady_samples: int) -> dict:
+    process, url, ready = start_worker(env)
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        with httpx.Client(base_url=url, headers=headers) as http:
+            first = []
+            for path in FIRST_REQUESTS:
+                t = time.perf_counter()
+                http.get(path).raise_for_status()
+                first.append((time.perf_counter() - t) * 1000)
+            steady = []
+            for i in range(steady_samples):
+                t = time.perf_counter()
+                http.get(FIRST_REQUESTS[i % len(FIRST_REQUESTS)]).raise_for_status()
+                steady.append((time.perf_counter() - t) * 1000)
+    finally:
+        process.terminate()
+        process.wait(10)
+    return {"ready_s": ready, "first_ms": first[0], "first_three_ms": sum(first), "steady_ms": statistics.median(steady)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--jwks-latency-ms", type=float, default=100)
+    parser.add_argument("--steady-samples", type=int, default=30)
+    parser.add_argument("--db-mode", choices=("sync", "async"), default="sync")
+    args = parser.parse_args()
+
+    print(f"import app.main:              {import_seconds('import app.main', args.runs) * 1000:7.0f} ms")
+    print(f"import app.main + create_app: "
+          f"{import_seconds('import app.main; app.main.create_app()', args.runs) * 1000:7.0f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        signer = Signer(directory)
+        jwks = serve_jwks(str(signer.jwks_path), args.jwks_latency_ms / 1000)
+        token = signer.token("bench_startup_user")
+        base_env = {
+            **os.environ,
+            "DB_MODE": args.db_mode,
+            "CLERK_JWKS_URL": f"http://127.0.0.1:{jwks.server_address[1]}/jwks.json",
+        }
+        print(f"\n{'config':<12}{'ready ms':>10}{'1st req ms':>12}{'1st 3 ms':>10}{'steady ms':>11}")
+        for name, overrides in CONFIGS.items():
+            runs = [run_once({**base_env, **overrides}, token, args.steady_samples) for _ in range(args.runs)]
+            median = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+            print(f"{name:<12}{median['ready_s'] * 1000:>10.0f}{median['first_ms']:>12.1f}"
+                  f"{median['first_three_ms']:>10.1f}{median['steady_ms']:>11.1f}")
+        jwks.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Round trips and latency of the task/project write paths: the ORM pattern the
+handlers used before (ownership SELECT, add/setattr, commit, refresh) versus
+the route handlers themselves, called directly with their change feed
+NOTIFY and response-cache invalidation included.
+
+Runs against DATABASE_URL. `--rtt-ms` adds a sleep per database round trip
+(statement or commit) to model a remote database link.
+
+    python -m benchmarks.bench_writes --iterations 200 --rtt-ms 8
+"""
+import argparse
+import statistics
+import time
+
+from fastapi import Response
+from sqlalchemy import delete, event
+from sqlalchemy.orm import Session
+
+from app.api.v1 import projects, tasks
+from app.db.sessions import SessionLocal, engine
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.project import ProjectUpdate
+from app.schemas.task import TaskCreate, TaskUpdate
+
+OWNER_ID = "bench_writes"
+
+
+class RoundTrips:
+    def __init__(self, rtt_seconds: float):
+        self.rtt = rtt_seconds
+        self.count = 0
+
+    def _hit(self, *args, **kwargs):
+        self.count += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def install(self):
+        event.listen(engine, "before_cursor_execute", self._hit)
+        event.listen(engine, "commit", self._hit)
+
+    def remove(self):
+        event.remove(engine, "before_cursor_execute", self._hit)
+        event.remove(engine, "commit", self._hit)
+
+
+# ---- Previous handler bodies
+
+def orm_create_task(db: Session, project_id: int, i: int):
+    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == OWNER_ID).first()
+    assert project is not None
+    task = Task(project_id=project_id, owner_id=OWNER_ID, title=f"orm-{i}")
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def orm_update_task(db: Session, task_id: int, i: int):
+    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == OWNER_ID).first()
+    task.title = f"orm-upd-{i}"
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def orm_update_project(db: Session, project_id: int, i: int):
+    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == OWNER_ID).first()
+    project.name = f"orm-upd-{i}"
+    db.commit()
+    db.refresh(project)
+    return project
+
+
+# ---- Current handlers, as the routes run them
+
+def handler_create_task(db: Session, project_id: int, i: int):
+    return tasks.create_task(project_id, TaskCreate(title=f"ret-{i}"), Response(), db=db, owner_id=OWNER_ID)
+
+
+def handler_update_task(db: Session, task_id: int, i: int):
+    return tasks.update_task(
+        task_id, TaskUpdate(title=f"ret-upd-{i}"), Response(), if_match=None, db=db, owner_id=OWNER_ID
+    )
+
+
+def handler_update_project(db: Session, project_id: int, i: int):
+    return projects.update_project(
+        project_id, ProjectUpdate(name=f"ret-upd-{i}"), Response(), if_match=None, db=db, owner_id=OWNER_ID
+    )
+
+
+def measure(name, fn, target_id, iterations, trips: RoundTrips):
+    timings = []
+    trips.count = 0
+    for i in range(iterations):
+        # A fresh session per call, like a request
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            fn(db, target_id, i)
+            timings.append(time.perf_counter() - start)
+    ms = sorted(t * 1000 for t in timings)
+    return {
+        "path": name,
+        "round_trips": trips.count / iterations,
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": ms[len(ms) // 2],
+        "p95_ms": ms[int(len(ms) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        project = Project(owner_id=OWNER_ID, name="bench")
+        db.add(project)
+        db.flush()
+        task = Task(project_id=project.id, owner_id=OWNER_ID, title="bench")
+        db.add(task)
+        db.commit()
+        project_id, task_id = project.id, task.id
+
+    trips = RoundTrips(args.rtt_ms / 1000)
+    trips.install()
+    try:
+        # Warm the pool and statement caches
+        measure("warmup", handler_create_task, project_id, 5, trips)
+        measure("warmup", orm_create_task, project_id, 5, trips)
+
+        results = [
+            measure("create_task ORM", orm_create_task, project_id, args.iterations, trips),
+            measure("create_task handler", handler_create_task, project_id, args.iterations, trips),
+            measure("update_task ORM", orm_update_task, task_id, args.iterations, trips),
+            measure("update_task handler", handler_update_task, task_id, args.iterations, trips),
+            measure("update_project ORM", orm_update_project, project_id, args.iterations, trips),
+            measure("update_project handler", handler_update_project, project_id, args.iterations, trips),
+        ]
+    finally:
+        trips.remove()
+        with SessionLocal() as db:
+            db.execute(delete(Project).where(Project.owner_id == OWNER_ID))
+            db.commit()
+
+    print(f"{'path':<26}{'trips/op':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for r in results:
+        print(
+            f"{r['path']:<26}{r['round_trips']:>10.1f}{r['mean_ms']:>10.2f}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
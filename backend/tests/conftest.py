@@ -1,64 +1,196 @@
+import atexit
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from dotenv import dotenv_values
 from fastapi.testclient import TestClient
+from jose import jwk, jwt
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
 from alembic import command
 from alembic.config import Config
 
-# IMPORTANT: set before importing settings that reads ENV_FILE
+# IMPORTANT: everything up to the app imports below decides which database
+# and which JWKS the settings see.
 os.environ["ENV_FILE"] = ".env.test"
+# Every test starts the app; opening pools each time would only slow them
+os.environ.setdefault("DB_PREWARM_CONNECTIONS", "0")
+
+
+def _configured(name: str) -> str | None:
+    return os.environ.get(name) or dotenv_values(".env.test").get(name) or dotenv_values(".env").get(name)
+
+
+# --- One database per xdist worker ("gw0", "gw1", ...; "main" without
+# xdist), cloned from a template that is only migrated when the migrations
+# change. DATABASE_URL names the server and the base name.
+BASE_DATABASE_URL = make_url(_configured("DATABASE_URL"))
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TEMPLATE_DATABASE = f"{BASE_DATABASE_URL.database}_template"
+WORKER_DATABASE = f"{BASE_DATABASE_URL.database}_{WORKER}"
+os.environ["DATABASE_URL"] = BASE_DATABASE_URL.set(database=WORKER_DATABASE).render_as_string(hide_password=False)
+
+
+# --- Signing keys: tokens are signed here and the app reads the public key
+# from a local JWKS file, so no test ever fetches keys over the network.
+def make_signing_key(kid: str) -> tuple[bytes, dict]:
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": kid, "use": "sig"})
+    return private_pem, public_jwk
+
 
-from app.main import app
+TEST_KID = "test-key"
+_TEST_PRIVATE_KEY, TEST_JWK = make_signing_key(TEST_KID)
+_jwks_dir = tempfile.mkdtemp(prefix="tracker-tests-")
+atexit.register(shutil.rmtree, _jwks_dir, True)
+_jwks_file = Path(_jwks_dir) / "jwks.json"
+_jwks_file.write_text(json.dumps({"keys": [TEST_JWK]}))
+os.environ["CLERK_JWKS_URL"] = _jwks_file.as_uri()
+
+from app.main import create_app
 from app.core.settings import settings
 from app.db.deps import get_db
+from app.core.auth import get_current_user_id, get_current_user_id_async
+from app.core.request_metrics import instrument_engine
+from app.core.response_cache import MemoryBackend, ResponseCache, set_response_cache
+
+
+TEST_OWNER_ID = "user_test"
+
 
+def sign_token(sub: str = TEST_OWNER_ID, **claims) -> str:
+    """A token the app's default key store accepts."""
+    payload = {"sub": sub, "iss": settings.CLERK_ISSUER, "exp": int(time.time()) + 300, **claims}
+    return jwt.encode(payload, _TEST_PRIVATE_KEY, algorithm="RS256", headers={"kid": TEST_KID})
 
-# --- Engine/session for TEST DB only
+
+# --- Engine for this worker's database
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sync routes run on this engine in tests, so it gets the app engines' hooks
+instrument_engine(engine)
 
+TRUNCATE_ALL = text("TRUNCATE TABLE tasks, projects, tombstones RESTART IDENTITY CASCADE")
 
-@pytest.fixture(scope="session", autouse=True)
-def apply_migrations():
+
+def _migrations_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for path in sorted(Path("alembic/versions").glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _prepare_worker_database() -> None:
     """
-    Apply Alembic migrations to the test database once per test session.
+    Migrate the template if the migrations changed since it was built, then
+    clone it for this worker. Workers take turns under an advisory lock.
     """
-    alembic_cfg = Config("alembic.ini")
-    command.upgrade(alembic_cfg, "head")
+    fingerprint = _migrations_fingerprint()
+    admin = create_engine(BASE_DATABASE_URL, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+    with admin.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(hashtext('tracker-test-template'))"))
+        built_from = conn.execute(
+            text("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = :name"),
+            {"name": TEMPLATE_DATABASE},
+        ).scalar()
+        if built_from != fingerprint:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{TEMPLATE_DATABASE}" WITH (FORCE)'))
+            conn.execute(text(f"CREATE DATABASE \"{TEMPLATE_DATABASE}\" TEMPLATE template0 ENCODING 'UTF8'"))
+            alembic_cfg = Config("alembic.ini")
+            alembic_cfg.attributes["database_url"] = BASE_DATABASE_URL.set(
+                database=TEMPLATE_DATABASE
+            ).render_as_string(hide_password=False)
+            command.upgrade(alembic_cfg, "head")
+            conn.execute(text(f"COMMENT ON DATABASE \"{TEMPLATE_DATABASE}\" IS '{fingerprint}'"))
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_DATABASE}" WITH (FORCE)'))
+        conn.execute(text(f'CREATE DATABASE "{WORKER_DATABASE}" TEMPLATE "{TEMPLATE_DATABASE}"'))
+    admin.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_database():
+    """This worker's freshly cloned, fully migrated database."""
+    _prepare_worker_database()
     yield
 
 
+def _commits(request) -> bool:
+    """
+    Whether the test's writes must really commit: async routes use their
+    own connections, as do exports, imports, the change feed and /sync's
+    snapshots, so none of those can see an uncommitted outer transaction.
+    """
+    if request.node.get_closest_marker("commits"):
+        return True
+    return "db_mode" in request.fixturenames and request.getfixturevalue("db_mode") == "async"
+
+
 @pytest.fixture()
-def db_session():
+def db_session(request):
     """
-    Provide a transactional session for a test.
+    Session for a test. By default it runs inside an outer transaction that
+    is rolled back at teardown: the app's commits only release SAVEPOINTs.
+    Tests that must commit (see `_commits`) get a plain session and the
+    tables are truncated after them instead.
     """
-    db = TestingSessionLocal()
+    if _commits(request):
+        db = Session(bind=engine, autoflush=False)
+        try:
+            yield db
+        finally:
+            db.rollback()
+            db.execute(TRUNCATE_ALL)
+            db.commit()
+            db.close()
+        return
+
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
+        outer.rollback()
+        connection.close()
 
 
-@pytest.fixture(autouse=True)
-def clean_db(db_session):
-    """
-    Ensure each test starts from a clean database state.
-    TRUNCATE is fast + resets IDs + cascades to dependent tables.
-    """
-    db_session.execute(text("TRUNCATE TABLE tasks RESTART IDENTITY CASCADE;"))
-    db_session.execute(text("TRUNCATE TABLE projects RESTART IDENTITY CASCADE;"))
-    db_session.commit()
-    yield
+@pytest.fixture(params=["sync", "async"])
+def db_mode(request):
+    return request.param
 
 
 @pytest.fixture()
-def client(db_session):
+def client(db_mode, db_session):
     """
     TestClient that uses the test DB session via dependency override.
+    Every test runs once per DB_MODE; async routes use their own
+    AsyncSession against the same test database.
     """
+    app = create_app(db_mode=db_mode)
+    # Ids are reused across tests, so cached responses must not outlive one
+    set_response_cache(ResponseCache(MemoryBackend(max_bytes=1 << 20, max_entries=1000)))
+
     def override_get_db():
         try:
             yield db_session
@@ -66,6 +198,8 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_id] = lambda: TEST_OWNER_ID
+    app.dependency_overrides[get_current_user_id_async] = lambda: TEST_OWNER_ID
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -0,0 +1,89 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.admission import AdmissionControlMiddleware, pool_timeout_handler
+from app.core.metrics import REGISTRY, Counter, Histogram, Registry
+from app.core.settings import settings
+from app.db import sessions
+
+
+def make_app():
+    inner = FastAPI()
+
+    @inner.get("/work")
+    def work():
+        return {"ok": True}
+
+    @inner.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @inner.get("/starved")
+    def starved():
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    inner.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+    return inner
+
+
+def test_admission_rejects_when_full():
+    middleware = AdmissionControlMiddleware(make_app(), max_in_flight=1)
+    client = TestClient(middleware)
+
+    assert client.get("/work").status_code == 200
+
+    # Simulate a request already holding the only slot
+    middleware.in_flight = 1
+    r = client.get("/work")
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(settings.ADMISSION_RETRY_AFTER)
+
+    # Health checks are never queued behind DB work
+    assert client.get("/health").status_code == 200
+
+
+def test_pool_timeout_becomes_503():
+    client = TestClient(make_app())
+    r = client.get("/starved")
+    assert r.status_code == 503
+    assert "Retry-After" in r.headers
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    options = sessions.engine_options()
+    assert options["pool_size"] == 7
+    assert options["connect_args"] == {"options": "-c statement_timeout=1500"}
+
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+    assert "connect_args" not in sessions.engine_options()
+
+
+def test_metrics_endpoint_exposes_pool_stats(client):
+    client.get("/projects")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in r.text
+    assert 'db_pool_capacity{engine="sync"}' in r.text
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = Counter("demo_requests_total", "Requests.", ("route",), registry=registry)
+    latency = Histogram("demo_latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+
+    requests.labels("/a").inc()
+    requests.labels("/a").inc()
+    latency.observe(0.5)
+
+    text = registry.render()
+    assert 'demo_requests_total{route="/a"} 2' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'demo_latency_seconds_bucket{le="1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 1' in text
+    assert "demo_latency_seconds_count 1" in text
+    assert REGISTRY.get("db_pool_checkout_wait_seconds") is not None
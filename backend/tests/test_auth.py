@@ -0,0 +1,274 @@
+import json
+import threading
+import time
+
+from jose import jwt
+
+from app.core.auth import get_current_user_id, get_current_user_id_async
+from app.core.jwks import JWKSKeyStore, file_fetcher, parse_max_age, set_key_store
+from app.core.request_metrics import AUTH_DURATION
+from app.core.settings import settings
+from app.core.token_cache import VerifiedTokenCache, token_cache
+
+from conftest import make_signing_key, sign_token
+
+
+# ---------- Helpers ----------
+
+def sign(private_pem, kid, sub="user_abc", **claims):
+    payload = {"sub": sub, "iss": settings.CLERK_ISSUER, "exp": int(time.time()) + 300, **claims}
+    return jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+def use_real_auth(client):
+    client.app.dependency_overrides.pop(get_current_user_id, None)
+    client.app.dependency_overrides.pop(get_current_user_id_async, None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingFetcher:
+    def __init__(self, *jwks, max_age=None, delay=0.0):
+        self.documents = list(jwks)
+        self.max_age = max_age
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return {"keys": list(self.documents)}, self.max_age
+
+
+def make_store(fetcher, clock, **overrides):
+    options = dict(default_ttl=600, min_ttl=60, max_ttl=3600, min_refresh_interval=30, refresh_ahead=0)
+    options.update(overrides)
+    return JWKSKeyStore(fetcher, clock=clock, **options)
+
+
+_PRIVATE_A, JWK_A = make_signing_key("key-a")
+_PRIVATE_B, JWK_B = make_signing_key("key-b")
+
+
+# ---------- Key store ----------
+
+def test_parse_max_age():
+    assert parse_max_age("public, max-age=120, must-revalidate") == 120
+    assert parse_max_age("no-store") == 0
+    assert parse_max_age(None) is None
+    assert parse_max_age("public") is None
+
+
+def test_key_store_caches_until_ttl():
+    clock = FakeClock()
+    fetcher = CountingFetcher(JWK_A)
+    store = make_store(fetcher, clock)
+
+    assert store.get_key("key-a") is not None
+    clock.now += 599
+    assert store.get_key("key-a") is not None
+    assert fetcher.calls == 1
+
+    clock.now += 2
+    store.get_key("key-a")
+    assert fetcher.calls == 2
+
+
+def test_key_store_honours_cache_control():
+    clock = FakeClock()
+    fetcher = CountingFetcher(JWK_A, max_age=120)
+    store = make_store(fetcher, clock)
+
+    store.get_key("key-a")
+    clock.now += 121
+    store.get_key("key-a")
+    assert fetcher.calls == 2
+
+
+def test_key_store_refreshes_on_unknown_kid_rate_limited():
+    clock = FakeClock()
+    fetcher = CountingFetcher(JWK_A)
+    store = make_store(fetcher, clock)
+    store.get_key("key-a")
+
+    # Rotation: the new key shows up on the next fetch
+    fetcher.documents.append(JWK_B)
+    clock.now += 31
+    assert store.get_key("key-b") is not None
+    assert fetcher.calls == 2
+
+    # Unknown kids can't trigger fetches faster than the rate limit
+    assert store.get_key("nope") is None
+    assert store.get_key("nope") is None
+    assert fetcher.calls == 2
+
+
+def test_key_store_single_flight():
+    fetcher = CountingFetcher(JWK_A, delay=0.2)
+    store = make_store(fetcher, time.monotonic)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get_key("key-a"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fetcher.calls == 1
+    assert all(r is not None for r in results)
+
+
+def test_key_store_keeps_old_keys_when_refresh_fails():
+    clock = FakeClock()
+    fetcher = CountingFetcher(JWK_A)
+    store = make_store(fetcher, clock)
+    store.get_key("key-a")
+
+    def broken():
+        raise OSError("network down")
+
+    store._fetcher = broken
+    clock.now += 601
+    assert store.get_key("key-a") is not None
+
+
+def test_key_store_background_refresh_before_expiry():
+    clock = FakeClock()
+    fetcher = CountingFetcher(JWK_A)
+    store = make_store(fetcher, clock, refresh_ahead=100)
+    store.get_key("key-a")
+
+    clock.now += 550
+    assert store.get_key("key-a") is not None
+    store._background.join(timeout=2)
+    assert fetcher.calls == 2
+
+
+def test_file_fetcher(tmp_path):
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [JWK_A]}))
+    store = make_store(file_fetcher(path), FakeClock())
+    assert store.get_key("key-a") is not None
+
+
+# ---------- Auth dependency ----------
+
+def test_auth_dependency_verifies_with_key_store(client):
+    use_real_auth(client)
+    set_key_store(make_store(CountingFetcher(JWK_A), FakeClock()))
+    try:
+        token = sign(_PRIVATE_A, "key-a")
+        r = client.get("/projects", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200, r.text
+
+        r = client.get("/projects", headers={"Authorization": f"Bearer {sign(_PRIVATE_B, 'key-b')}"})
+        assert r.status_code == 401
+    finally:
+        set_key_store(None)
+
+
+def test_default_key_store_uses_the_local_test_jwks(client):
+    # conftest points CLERK_JWKS_URL at a file, so no test fetches keys
+    assert settings.CLERK_JWKS_URL.startswith("file://")
+    use_real_auth(client)
+    set_key_store(None)
+    try:
+        r = client.get("/projects", headers={"Authorization": f"Bearer {sign_token()}"})
+        assert r.status_code == 200, r.text
+        r = client.get("/projects", headers={"Authorization": f"Bearer {sign(_PRIVATE_A, 'key-a')}"})
+        assert r.status_code == 401
+    finally:
+        set_key_store(None)
+
+
+def test_auth_time_is_recorded_per_route(client):
+    use_real_auth(client)
+    set_key_store(make_store(CountingFetcher(JWK_A), FakeClock()))
+    auth = AUTH_DURATION.labels("GET", "/projects")
+    count, total = auth.count, auth.sum
+    try:
+        headers = {"Authorization": f"Bearer {sign(_PRIVATE_A, 'key-a', sub='user_timed')}"}
+        assert client.get("/projects", headers=headers).status_code == 200
+    finally:
+        set_key_store(None)
+
+    assert auth.count == count + 1
+    # An uncached token pays for RS256 verification
+    assert auth.sum > total
+
+def test_auth_dependency_caches_verified_tokens(client, monkeypatch):
+    import app.core.auth as auth
+
+    use_real_auth(client)
+    set_key_store(make_store(CountingFetcher(JWK_A), FakeClock()))
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw))
+    try:
+        headers = {"Authorization": f"Bearer {sign(_PRIVATE_A, 'key-a', sub='user_cached')}"}
+        hits = token_cache.hits
+        for _ in range(3):
+            assert client.get("/projects", headers=headers).status_code == 200
+        assert len(decodes) == 1
+        assert token_cache.hits == hits + 2
+    finally:
+        set_key_store(None)
+
+
+# ---------- Verified-token cache ----------
+
+def test_token_cache_hit_and_expiry():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(max_size=10, clock_skew=30, clock=clock)
+
+    assert cache.get("tok", 1) is None
+    cache.put("tok", "user_1", exp=clock.now + 100, keys_version=1)
+    assert cache.get("tok", 1) == "user_1"
+
+    # Expires at exp minus the skew allowance
+    clock.now += 71
+    assert cache.get("tok", 1) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_token_cache_skips_tokens_without_usable_exp():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(max_size=10, clock_skew=30, clock=clock)
+    cache.put("no-exp", "u", exp=None, keys_version=1)
+    cache.put("nearly-expired", "u", exp=clock.now + 10, keys_version=1)
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_lru_eviction():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(max_size=2, clock_skew=0, clock=clock)
+    cache.put("a", "ua", exp=clock.now + 100, keys_version=1)
+    cache.put("b", "ub", exp=clock.now + 100, keys_version=1)
+    cache.get("a", 1)  # a is now most recently used
+    cache.put("c", "uc", exp=clock.now + 100, keys_version=1)
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == "ua"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_token_cache_cleared_when_keys_change():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(max_size=10, clock_skew=0, clock=clock)
+    cache.put("tok", "u", exp=clock.now + 100, keys_version=1)
+    assert cache.get("tok", 2) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_disabled():
+    cache = VerifiedTokenCache(max_size=0, clock_skew=0)
+    cache.put("tok", "u", exp=time.time() + 100, keys_version=1)
+    assert cache.get("tok", 1) is None
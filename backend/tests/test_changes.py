@@ -0,0 +1,293 @@
+import asyncio
+import json
+import threading
+import time
+
+import psycopg
+import pytest
+from sqlalchemy import text
+
+from app.core.change_feed import (
+    CHANNEL,
+    DELIVERED,
+    HEARTBEAT,
+    RESYNC,
+    ChangeFeed,
+    Subscription,
+    change_event,
+    listen_conninfo,
+    publish,
+    sse_frame,
+)
+from app.core.settings import settings
+
+from conftest import TEST_OWNER_ID, sign_token
+
+# The feed is driven by NOTIFY, which is only sent on a real commit
+pytestmark = pytest.mark.commits
+
+CONNINFO = listen_conninfo(settings.DATABASE_URL)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture()
+def listener():
+    with psycopg.connect(CONNINFO, autocommit=True) as conn:
+        conn.execute(f"LISTEN {CHANNEL}")
+
+        def received(count, timeout=2.0):
+            notifies = conn.notifies(timeout=timeout, stop_after=count)
+            return [json.loads(n.payload) for n in notifies]
+
+        yield received
+
+
+def test_writes_notify_on_commit(client, listener):
+    p = client.post("/projects", json={"name": "Live"}).json()
+    t = client.post(f"/projects/{p['id']}/tasks", json={"title": "card"}).json()
+    client.patch(f"/tasks/{t['id']}", json={"status": "done"})
+    client.delete(f"/tasks/{t['id']}")
+    client.put(f"/projects/{p['id']}", json={"name": "Renamed"})
+    client.delete(f"/projects/{p['id']}")
+
+    received = listener(6)
+    assert {e["owner_id"] for e in received} == {TEST_OWNER_ID}
+    assert [(e["type"], e["action"], e["id"], e["project_id"]) for e in received] == [
+        ("project", "created", p["id"], p["id"]),
+        ("task", "created", t["id"], p["id"]),
+        ("task", "updated", t["id"], p["id"]),
+        ("task", "deleted", t["id"], p["id"]),
+        ("project", "updated", p["id"], p["id"]),
+        ("project", "deleted", p["id"], p["id"]),
+    ]
+
+
+def test_single_writes_notify_from_the_write_statement(client, listener):
+    from app.core.request_metrics import SQL_STATEMENTS
+
+    writes = [
+        ("POST", "/projects", lambda ids: client.post("/projects", json={"name": "One"})),
+        ("POST", "/projects/{project_id}/tasks", lambda ids: client.post(f"/projects/{ids['p']}/tasks", json={"title": "t"})),
+        ("PATCH", "/tasks/{task_id}", lambda ids: client.patch(f"/tasks/{ids['t']}", json={"status": "done"})),
+        ("DELETE", "/tasks/{task_id}", lambda ids: client.delete(f"/tasks/{ids['t']}")),
+        ("PUT", "/projects/{project_id}", lambda ids: client.put(f"/projects/{ids['p']}", json={"name": "Two"})),
+        ("DELETE", "/projects/{project_id}", lambda ids: client.delete(f"/projects/{ids['p']}")),
+    ]
+    ids = {}
+    for method, route, write in writes:
+        statements = SQL_STATEMENTS.labels(method, route)
+        before = statements.sum
+        r = write(ids)
+        assert r.status_code < 300, r.text
+        if method == "POST":
+            ids["p" if route == "/projects" else "t"] = r.json()["id"]
+        assert statements.sum == before + 1, route
+
+    assert [(e["type"], e["action"]) for e in listener(6)] == [
+        ("project", "created"), ("task", "created"), ("task", "updated"),
+        ("task", "deleted"), ("project", "updated"), ("project", "deleted"),
+    ]
+
+
+def test_empty_updates_notify_and_invalidate_nothing(client, listener):
+    from app.core.response_cache import get_response_cache, owner_scope, project_scope
+
+    p = client.post("/projects", json={"name": "Same"}).json()
+    t = client.post(f"/projects/{p['id']}/tasks", json={"title": "same"}).json()
+    listener(2)
+    scopes = [owner_scope(TEST_OWNER_ID), project_scope(p["id"])]
+    generations = get_response_cache().backend.generations(scopes)
+
+    r = client.patch(f"/tasks/{t['id']}", json={})
+    assert r.status_code == 200 and r.json()["title"] == "same"
+    r = client.put(f"/projects/{p['id']}", json={})
+    assert r.status_code == 200 and r.json()["name"] == "Same"
+    # Still answered as updates would be: 404s and If-Match failures
+    assert client.patch("/tasks/999999", json={}).status_code == 404
+    assert client.put(f"/projects/{p['id']}", json={}, headers={"If-Match": '"project-0-0"'}).status_code == 412
+
+    assert listener(1, timeout=0.2) == []
+    assert get_response_cache().backend.generations(scopes) == generations
+
+
+def test_failed_writes_notify_nothing(client, listener):
+    assert client.patch("/tasks/999", json={"title": "x"}).status_code == 404
+    assert client.delete("/projects/999").status_code == 404
+    assert listener(1, timeout=0.2) == []
+
+
+def test_batch_and_import_notify(client, listener):
+    p = client.post("/projects", json={"name": "Bulk"}).json()
+    listener(1)
+
+    r = client.post(f"/projects/{p['id']}/tasks:batch", json={"items": [{"title": "a"}, {"title": "b"}]})
+    ids = [item["task"]["id"] for item in r.json()["results"]]
+    assert [(e["action"], e["id"]) for e in listener(2)] == [("created", ids[0]), ("created", ids[1])]
+
+    client.post("/import/tasks", content=b'{"title": "c"}\n{"title": "d"}', params={"project_id": p["id"]})
+    (event,) = listener(1)
+    assert (event["action"], event["project_id"], event["count"]) == ("imported", p["id"], 2)
+
+
+def test_batch_update_notifies_only_changed_tasks(client, listener):
+    p = client.post("/projects", json={"name": "Bulk"}).json()
+    a, b = (client.post(f"/projects/{p['id']}/tasks", json={"title": t}).json() for t in "ab")
+    listener(3)
+
+    r = client.patch("/tasks:batch", json={"items": [{"id": a["id"], "status": "done"}, {"id": b["id"]}]})
+    assert [res["status"] for res in r.json()["results"]] == [200, 200]
+    assert [(e["action"], e["id"]) for e in listener(2, timeout=0.5)] == [("updated", a["id"])]
+
+    client.patch("/tasks:batch", json={"items": [{"id": b["id"]}]})
+    assert listener(1, timeout=0.2) == []
+
+
+def test_disabled_feed_skips_notify(client, listener, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_FEED_ENABLED", False)
+    client.post("/projects", json={"name": "Quiet"})
+    assert listener(1, timeout=0.2) == []
+
+
+def test_changes_stream_delivers_only_own_events(client, db_session):
+    feed = client.app.state.change_feed
+    responses = []
+    reader = threading.Thread(target=lambda: responses.append(client.get("/changes")))
+    reader.start()
+    wait_until(lambda: feed.subscriber_count(TEST_OWNER_ID) == 1 and feed.listening)
+
+    delivered = DELIVERED.value
+    publish(db_session, change_event("someone_else", "project", "created", 1, 1))
+    db_session.commit()
+    p = client.post("/projects", json={"name": "Live"}).json()
+    t = client.post(f"/projects/{p['id']}/tasks", json={"title": "card"}).json()
+    wait_until(lambda: DELIVERED.value == delivered + 2)
+
+    # Closing the feed (worker shutdown) ends the stream
+    client.portal.call(feed.close)
+    reader.join(5)
+    (r,) = responses
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse(r.text) == [
+        ("ready", {}),
+        ("change", {"type": "project", "action": "created", "id": p["id"], "project_id": p["id"]}),
+        ("change", {"type": "task", "action": "created", "id": t["id"], "project_id": p["id"]}),
+    ]
+    assert feed.subscriber_count() == 0
+
+
+def test_stream_asks_for_reauth_when_the_token_expires(client):
+    token = sign_token(exp=int(time.time()) + 1)
+    r = client.get("/changes", headers={"Authorization": f"Bearer {token}"})
+    assert parse_sse(r.text) == [("ready", {}), ("reauth", {})]
+    assert client.app.state.change_feed.subscriber_count() == 0
+
+
+def test_stream_asks_for_reauth_when_the_keys_rotate(client, monkeypatch):
+    from app.api.v1 import changes
+
+    monkeypatch.setattr(settings, "CHANGE_FEED_HEARTBEAT", 0.05)
+    feed = client.app.state.change_feed
+    responses = []
+    reader = threading.Thread(target=lambda: responses.append(client.get("/changes")))
+    reader.start()
+    wait_until(lambda: feed.subscriber_count(TEST_OWNER_ID) == 1)
+
+    monkeypatch.setattr(changes, "keys_version", lambda: ("rotated",))
+    reader.join(5)
+    (r,) = responses
+    assert parse_sse(r.text) == [("ready", {}), ("reauth", {})]
+
+
+def test_slow_subscriber_gets_single_resync():
+    subscription = Subscription("u", max_queue=2)
+    for i in range(3):
+        subscription.put(sse_frame("change", str(i)))
+    assert subscription.queue.qsize() == 1
+    assert subscription.queue.get_nowait() == RESYNC
+
+
+def test_idle_subscriber_gets_heartbeat():
+    subscription = Subscription("u", max_queue=2)
+    assert asyncio.run(subscription.next_frame(0.01)) == HEARTBEAT
+
+
+def test_feed_resyncs_streams_after_reconnect(db_session):
+    async def scenario():
+        feed = ChangeFeed(CONNINFO, max_queue=10, reconnect_delay=0.05)
+        subscription = await feed.subscribe("u")
+        try:
+            assert feed.listening
+            # Kill the LISTEN connection from the outside
+            await asyncio.to_thread(lambda: (
+                db_session.execute(text(
+                    "SELECT pg_terminate_backend(pid) FROM pg_stat_activity"
+                    " WHERE query = :query AND pid <> pg_backend_pid()"
+                ), {"query": f"LISTEN {CHANNEL}"}),
+                db_session.commit(),
+            ))
+            return await asyncio.wait_for(subscription.queue.get(), 5)
+        finally:
+            await feed.close()
+
+    assert asyncio.run(scenario()) == RESYNC
+
+
+def test_feed_resyncs_streams_that_joined_while_it_was_down(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.1)
+
+    async def scenario():
+        feed = ChangeFeed("postgresql://postgres@127.0.0.1:1/down", max_queue=10, reconnect_delay=0.05)
+        subscription = await feed.subscribe("u")
+        try:
+            assert not feed.listening
+            feed.conninfo = CONNINFO
+            return await asyncio.wait_for(subscription.queue.get(), 5)
+        finally:
+            await feed.close()
+
+    assert asyncio.run(scenario()) == RESYNC
+
+
+def test_feed_survives_unexpected_errors(monkeypatch, db_session):
+    async def scenario():
+        feed = ChangeFeed(CONNINFO, max_queue=10, reconnect_delay=0.05)
+        dispatch = feed.dispatch
+        calls = []
+
+        def flaky_dispatch(payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            dispatch(payload)
+
+        monkeypatch.setattr(feed, "dispatch", flaky_dispatch)
+        subscription = await feed.subscribe("u")
+        notify = lambda: (publish(db_session, change_event("u", "task", "created", 1, 1)), db_session.commit())
+        try:
+            await asyncio.to_thread(notify)
+            assert await asyncio.wait_for(subscription.queue.get(), 5) == RESYNC
+            assert feed._task is not None
+            await asyncio.wait_for(feed._listening.wait(), 5)
+            await asyncio.to_thread(notify)
+            frame = await asyncio.wait_for(subscription.queue.get(), 5)
+            return frame.startswith(b"event: change")
+        finally:
+            await feed.close()
+
+    assert asyncio.run(scenario())
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.project import Project
+from app.models.task import Task
+
+
+def create_project(client, name="Demo"):
+    r = client.post("/projects", json={"name": name, "description": "x"})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def create_task(client, project_id, **fields):
+    payload = {"title": "T", **fields}
+    r = client.post(f"/projects/{project_id}/tasks", json=payload)
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def test_dashboard_empty(client):
+    r = client.get("/dashboard")
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["project_count"] == 0
+    assert data["task_count"] == 0
+    assert data["status_counts"] == {"not_started": 0, "in_progress": 0, "done": 0}
+    assert data["upcoming"] == []
+    assert data["projects"] == []
+
+
+def test_dashboard_counts_and_rollups(client):
+    now = datetime.now(timezone.utc)
+    p1 = create_project(client, name="P1")
+    p2 = create_project(client, name="P2")
+    create_project(client, name="Empty")
+
+    create_task(client, p1["id"], status="done", priority="high")
+    create_task(client, p1["id"], status="in_progress", deadline=(now - timedelta(days=1)).isoformat())
+    create_task(client, p2["id"], title="Soon", deadline=(now + timedelta(days=2)).isoformat())
+    # Done tasks are never overdue
+    create_task(client, p2["id"], status="done", deadline=(now - timedelta(days=3)).isoformat())
+
+    r = client.get("/dashboard")
+    assert r.status_code == 200, r.text
+    data = r.json()
+
+    assert data["project_count"] == 3
+    assert data["task_count"] == 4
+    assert data["status_counts"] == {"not_started": 1, "in_progress": 1, "done": 2}
+    assert data["priority_counts"]["high"] == 1
+    assert data["priority_counts"]["medium"] == 3
+    assert data["overdue_count"] == 1
+    assert data["upcoming_count"] == 1
+    assert [t["title"] for t in data["upcoming"]] == ["Soon"]
+
+    rollups = {p["name"]: p for p in data["projects"]}
+    assert rollups["P1"]["task_count"] == 2
+    assert rollups["P1"]["overdue_count"] == 1
+    assert rollups["P2"]["status_counts"]["done"] == 1
+    assert rollups["Empty"]["task_count"] == 0
+
+
+def test_dashboard_is_owner_scoped(client, db_session):
+    other = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(other)
+    db_session.flush()
+    db_session.add(Task(project_id=other.id, owner_id="someone_else", title="Hidden"))
+    db_session.commit()
+
+    data = client.get("/dashboard").json()
+    assert data["project_count"] == 0
+    assert data["task_count"] == 0
+
+
+# updated_at is now(), which only moves between committed transactions
+@pytest.mark.commits
+def test_dashboard_lists_recently_updated_projects(client):
+    a, b, c = (create_project(client, name=name) for name in "ABC")
+    client.put(f"/projects/{a['id']}", json={"name": "A2"})
+
+    data = client.get("/dashboard", params={"recent_limit": 2}).json()
+    assert [p["name"] for p in data["recent_projects"]] == ["A2", "C"]
+    assert client.get("/dashboard", params={"recent_limit": 0}).json()["recent_projects"] == []
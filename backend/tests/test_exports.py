@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.core.settings import settings
+from app.models.project import Project
+from app.models.task import Task
+
+# Exports read through their own engine connection
+pytestmark = pytest.mark.commits
+
+
+def create_project(client, name="Demo"):
+    r = client.post("/projects", json={"name": name})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def create_task(client, project_id, **fields):
+    r = client.post(f"/projects/{project_id}/tasks", json={"title": "t", **fields})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def add_foreign_task(db_session):
+    other = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(other)
+    db_session.flush()
+    db_session.add(Task(project_id=other.id, owner_id="someone_else", title="Hidden"))
+    db_session.commit()
+
+
+def test_export_tasks_ndjson_streams_all_rows_in_batches(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    add_foreign_task(db_session)
+    p = create_project(client)
+    created = [create_task(client, p["id"], title=f"task {i}") for i in range(5)]
+
+    r = client.get("/export/tasks")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="tasks.ndjson"' in r.headers["content-disposition"]
+
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    # Same fields and values as the list endpoint, owner-scoped, id order
+    assert lines == created
+
+
+def test_export_tasks_filters(client):
+    p = create_project(client)
+    create_task(client, p["id"], title="open")
+    done = create_task(client, p["id"], title="finished", status="done")
+
+    r = client.get("/export/tasks", params={"status": "done"})
+    assert [json.loads(line)["id"] for line in r.text.splitlines()] == [done["id"]]
+
+
+def test_export_tasks_csv(client):
+    p = create_project(client)
+    create_task(client, p["id"], title='comma, "quote"', deadline="2030-01-02T03:04:05Z")
+    create_task(client, p["id"], title="no deadline")
+
+    r = client.get("/export/tasks", params={"format": "csv"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert list(rows[0]) == [
+        "id", "project_id", "owner_id", "title", "status", "priority",
+        "deadline", "created_at", "updated_at",
+    ]
+    assert rows[0]["title"] == 'comma, "quote"'
+    assert rows[0]["deadline"] == "2030-01-02T03:04:05+00:00"
+    assert rows[1]["deadline"] == ""
+    assert rows[1]["status"] == "not_started"
+
+
+def test_export_projects(client, db_session):
+    add_foreign_task(db_session)
+    create_project(client, name="A")
+    create_project(client, name="B")
+
+    r = client.get("/export/projects")
+    assert [json.loads(line)["name"] for line in r.text.splitlines()] == ["A", "B"]
+
+    r = client.get("/export/projects", params={"format": "csv"})
+    assert r.text.splitlines()[0] == (
+        "id,owner_id,name,description,created_at,updated_at,"
+        "task_count,not_started_count,in_progress_count,done_count,open_with_deadline_count"
+    )
+    assert len(r.text.splitlines()) == 3
+
+
+def test_export_empty(client):
+    assert client.get("/export/tasks").content == b""
+    assert client.get("/export/tasks?format=csv").text.startswith("id,project_id")
@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+from app.api.v1.task_imports import RecordSplitter
+from app.core.settings import settings
+from app.models.project import Project
+from app.models.task import Task
+
+# Imports stream rows through their own engine connection
+pytestmark = pytest.mark.commits
+
+
+def create_project(client, name="Demo"):
+    r = client.post("/projects", json={"name": name})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def ndjson(*rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+def import_tasks(client, body: bytes, **params):
+    return client.post("/import/tasks", content=body, params=params)
+
+
+def test_import_ndjson_into_several_projects(client):
+    a = create_project(client, "A")
+    b = create_project(client, "B")
+
+    r = import_tasks(client, ndjson(
+        {"project_id": a["id"], "title": "one", "status": "done", "deadline": "2030-01-02T03:04:05Z"},
+        {"project_id": b["id"], "title": "two", "priority": "high"},
+        {"project_id": a["id"], "title": "three"},
+    ))
+    assert r.status_code == 200, r.text
+    assert r.json() == {"received": 3, "imported": 3, "failed": 0, "errors": []}
+
+    tasks = client.get(f"/projects/{a['id']}/tasks").json()
+    assert [(t["title"], t["status"], t["deadline"]) for t in tasks] == [
+        ("one", "done", "2030-01-02T03:04:05Z"),
+        ("three", "not_started", None),
+    ]
+    assert [(t["title"], t["priority"]) for t in client.get(f"/projects/{b['id']}/tasks").json()] == [
+        ("two", "high"),
+    ]
+
+
+def test_import_csv_with_quoted_newlines_and_defaults(client):
+    p = create_project(client)
+    body = (
+        "title,status,deadline\r\n"
+        '"multi\nline, with comma",in_progress,2030-01-02T03:04:05Z\r\n'
+        'plain,,\r\n'
+    ).encode()
+
+    r = client.post(
+        "/import/tasks",
+        content=body,
+        params={"project_id": p["id"]},
+        headers={"Content-Type": "text/csv"},
+    )
+    assert r.json() == {"received": 2, "imported": 2, "failed": 0, "errors": []}
+
+    tasks = client.get(f"/projects/{p['id']}/tasks").json()
+    assert [(t["title"], t["status"]) for t in tasks] == [
+        ("multi\nline, with comma", "in_progress"),
+        ("plain", "not_started"),
+    ]
+
+
+def test_import_reports_errors_per_line_and_keeps_valid_rows(client, db_session):
+    p = create_project(client)
+    theirs = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(theirs)
+    db_session.commit()
+
+    body = b"\n".join([
+        json.dumps({"project_id": p["id"], "title": "ok"}).encode(),
+        b"{not json",
+        b"",
+        json.dumps({"project_id": p["id"], "title": ""}).encode(),
+        json.dumps({"project_id": theirs.id, "title": "sneaky"}).encode(),
+        json.dumps({"title": "no project"}).encode(),
+        b"[1, 2]",
+    ])
+    r = import_tasks(client, body)
+    result = r.json()
+    assert (result["received"], result["imported"], result["failed"]) == (6, 1, 5)
+    # Line numbers count blank lines too
+    assert [(e["line"], e["error"]) for e in result["errors"] if isinstance(e["error"], str)] == [
+        (2, "Invalid JSON"),
+        (5, "Project not found"),
+        (7, "Expected a JSON object"),
+    ]
+    validation = {e["line"]: e["error"] for e in result["errors"] if isinstance(e["error"], list)}
+    assert validation[4][0]["loc"] == ["title"]
+    assert validation[6][0]["loc"] == ["project_id"]
+
+    assert [t["title"] for t in client.get(f"/projects/{p['id']}/tasks").json()] == ["ok"]
+    # The foreign project got nothing
+    assert db_session.query(Task).filter_by(project_id=theirs.id).count() == 0
+
+
+def test_import_caps_reported_errors(client, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERRORS", 2)
+    r = import_tasks(client, b"x\nx\nx\n")
+    result = r.json()
+    assert result["failed"] == 3
+    assert [e["line"] for e in result["errors"]] == [1, 2]
+
+
+def test_import_row_limit_rolls_back(client, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_ROWS", 2)
+    p = create_project(client)
+
+    r = import_tasks(client, ndjson(*({"title": f"t{i}"} for i in range(3))), project_id=p["id"])
+    assert r.status_code == 413
+    assert client.get(f"/projects/{p['id']}/tasks").json() == []
+
+
+def test_import_rejects_invalid_utf8(client):
+    r = import_tasks(client, b'{"title": "\xff"}')
+    assert r.status_code == 400
+
+
+def test_import_invalidates_cached_lists(client):
+    p = create_project(client)
+    assert client.get(f"/projects/{p['id']}/tasks").json() == []
+
+    import_tasks(client, ndjson({"title": "fresh"}), project_id=p["id"])
+    assert [t["title"] for t in client.get(f"/projects/{p['id']}/tasks").json()] == ["fresh"]
+
+
+def test_record_splitter_handles_arbitrary_chunk_boundaries():
+    text = 'a,b\r\n"x\ny",2\n\nlast,3'
+    expected = [(1, "a,b"), (2, '"x\ny",2'), (5, "last,3")]
+    for size in range(1, len(text) + 1):
+        splitter = RecordSplitter(quoted=True)
+        records = []
+        for i in range(0, len(text), size):
+            records += splitter.feed(text[i:i + size])
+        records += splitter.finish()
+        assert records == expected, size
+
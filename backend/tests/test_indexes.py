@@ -0,0 +1,218 @@
+"""
+EXPLAIN checks for the hot owner-scoped queries.
+
+Seeds enough rows across many owners that a sequential scan is never the
+cheap option, then asserts each query's plan reads `tasks`/`projects`
+through one of the expected indexes.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.api.v1.tasks import (
+    DUE_SORT_KEY,
+    TASK_READ_COLUMNS,
+    TASK_SORT_KEYS,
+    TaskSort,
+    due_counts_statement,
+    due_statement,
+    due_windows,
+    task_list_statement,
+)
+from app.api.v1.projects import PROJECT_READ_COLUMNS, PROJECT_SORT_KEY
+from app.api.v1.sync import changed_statement
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.task import TaskStatus
+from app.utils.pagination import encode_cursor, page_statement
+
+from conftest import engine
+
+OWNERS = 200
+PROJECTS_PER_OWNER = 5
+TASKS_PER_PROJECT = 40
+OWNER = "owner_7"
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """
+    Seeded once for the whole module, inside a transaction that is rolled
+    back after it; ANALYZE is transactional too.
+    """
+    connection = engine.connect()
+    outer = connection.begin()
+    db_session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    db_session.execute(text("""
+        INSERT INTO projects (owner_id, name)
+        SELECT 'owner_' || o, 'project ' || p
+        FROM generate_series(1, :owners) o, generate_series(1, :projects) p
+    """), {"owners": OWNERS, "projects": PROJECTS_PER_OWNER})
+    db_session.execute(text("""
+        INSERT INTO tasks (project_id, owner_id, title, status, priority, deadline)
+        SELECT p.id, p.owner_id, 'task ' || t,
+               (ARRAY['not_started', 'in_progress', 'done'])[1 + t % 3]::task_status,
+               (ARRAY['low', 'medium', 'high', 'urgent'])[1 + t % 4]::task_priority,
+               CASE WHEN t % 5 = 0 THEN NULL
+                    ELSE CAST(:now AS timestamptz) + (t - 20) * interval '1 day' END
+        FROM projects p, generate_series(1, :tasks) t
+        ORDER BY t, p.id  -- interleave owners, as real traffic would
+    """), {"tasks": TASKS_PER_PROJECT, "now": NOW})
+    db_session.commit()
+    db_session.execute(text("ANALYZE projects"))
+    db_session.execute(text("ANALYZE tasks"))
+    db_session.commit()
+    yield db_session
+    db_session.close()
+    outer.rollback()
+    connection.close()
+
+
+def explain(db, stmt) -> dict:
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+
+
+def scans(plan: dict) -> list[tuple[str, str, str | None]]:
+    """
+    (node type, relation, index) for every scan node in the plan tree. A
+    Bitmap Heap Scan is reported through the Bitmap Index Scans beneath it.
+    """
+    found = []
+    if plan["Node Type"] != "Bitmap Heap Scan" and ("Relation Name" in plan or "Index Name" in plan):
+        found.append((plan["Node Type"], plan.get("Relation Name"), plan.get("Index Name")))
+    for child in plan.get("Plans", []):
+        found.extend(scans(child))
+    return found
+
+
+def first_project_id(db) -> int:
+    return db.scalar(select(func.min(Project.id)).where(Project.owner_id == OWNER))
+
+
+def next_xid(db) -> int:
+    # A /sync cursor newer than every seeded row
+    return db.scalar(select(func.max(Task.change_xid))) + 1
+
+
+def page(stmt, sort=TaskSort.id, descending=False):
+    return page_statement(
+        stmt,
+        sort=TASK_SORT_KEYS[sort],
+        id_column=Task.id,
+        page_size=50,
+        after=None,
+        descending=descending,
+    )
+
+
+def due_page(stmt, descending, after=None):
+    return page_statement(
+        stmt, sort=DUE_SORT_KEY, id_column=Task.id, page_size=50, after=after, descending=descending,
+    )
+
+
+HOT_QUERIES = {
+    "projects_page": (
+        lambda db: page_statement(
+            select(Project).where(Project.owner_id == OWNER),
+            sort=PROJECT_SORT_KEY, id_column=Project.id, page_size=50, after=None, descending=False,
+        ),
+        {"ix_projects_owner_id_id"},
+    ),
+    "project_tasks_page": (
+        lambda db: page(task_list_statement(OWNER, project_ids=[first_project_id(db)])),
+        {"ix_tasks_owner_id_project_id_id"},
+    ),
+    "tasks_page": (
+        lambda db: page(task_list_statement(OWNER)),
+        {"ix_tasks_owner_id_id"},
+    ),
+    "tasks_by_deadline": (
+        lambda db: page(task_list_statement(OWNER), sort=TaskSort.deadline),
+        {"ix_tasks_owner_id_deadline_id"},
+    ),
+    "tasks_by_updated_at": (
+        lambda db: page(task_list_statement(OWNER), sort=TaskSort.updated_at),
+        {"ix_tasks_owner_id_updated_at_id"},
+    ),
+    "tasks_status_deadline_window": (
+        lambda db: page(
+            task_list_statement(
+                OWNER,
+                status_in=[TaskStatus.in_progress],
+                deadline_from=NOW,
+                deadline_to=NOW + timedelta(days=7),
+            ),
+            sort=TaskSort.deadline,
+        ),
+        {"ix_tasks_owner_id_status_deadline", "ix_tasks_owner_id_deadline_id", "ix_tasks_open_owner_id_deadline"},
+    ),
+    "open_upcoming": (
+        lambda db: select(Task)
+        .where(
+            Task.owner_id == OWNER,
+            Task.status != TaskStatus.done,
+            Task.deadline >= NOW,
+            Task.deadline < NOW + timedelta(days=7),
+        )
+        .order_by(Task.deadline.asc(), Task.id.asc())
+        .limit(5),
+        {"ix_tasks_open_owner_id_deadline"},
+    ),
+    "due_upcoming": (
+        lambda db: due_page(due_statement(OWNER, due_windows(False, timezone.utc, NOW)), descending=False),
+        {"ix_tasks_open_owner_id_deadline"},
+    ),
+    "due_overdue_next_page": (
+        lambda db: due_page(
+            due_statement(OWNER, due_windows(True, timezone.utc, NOW)),
+            descending=True,
+            after=encode_cursor({"s": "deadline", "d": True, "v": NOW - timedelta(days=10), "id": 10 ** 9}),
+        ),
+        {"ix_tasks_open_owner_id_deadline"},
+    ),
+    "due_counts": (
+        lambda db: due_counts_statement(OWNER, due_windows(False, timezone.utc, NOW)),
+        {"ix_tasks_open_owner_id_deadline"},
+    ),
+    "tasks_sync_delta": (
+        lambda db: changed_statement(TASK_READ_COLUMNS, Task, OWNER, next_xid(db)),
+        {"ix_tasks_owner_id_change_xid"},
+    ),
+    "projects_sync_delta": (
+        lambda db: changed_statement(PROJECT_READ_COLUMNS, Project, OWNER, next_xid(db)),
+        {"ix_projects_owner_id_id"},
+    ),
+    "get_task": (
+        lambda db: select(Task).where(Task.id == 1234, Task.owner_id == OWNER),
+        {"tasks_pkey", "ix_tasks_owner_id_id"},
+    ),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(seeded, name):
+    build, expected = HOT_QUERIES[name]
+    plan = explain(seeded, build(seeded))
+    found = scans(plan)
+
+    assert found, plan
+    for node_type, relation, index in found:
+        assert node_type != "Seq Scan", f"{name}: seq scan on {relation}\n{json.dumps(plan, indent=2)}"
+        assert index in expected, f"{name}: used {index} on {relation}, expected one of {expected}"
+
+
+def test_owner_scoped_aggregate_avoids_seq_scan(seeded):
+    stmt = (
+        select(Task.project_id, Task.status, Task.priority, func.count())
+        .where(Task.owner_id == OWNER)
+        .group_by(Task.project_id, Task.status, Task.priority)
+    )
+    for node_type, relation, _ in scans(explain(seeded, stmt)):
+        assert node_type != "Seq Scan", relation
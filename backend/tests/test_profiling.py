@@ -0,0 +1,179 @@
+import asyncio
+import sys
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.auth import get_current_user_id, get_current_user_id_async
+from app.core.profiling import ProfilingMiddleware, RequestProfile, profile_token, verify_profile_token
+from app.core.settings import settings
+from app.db.deps import get_db
+from app.main import create_app
+
+from conftest import TEST_OWNER_ID, engine
+
+SECRET = "profiling-secret"
+ADMIN = "user_admin"
+
+
+@pytest.fixture()
+def profiled_client(db_mode, monkeypatch, db_session):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_SECRET", SECRET)
+    monkeypatch.setattr(settings, "PROFILING_ADMIN_USER_IDS", [ADMIN])
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL", 0.0005)
+
+    def fake_authenticate(token):
+        if token == "admin-token":
+            return ADMIN
+        if token == "user-token":
+            return TEST_OWNER_ID
+        raise HTTPException(status_code=401)
+
+    monkeypatch.setattr(profiling, "authenticate", fake_authenticate)
+    # Sync routes use the tests' engine
+    profiling.instrument_engine(engine)
+
+    app = create_app(db_mode=db_mode)
+
+    def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_id] = lambda: TEST_OWNER_ID
+    app.dependency_overrides[get_current_user_id_async] = lambda: TEST_OWNER_ID
+    with TestClient(app) as c:
+        yield c
+
+
+def frame_names(document) -> set[str]:
+    return {frame["name"] for frame in document["shared"]["frames"]}
+
+
+# ---------- Tokens ----------
+
+def test_profile_tokens_expire_and_need_the_secret():
+    token = profile_token(60, SECRET)
+    assert verify_profile_token(token, SECRET)
+    assert not verify_profile_token(token, "other-secret")
+    assert not verify_profile_token(token, None)
+    assert not verify_profile_token(profile_token(-1, SECRET), SECRET)
+    assert not verify_profile_token("garbage", SECRET)
+
+
+def test_profiling_is_off_by_default():
+    app = create_app()
+    assert all(m.cls is not ProfilingMiddleware for m in app.user_middleware)
+
+
+# ---------- Sampling ----------
+
+def test_profile_follows_the_request_into_worker_threads():
+    def blocking_work():
+        time.sleep(0.05)
+
+    async def handler():
+        profile = RequestProfile("test", sys._getframe(), interval=0.001, max_seconds=5)
+        token = profiling._profile.set(profile)
+        profile.start()
+        try:
+            await asyncio.sleep(0.03)
+            await run_in_threadpool(blocking_work)
+        finally:
+            profile.stop()
+            profiling._profile.reset(token)
+        return profile
+
+    profile = asyncio.run(handler())
+    document = profile.speedscope()
+    names = frame_names(document)
+    assert "test_profile_follows_the_request_into_worker_threads.<locals>.blocking_work" in names
+    assert "[await]" in names
+    sampled = document["profiles"][0]
+    assert len(sampled["samples"]) == len(sampled["weights"]) > 0
+    assert sampled["endValue"] <= profile.duration
+
+
+# ---------- Middleware ----------
+
+def test_requests_without_a_token_are_not_profiled(profiled_client):
+    r = profiled_client.get("/projects")
+    assert r.status_code == 200
+    assert r.json() == []
+    assert "x-profiled-status" not in r.headers
+
+
+# Every statement is checked to be a SELECT, so no SAVEPOINTs
+@pytest.mark.commits
+def test_signed_header_returns_a_speedscope_profile(profiled_client):
+    p = profiled_client.post("/projects", json={"name": "Kanban"}).json()
+    profiled_client.post(f"/projects/{p['id']}/tasks", json={"title": "card"})
+
+    r = profiled_client.get(
+        f"/projects/{p['id']}/tasks", headers={"X-Profile-Token": profile_token(60, SECRET)},
+    )
+    assert r.status_code == 200
+    assert r.headers["x-profiled-status"] == "200"
+    document = r.json()
+    assert document["$schema"] == profiling.SPEEDSCOPE_SCHEMA
+    assert document["name"] == f"GET /projects/{p['id']}/tasks"
+
+    sampled, sql = document["profiles"]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    # Every statement the request ran, with its timing
+    assert sql["type"] == "evented"
+    opened = [e for e in sql["events"] if e["type"] == "O"]
+    assert len(opened) >= 2
+    frames = document["shared"]["frames"]
+    assert all(frames[e["frame"]]["name"].startswith("SQL SELECT") for e in opened)
+    assert all(e["at"] <= sql["endValue"] for e in sql["events"])
+
+
+def test_not_found_status_is_reported(profiled_client):
+    r = profiled_client.get("/projects/999999", headers={"X-Profile-Token": profile_token(60, SECRET)})
+    assert r.status_code == 200
+    assert r.headers["x-profiled-status"] == "404"
+
+
+def test_invalid_tokens_are_ignored(profiled_client):
+    for token in (profile_token(60, "wrong"), profile_token(-5, SECRET), "nope"):
+        r = profiled_client.get("/projects", headers={"X-Profile-Token": token})
+        assert r.json() == []
+        assert "x-profiled-status" not in r.headers
+
+
+def test_admin_query_flag(profiled_client):
+    r = profiled_client.get("/projects?profile=1", headers={"Authorization": "Bearer admin-token"})
+    assert r.headers["x-profiled-status"] == "200"
+    assert "profiles" in r.json()
+
+    for auth in ("Bearer user-token", "Bearer bad-token"):
+        r = profiled_client.get("/projects?profile=1", headers={"Authorization": auth})
+        assert r.json() == []
+        assert "x-profiled-status" not in r.headers
+
+
+def test_concurrent_profiles_are_capped(profiled_client, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_MAX_CONCURRENT", 0)
+    app = create_app()
+    with TestClient(app) as c:
+        r = c.get("/health", headers={"X-Profile-Token": profile_token(60, SECRET)})
+    assert r.json() == {"status": "ok"}
+    assert r.headers["x-profile"] == "busy"
+
+
+def test_profiles_are_stored_when_a_directory_is_set(profiled_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    with TestClient(create_app()) as c:
+        r = c.get("/health", headers={"X-Profile-Token": profile_token(60, SECRET)})
+
+    # The response is untouched; the profile is named in a header
+    assert r.json() == {"status": "ok"}
+    (stored,) = tmp_path.iterdir()
+    assert stored.name == r.headers["x-profile"]
+    assert "-health-" in stored.name and stored.name.endswith(".speedscope.json")
@@ -0,0 +1,134 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.project_counts import COUNTERS, reconcile
+from app.models.project import Project
+from conftest import TEST_OWNER_ID, engine
+
+
+def create_project(client, name="Demo"):
+    r = client.post("/projects", json={"name": name})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def create_task(client, project_id, **fields):
+    r = client.post(f"/projects/{project_id}/tasks", json={"title": "T", **fields})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def counts(project: dict) -> tuple:
+    return tuple(project[name] for name in COUNTERS)
+
+
+def stored_counts(db, project_id: int) -> tuple:
+    columns = [Project.__table__.c[name] for name in COUNTERS]
+    return tuple(db.execute(select(*columns).where(Project.id == project_id)).one())
+
+
+def test_task_writes_keep_the_counters(client):
+    p = create_project(client)
+    assert counts(p) == (0, 0, 0, 0, 0)
+
+    a = create_task(client, p["id"], deadline="2030-01-01T00:00:00Z")
+    create_task(client, p["id"], status="in_progress")
+    r = client.post(f"/projects/{p['id']}/tasks:batch", json={"items": [
+        {"title": "x", "status": "done", "deadline": "2030-01-01T00:00:00Z"},
+        {"title": "y"},
+    ]})
+    assert r.status_code == 200, r.text
+    # (total, not_started, in_progress, done, open with a deadline)
+    assert counts(client.get(f"/projects/{p['id']}").json()) == (4, 2, 1, 1, 1)
+
+    client.patch(f"/tasks/{a['id']}", json={"status": "done"})
+    assert counts(client.get(f"/projects/{p['id']}").json()) == (4, 1, 1, 2, 0)
+
+    client.patch("/tasks:batch", json={"items": [{"id": a["id"], "status": "in_progress"}]})
+    client.delete(f"/tasks/{r.json()['results'][1]['task']['id']}")
+    assert counts(client.get(f"/projects/{p['id']}").json()) == (3, 0, 2, 1, 1)
+
+
+@pytest.mark.commits
+def test_project_list_serves_fresh_counters(client):
+    p = create_project(client)
+    assert client.get("/projects").json()[0]["task_count"] == 0
+    etag = client.get("/projects").headers["ETag"]
+
+    create_task(client, p["id"])
+    r = client.get("/projects", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()[0]["task_count"] == 1
+    assert client.get("/projects?limit=10").json()["items"][0]["task_count"] == 1
+
+
+def test_bulk_statements_move_and_cascade(client, db_session):
+    a = create_project(client, "A")
+    b = create_project(client, "B")
+    db_session.execute(text(
+        "INSERT INTO tasks (project_id, owner_id, title, status, priority)"
+        " SELECT :a, :owner, 't' || i, 'not_started'::task_status, 'low'::task_priority"
+        " FROM generate_series(1, 5) i"
+        " UNION ALL SELECT :b, :owner, 'b', 'done', 'low'"
+    ), {"a": a["id"], "b": b["id"], "owner": TEST_OWNER_ID})
+    assert stored_counts(db_session, a["id"]) == (5, 5, 0, 0, 0)
+    assert stored_counts(db_session, b["id"]) == (1, 0, 0, 1, 0)
+
+    db_session.execute(text(
+        "UPDATE tasks SET project_id = :b, status = 'in_progress'::task_status"
+        " WHERE id IN (SELECT id FROM tasks WHERE project_id = :a ORDER BY id LIMIT 2)"
+    ), {"a": a["id"], "b": b["id"]})
+    assert stored_counts(db_session, a["id"]) == (3, 3, 0, 0, 0)
+    assert stored_counts(db_session, b["id"]) == (3, 0, 2, 1, 0)
+
+    # Deleting the project cascades to its tasks without tripping the trigger.
+    # Same session: in async mode the app's connection would wait on the
+    # project rows this uncommitted transaction has locked
+    db_session.execute(text("DELETE FROM projects WHERE id = :a"), {"a": a["id"]})
+    assert stored_counts(db_session, b["id"]) == (3, 0, 2, 1, 0)
+
+
+@pytest.mark.commits
+def test_only_counted_changes_touch_the_project(client):
+    p = create_project(client)
+    task = create_task(client, p["id"])
+    before = client.get(f"/projects/{p['id']}").headers["ETag"]
+
+    client.patch(f"/tasks/{task['id']}", json={"title": "Renamed", "priority": "high"})
+    assert client.get(f"/projects/{p['id']}").headers["ETag"] == before
+
+    client.patch(f"/tasks/{task['id']}", json={"status": "done"})
+    r = client.get(f"/projects/{p['id']}", headers={"If-None-Match": before})
+    assert r.status_code == 200
+    assert r.json()["updated_at"] == p["updated_at"]
+
+    # New counts aren't an edit to the project: If-Match still holds
+    r = client.put(f"/projects/{p['id']}", json={"name": "Renamed"}, headers={"If-Match": before})
+    assert r.status_code == 200, r.text
+
+
+@pytest.mark.commits
+def test_reconcile_reports_and_fixes_drift(client, db_session):
+    projects = [create_project(client, name) for name in "ABC"]
+    for p in projects:
+        create_task(client, p["id"], status="done")
+    drifted_id = projects[1]["id"]
+    db_session.execute(
+        text("UPDATE projects SET task_count = 7, done_count = 0 WHERE id = :id"), {"id": drifted_id}
+    )
+    db_session.commit()
+    factory = sessionmaker(bind=engine)
+
+    reported = []
+    result = reconcile(factory, batch_size=2, fix=False, report=reported.append)
+    assert result.checked == 3
+    assert [d.project_id for d in result.drifted] == [drifted_id]
+    assert reported[0].describe() == f"project {drifted_id} (owner {TEST_OWNER_ID}): task_count 7 -> 1, done_count 0 -> 1"
+    assert stored_counts(db_session, drifted_id) == (7, 0, 0, 0, 0)
+
+    assert [d.project_id for d in reconcile(factory, batch_size=2).drifted] == [drifted_id]
+    assert stored_counts(db_session, drifted_id) == (1, 0, 0, 1, 0)
+    assert reconcile(factory, batch_size=2).drifted == []
+    # The fix is a change like any other: the list isn't served from cache
+    assert [p["task_count"] for p in client.get("/projects").json()] == [1, 1, 1]
@@ -1,5 +1,7 @@
 import string
 
+import pytest
+
 
 # ---------- Helpers (small reusable functions) ----------
 
@@ -182,3 +184,137 @@ def test_create_many_projects_and_verify_unique_ids(client):
 
     # All ids should be unique
     assert len(ids) == len(set(ids))
+
+
+def test_unpaginated_list_is_capped(client, monkeypatch):
+    from app.core.settings import settings
+
+    monkeypatch.setattr(settings, "MAX_PAGE_SIZE", 2)
+    ids = [create_project(client, name=f"P{i}").json()["id"] for i in range(2)]
+    assert [p["id"] for p in client.get("/projects").json()] == ids
+
+    # Past the cap the list is refused rather than cut short
+    create_project(client, name="P2")
+    r = client.get("/projects")
+    assert r.status_code == 400
+    assert "limit" in r.json()["detail"]
+
+
+def test_list_projects_paginated(client):
+    for i in range(5):
+        create_project(client, name=f"Page-{i}")
+
+    r = client.get("/projects", params={"limit": 2, "include_total": True})
+    assert r.status_code == 200
+    page = r.json()
+    assert page["page_size"] == 2
+    assert page["total"] == 5
+    assert [p["name"] for p in page["items"]] == ["Page-0", "Page-1"]
+
+    # Follow the cursor to the end
+    names, after = [p["name"] for p in page["items"]], page["next_cursor"]
+    while after:
+        page = client.get("/projects", params={"limit": 2, "after": after}).json()
+        names += [p["name"] for p in page["items"]]
+        after = page["next_cursor"]
+    assert names == [f"Page-{i}" for i in range(5)]
+    # total is only computed on request
+    assert page["total"] is None
+
+
+def test_crud_routes_follow_db_mode(client):
+    import inspect
+
+    route = next(
+        r for r in client.app.routes
+        if getattr(r, "path", None) == "/projects" and "GET" in r.methods
+    )
+    is_async = client.app.state.db_mode == "async"
+    assert inspect.iscoroutinefunction(route.endpoint) == is_async
+
+
+# ---------- UPDATE tests ----------
+
+def test_update_project_partial(client):
+    created = create_project(client, name="Before", description="keep").json()
+
+    r = client.put(f"/projects/{created['id']}", json={"name": "After"})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["name"] == "After"
+    assert data["description"] == "keep"
+    assert data["updated_at"] >= created["updated_at"]
+
+
+def test_update_project_not_found(client):
+    r = client.put("/projects/999999999", json={"name": "x"})
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Project not found"
+
+
+def test_delete_project_removes_its_tasks(client):
+    created = create_project(client, name="WithTasks").json()
+    task = client.post(f"/projects/{created['id']}/tasks", json={"title": "t"}).json()
+
+    assert client.delete(f"/projects/{created['id']}").status_code == 204
+    assert client.get(f"/tasks/{task['id']}").status_code == 404
+
+
+def test_list_projects_conditional_get(client):
+    create_project(client, name="A")
+    r = client.get("/projects")
+    etag = r.headers["ETag"]
+    assert r.headers["Cache-Control"] == "private, no-cache"
+
+    r = client.get("/projects", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+
+    # Paging parameters change the representation, so the tag too
+    assert client.get("/projects?limit=1").headers["ETag"] != etag
+
+    create_project(client, name="B")
+    r = client.get("/projects", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()) == 2
+    assert r.headers["ETag"] != etag
+
+
+# updated_at is now(), which only moves between committed transactions
+@pytest.mark.commits
+def test_get_project_conditional_and_if_match(client):
+    created = create_project(client, name="Before")
+    etag = created.headers["ETag"]
+    project_id = created.json()["id"]
+
+    assert client.get(f"/projects/{project_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    r = client.put(f"/projects/{project_id}", json={"name": "After"}, headers={"If-Match": etag})
+    assert r.status_code == 200, r.text
+    new_etag = r.headers["ETag"]
+    assert new_etag != etag
+
+    # A writer holding the old version loses
+    r = client.put(f"/projects/{project_id}", json={"name": "Stale"}, headers={"If-Match": etag})
+    assert r.status_code == 412
+    assert client.get(f"/projects/{project_id}").json()["name"] == "After"
+
+    r = client.put("/projects/999999999", json={"name": "x"}, headers={"If-Match": etag})
+    assert r.status_code == 404
+
+
+def test_list_projects_bytes_match_model_serialization(client, db_session):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+
+    from app.models.project import Project
+    from app.schemas.project import ProjectRead
+
+    create_project(client, name="Ärger", description=None)
+    create_project(client, name="Two", description='multi\nline "desc"')
+
+    projects = db_session.scalars(select(Project).order_by(Project.id)).all()
+    expected = JSONResponse(jsonable_encoder([ProjectRead.model_validate(p) for p in projects])).body
+    assert client.get("/projects").content == expected
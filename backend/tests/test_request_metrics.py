@@ -0,0 +1,101 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app.core.request_metrics import (
+    AUTH_DURATION,
+    OVER_BUDGET,
+    POOL_WAIT,
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    SQL_DURATION,
+    SQL_STATEMENTS,
+    current_request,
+)
+from app.core.settings import settings
+
+
+def create_project(client, name="Metrics"):
+    r = client.post("/projects", json={"name": name})
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_requests_are_labelled_by_route_template(client):
+    project = create_project(client)
+    route = ("GET", "/projects/{project_id}")
+    duration = REQUEST_DURATION.labels(*route)
+    before = duration.count
+
+    assert client.get(f"/projects/{project['id']}").status_code == 200
+    assert client.get("/projects/999999").status_code == 404
+
+    assert duration.count == before + 2
+    assert REQUESTS_IN_FLIGHT.labels(*route).get() == 0
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/projects/{project_id}"}' in text
+    assert f'route="/projects/{project["id"]}"' not in text
+
+
+# Exact statement counts; the rolled-back mode adds SAVEPOINTs
+@pytest.mark.commits
+def test_sql_statements_and_time_are_counted_per_request(client):
+    # Also runs async: the hooks see the request through SQLAlchemy's greenlets
+    project = create_project(client)
+    route = ("GET", "/projects/{project_id}")
+    statements, sql = SQL_STATEMENTS.labels(*route), SQL_DURATION.labels(*route)
+    count, total = statements.count, statements.sum
+
+    client.get(f"/projects/{project['id']}")
+
+    assert statements.count == count + 1
+    assert statements.sum == total + 1
+    assert sql.sum > 0
+    assert POOL_WAIT.labels(*route).count == count + 1
+
+
+def test_statements_outside_requests_are_not_counted(db_session):
+    assert current_request() is None
+    statements = SQL_STATEMENTS.labels("GET", "/projects/{project_id}")
+    count = statements.count
+
+    db_session.execute(text("SELECT 1"))
+
+    assert statements.count == count
+
+
+
+def test_auth_time_is_zero_without_auth(client):
+    # The client fixture overrides auth; the histogram still gets a sample
+    auth = AUTH_DURATION.labels("GET", "/health")
+    count = auth.count
+
+    client.get("/health")
+
+    assert auth.count == count + 1
+
+
+# Exact statement counts; the rolled-back mode adds SAVEPOINTs
+@pytest.mark.commits
+def test_requests_over_the_query_budget_are_logged(client, monkeypatch, caplog):
+    project = create_project(client)
+    over = OVER_BUDGET.labels("GET", "/projects/{project_id}/tasks")
+    before = over.value
+
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", 1)
+    with caplog.at_level(logging.WARNING, logger="app.core.request_metrics"):
+        client.get(f"/projects/{project['id']}/tasks")
+        client.get(f"/projects/{project['id']}")
+
+    assert over.value == before + 1
+    [record] = caplog.records
+    assert "GET /projects/{project_id}/tasks ran 2 SQL statements (budget 1" in record.getMessage()
+
+
+def test_query_budget_off_by_default(client, caplog):
+    project = create_project(client)
+    with caplog.at_level(logging.WARNING, logger="app.core.request_metrics"):
+        client.get(f"/projects/{project['id']}/tasks")
+    assert settings.SQL_QUERY_BUDGET == 0
+    assert caplog.records == []
@@ -0,0 +1,168 @@
+from app.core.response_cache import (
+    EVICTIONS,
+    LOOKUPS,
+    MemoryBackend,
+    RedisBackend,
+    ResponseCache,
+    set_response_cache,
+)
+from app.models.project import Project
+
+
+class FakeRedis:
+    """Local stand-in for a shared redis-py client."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+class BrokenBackend:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("cache down")
+        return fail
+
+
+def test_memory_backend_is_bounded_lru():
+    before = EVICTIONS.value
+    backend = MemoryBackend(max_bytes=10, max_entries=2)
+    backend.set("a", b"1234")
+    backend.set("b", b"1234")
+    backend.get("a")  # "b" is now least recently used
+    backend.set("c", b"1234")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1234"
+    assert len(backend) == 2
+
+    backend.set("d", b"123456789")  # over max_bytes with the others
+    assert backend.size_bytes <= 10
+    assert backend.get("d") == b"123456789"
+    assert EVICTIONS.value - before == 3
+
+    backend.set("huge", b"x" * 11)  # larger than the whole cache
+    assert backend.get("huge") is None
+
+
+def test_memory_backend_entries_expire(monkeypatch):
+    import app.core.response_cache as response_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    backend = MemoryBackend(max_bytes=100, max_entries=10, ttl=30)
+    backend.set("a", b"1234")
+    now[0] += 29
+    assert backend.get("a") == b"1234"
+    now[0] += 2
+    assert backend.get("a") is None
+    assert len(backend) == 0 and backend.size_bytes == 0
+
+
+def test_memory_backend_bounds_generations_without_going_stale():
+    backend = MemoryBackend(max_bytes=100, max_entries=10, max_generations=2)
+    assert backend.generations(["a"]) == [0]
+    backend.bump(["a"])
+    backend.bump(["a"])
+    before = backend.generations(["a"])
+    backend.bump(["b"])
+    backend.bump(["c"])  # evicts "a"
+
+    assert len(backend._generations) == 2
+    # Never an older value than before: entries keyed on one can't come back
+    assert backend.generations(["a"])[0] >= before[0]
+
+
+def test_cache_is_off_unless_configured(monkeypatch):
+    from app.core.response_cache import build_response_cache
+    from app.core.settings import Settings, settings
+
+    assert Settings.model_fields["RESPONSE_CACHE_BACKEND"].default == "none"
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "none")
+    assert build_response_cache().backend is None
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "memory")
+    assert build_response_cache().backend.ttl == settings.RESPONSE_CACHE_TTL
+
+
+def test_list_served_from_cache_until_a_write(client, db_session):
+    hits = LOOKUPS.labels("hit")
+    client.post("/projects", json={"name": "A"})
+    assert len(client.get("/projects").json()) == 1
+
+    # Rows written behind the API's back aren't seen: the response is cached
+    db_session.add(Project(owner_id="user_test", name="Sneaky"))
+    db_session.commit()
+    before = hits.value
+    r = client.get("/projects")
+    assert len(r.json()) == 1
+    assert hits.value == before + 1
+
+    cached = client.get("/projects", headers={"If-None-Match": r.headers["ETag"]})
+    assert cached.status_code == 304
+
+    # A write through the API bumps the owner's generation
+    client.post("/projects", json={"name": "B"})
+    assert [p["name"] for p in client.get("/projects").json()] == ["A", "Sneaky", "B"]
+
+
+def test_task_list_invalidated_per_project(client):
+    first = client.post("/projects", json={"name": "One"}).json()
+    second = client.post("/projects", json={"name": "Two"}).json()
+    client.post(f"/projects/{first['id']}/tasks", json={"title": "t1"})
+
+    hits = LOOKUPS.labels("hit")
+    client.get(f"/projects/{first['id']}/tasks")
+    client.get(f"/projects/{second['id']}/tasks")
+
+    # Writing to the second project leaves the first one's entry valid
+    client.post(f"/projects/{second['id']}/tasks", json={"title": "t2"})
+    before = hits.value
+    assert len(client.get(f"/projects/{first['id']}/tasks").json()) == 1
+    assert len(client.get(f"/projects/{second['id']}/tasks").json()) == 1
+    assert hits.value == before + 1
+
+    client.delete(f"/projects/{first['id']}")
+    assert client.get(f"/projects/{first['id']}/tasks").status_code == 404
+
+
+def test_shared_backend_stand_in(client):
+    redis = FakeRedis()
+    set_response_cache(ResponseCache(RedisBackend(redis, ttl=60)))
+
+    client.post("/projects", json={"name": "A"})
+    first = client.get("/projects?limit=10")
+    second = client.get("/projects?limit=10")
+    assert first.json() == second.json()
+    assert first.json()["items"][0]["name"] == "A"
+    assert any(key.startswith("rc:gen:owner:") for key in redis.data)
+
+    client.put(f"/projects/{first.json()['items'][0]['id']}", json={"name": "B"})
+    assert client.get("/projects?limit=10").json()["items"][0]["name"] == "B"
+
+
+def test_backend_errors_bypass_the_cache(client):
+    set_response_cache(ResponseCache(BrokenBackend()))
+    assert client.post("/projects", json={"name": "A"}).status_code == 201
+    r = client.get("/projects")
+    assert r.status_code == 200
+    assert r.json()[0]["name"] == "A"
+
+
+def test_cache_metrics_exposed(client):
+    client.get("/projects")
+    text = client.get("/metrics").text
+    assert 'response_cache_lookups_total{result="miss"}' in text
+    assert "response_cache_evictions_total" in text
+    assert "response_cache_bytes" in text
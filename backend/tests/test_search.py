@@ -0,0 +1,109 @@
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.search import prefix_tsquery, search_statement
+from app.models.project import Project
+from app.models.task import Task
+
+
+def create_project(client, name="Demo", description=None):
+    r = client.post("/projects", json={"name": name, "description": description})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def create_task(client, project_id, title):
+    r = client.post(f"/projects/{project_id}/tasks", json={"title": title})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def search(client, q, **params):
+    r = client.get("/search", params={"q": q, **params})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_search_ranks_projects_and_tasks_by_prefix(client, db_session):
+    other = Project(owner_id="someone_else", name="Login secrets")
+    db_session.add(other)
+    db_session.flush()
+    db_session.add(Task(project_id=other.id, owner_id="someone_else", title="Login hidden"))
+    db_session.commit()
+
+    p = create_project(client, "Login revamp", "Rework the auth flow")
+    logout = create_task(client, p["id"], "Fix logout bug")
+    create_task(client, p["id"], "Unrelated chore")
+
+    body = search(client, "log")
+    # Owner-scoped; the project name outranks a task title
+    assert [(hit["type"], hit["id"]) for hit in body["items"]] == [("project", p["id"]), ("task", logout["id"])]
+    task_hit = body["items"][1]
+    assert task_hit["project_id"] == p["id"]
+    assert task_hit["title"] == "Fix logout bug"
+    assert task_hit["snippet"] == "Fix <mark>logout</mark> bug"
+    assert body["next_cursor"] is None
+
+
+def test_search_needs_every_word_and_sees_updates(client):
+    p = create_project(client)
+    t = create_task(client, p["id"], "Write release notes")
+    create_task(client, p["id"], "Write tests")
+
+    assert [hit["id"] for hit in search(client, "writ rel")["items"]] == [t["id"]]
+
+    client.patch(f"/tasks/{t['id']}", json={"title": "Draft changelog"})
+    assert search(client, "release")["items"] == []
+    assert [hit["id"] for hit in search(client, "changelog")["items"]] == [t["id"]]
+
+
+def test_search_matches_project_descriptions_and_escapes_snippets(client):
+    p = create_project(client, "Website", 'Move "analytics" & <i>fonts</i> to the CDN')
+
+    (hit,) = search(client, "analytics")["items"]
+    assert hit["id"] == p["id"]
+    assert "<i>" not in hit["snippet"]
+    assert "&amp;" in hit["snippet"]
+    assert "<mark>analytics</mark>" in hit["snippet"]
+
+
+def test_search_keyset_pagination_walks_all_hits_once(client):
+    p = create_project(client, "Deploy")
+    for i in range(7):
+        create_task(client, p["id"], f"Deploy step {i}" + " deploy" * (i % 3))
+
+    seen, after = [], None
+    while True:
+        body = search(client, "deploy", limit=3, **({"after": after} if after else {}))
+        assert len(body["items"]) <= 3
+        seen += [(hit["type"], hit["id"]) for hit in body["items"]]
+        after = body["next_cursor"]
+        if after is None:
+            break
+
+    full = [(hit["type"], hit["id"]) for hit in search(client, "deploy")["items"]]
+    assert seen == full
+    assert len(full) == 8
+
+
+def test_search_without_words_is_empty(client):
+    create_project(client, "Anything")
+    assert search(client, "!!! ??")["items"] == []
+
+
+def test_search_validation(client):
+    assert client.get("/search").status_code == 422
+    assert client.get("/search", params={"q": "x", "after": "bogus"}).status_code == 400
+    assert client.get("/search", params={"q": "x", "after": "eyJpZCI6MX0"}).status_code == 400
+
+
+def test_prefix_tsquery():
+    assert prefix_tsquery("Fix  LOGIN-page_v2") == "fix:* & login:* & page:* & v2:*"
+    assert prefix_tsquery("'; drop table") == "drop:* & table:*"
+    assert prefix_tsquery("--") is None
+
+
+def test_trigram_matching_when_pg_trgm_is_installed():
+    stmt = search_statement("u", "logni", "logni:*", trigrams=True, page_size=10, after=None)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "<%" in sql
+    assert "word_similarity" in sql
@@ -0,0 +1,77 @@
+import logging
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.jwks import JWKSKeyStore, file_fetcher, set_key_store
+from app.core.settings import settings
+from app.db import sessions
+from app.db.sessions import Database
+from app.main import create_app
+
+
+@pytest.fixture()
+def fresh_database(monkeypatch):
+    database = Database(settings.DATABASE_URL)
+    monkeypatch.setattr(sessions, "_database", database)
+    yield database
+    database.engine.dispose()
+
+
+def test_importing_the_app_does_not_build_engines():
+    script = (
+        "import app.main, app.db.sessions as s\n"
+        "assert s._database is None\n"
+        "assert app.main.app.title\n"
+        "assert s._database is None\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_importing_the_app_defers_settings_and_routers():
+    script = (
+        "import sys, app.main\n"
+        "loaded = {'app.core.settings', 'app.api.v1.tasks', 'app.api.v1.exports', 'jose', 'sqlalchemy'}\n"
+        "assert not loaded & set(sys.modules), loaded & set(sys.modules)\n"
+        "app.main.create_app()\n"
+        "assert 'app.core.settings' in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_startup_fills_the_pools_before_serving(db_mode, fresh_database, monkeypatch):
+    monkeypatch.setattr(settings, "DB_PREWARM_CONNECTIONS", 2)
+    with TestClient(create_app(db_mode=db_mode)):
+        assert fresh_database.engine.pool.checkedin() == 2
+        assert fresh_database.engine.pool.checkedout() == 0
+        # The async pool is only used by async mode's CRUD routes
+        async_pool = fresh_database.async_engine.pool
+        assert async_pool.checkedin() == (2 if db_mode == "async" else 0)
+
+
+def test_startup_fetches_the_signing_keys(monkeypatch):
+    calls = []
+    fetch = file_fetcher(settings.CLERK_JWKS_URL.removeprefix("file://"))
+    set_key_store(JWKSKeyStore(lambda: calls.append(1) or fetch()))
+    try:
+        with TestClient(create_app()):
+            assert calls == [1]
+        monkeypatch.setattr(settings, "JWKS_PREWARM", False)
+        with TestClient(create_app()):
+            assert calls == [1]
+    finally:
+        set_key_store(None)
+
+
+def test_startup_survives_an_unreachable_database(monkeypatch, caplog):
+    database = Database("postgresql+psycopg://postgres@127.0.0.1:1/unreachable")
+    monkeypatch.setattr(sessions, "_database", database)
+    monkeypatch.setattr(settings, "DB_PREWARM_CONNECTIONS", 1)
+    with caplog.at_level(logging.WARNING, logger="app.main"):
+        with TestClient(create_app()) as c:
+            assert c.get("/health").json() == {"status": "ok"}
+    assert "Could not prewarm database connections" in caplog.text
@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import insert
+
+from app.api.v1.projects import delete_project_statement
+from app.models.project import Project
+from app.models.task import Task
+
+# Sync cursors are transaction snapshots, so the writes must commit
+pytestmark = pytest.mark.commits
+
+
+def create_project(client, name="Demo"):
+    r = client.post("/projects", json={"name": name})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def create_task(client, project_id, **fields):
+    r = client.post(f"/projects/{project_id}/tasks", json={"title": "t", **fields})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def sync(client, since=None):
+    r = client.get("/sync", params={"since": since} if since else None)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_full_sync_returns_everything_owned(client, db_session):
+    other = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(other)
+    db_session.commit()
+    p = create_project(client)
+    t = create_task(client, p["id"], deadline="2030-01-02T03:04:05Z")
+
+    body = sync(client)
+    # Same representation as the list endpoints
+    assert body["projects"] == client.get("/projects").json()
+    assert body["tasks"] == [t]
+    assert body["deleted"] == {"projects": [], "tasks": []}
+    assert body["cursor"]
+
+
+def test_delta_sync_returns_only_changes_and_tombstones(client):
+    p = create_project(client)
+    create_project(client, "Untouched")
+    other = create_project(client, "Other")
+    kept = create_task(client, p["id"], title="kept")
+    doomed = create_task(client, p["id"], title="doomed")
+    cursor = sync(client)["cursor"]
+
+    assert sync(client, cursor)["projects"] == []
+
+    client.put(f"/projects/{p['id']}", json={"name": "Renamed"})
+    added = create_task(client, other["id"], title="added")
+    client.delete(f"/tasks/{doomed['id']}")
+
+    delta = sync(client, cursor)
+    # A task write changes its project's counters, so that project comes too
+    assert [(project["name"], project["task_count"]) for project in delta["projects"]] == [
+        ("Renamed", 1),
+        ("Other", 1),
+    ]
+    assert [task["id"] for task in delta["tasks"]] == [added["id"]]
+    assert delta["deleted"] == {"projects": [], "tasks": [doomed["id"]]}
+    assert kept["id"] not in [task["id"] for task in delta["tasks"]]
+
+    # Next round starts after all of that
+    again = sync(client, delta["cursor"])
+    assert (again["projects"], again["tasks"], again["deleted"]) == ([], [], {"projects": [], "tasks": []})
+
+
+def test_deleted_project_is_one_tombstone(client):
+    p = create_project(client)
+    create_task(client, p["id"])
+    cursor = sync(client)["cursor"]
+
+    client.delete(f"/projects/{p['id']}")
+    assert sync(client, cursor)["deleted"] == {"projects": [p["id"]], "tasks": []}
+
+
+def test_batch_and_import_writes_are_synced(client):
+    p = create_project(client)
+    t = create_task(client, p["id"])
+    cursor = sync(client)["cursor"]
+
+    client.patch("/tasks:batch", json={"items": [{"id": t["id"], "status": "done"}]})
+    client.post("/import/tasks", content=b'{"title": "imported"}', params={"project_id": p["id"]})
+
+    tasks = sync(client, cursor)["tasks"]
+    assert [(task["title"], task["status"]) for task in tasks] == [("t", "done"), ("imported", "not_started")]
+
+
+def test_write_committing_after_sync_is_not_skipped(client, db_session):
+    p = create_project(client)
+    cursor = sync(client)["cursor"]
+
+    # A writer that started before the next sync and commits after it
+    with db_session.get_bind().connect() as writer:
+        writer.execute(insert(Task).values(project_id=p["id"], owner_id="user_test", title="slow"))
+        middle = sync(client, cursor)
+        assert middle["tasks"] == []
+        writer.commit()
+
+    assert [task["title"] for task in sync(client, middle["cursor"])["tasks"]] == ["slow"]
+
+
+def test_tombstones_are_owner_scoped(client, db_session):
+    cursor = sync(client)["cursor"]
+    other = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(other)
+    db_session.commit()
+    db_session.execute(delete_project_statement(other.id, "someone_else"))
+    db_session.commit()
+
+    assert sync(client, cursor)["deleted"] == {"projects": [], "tasks": []}
+
+
+def test_invalid_cursor(client):
+    assert client.get("/sync", params={"since": "nope"}).status_code == 400
+    assert client.get("/sync", params={"since": "eyJ4IjoiYSJ9"}).status_code == 400
@@ -1,3 +1,6 @@
+import pytest
+
+
 def create_project(client, name="Demo"):
     r = client.post("/projects", json={"name": name, "description": "x"})
     assert r.status_code == 201, r.text
@@ -60,3 +63,431 @@ def test_create_task_invalid_enum_returns_422(client):
         json={"title": "Bad", "status": "In Progress", "priority": "medium"},
     )
     assert r.status_code == 422, r.text
+
+
+def create_task(client, project_id, **fields):
+    r = client.post(f"/projects/{project_id}/tasks", json={"title": "T", **fields})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def collect_pages(client, url, params):
+    # Follow next_cursor until the listing is exhausted
+    items, after = [], None
+    while True:
+        r = client.get(url, params={**params, **({"after": after} if after else {})})
+        assert r.status_code == 200, r.text
+        page = r.json()
+        items.extend(page["items"])
+        after = page["next_cursor"]
+        if not after:
+            return items
+
+
+def test_unpaginated_project_tasks_are_capped(client, monkeypatch):
+    from app.core.settings import settings
+
+    monkeypatch.setattr(settings, "MAX_PAGE_SIZE", 2)
+    p = create_project(client)
+    ids = [create_task(client, p["id"])["id"] for _ in range(2)]
+    assert [t["id"] for t in client.get(f"/projects/{p['id']}/tasks").json()] == ids
+
+    create_task(client, p["id"])
+    assert client.get(f"/projects/{p['id']}/tasks").status_code == 400
+    assert len(client.get(f"/projects/{p['id']}/tasks", params={"limit": 2}).json()["items"]) == 2
+
+
+def test_list_all_tasks_across_projects(client):
+    p1 = create_project(client, name="P1")
+    p2 = create_project(client, name="P2")
+    create_task(client, p1["id"], title="A")
+    create_task(client, p2["id"], title="B")
+
+    r = client.get("/tasks", params={"include_total": True})
+    assert r.status_code == 200, r.text
+    page = r.json()
+    assert [t["title"] for t in page["items"]] == ["A", "B"]
+    assert page["total"] == 2
+    assert page["next_cursor"] is None
+
+
+def test_list_all_tasks_filters(client):
+    p1 = create_project(client, name="P1")
+    p2 = create_project(client, name="P2")
+    create_task(client, p1["id"], title="done-high", status="done", priority="high")
+    create_task(client, p1["id"], title="open-low", priority="low", deadline="2030-01-05T00:00:00Z")
+    create_task(client, p2["id"], title="other", priority="high")
+
+    r = client.get("/tasks", params={"status": "done"})
+    assert [t["title"] for t in r.json()["items"]] == ["done-high"]
+
+    r = client.get("/tasks", params=[("priority", "high"), ("project_id", p2["id"])])
+    assert [t["title"] for t in r.json()["items"]] == ["other"]
+
+    r = client.get("/tasks", params={"deadline_from": "2030-01-01T00:00:00Z", "deadline_to": "2030-02-01T00:00:00Z"})
+    assert [t["title"] for t in r.json()["items"]] == ["open-low"]
+
+
+def test_list_all_tasks_keyset_pages(client):
+    p = create_project(client)
+    for i in range(7):
+        create_task(client, p["id"], title=f"T{i}")
+
+    r = client.get("/tasks", params={"limit": 3})
+    page = r.json()
+    assert page["page_size"] == 3
+    assert len(page["items"]) == 3
+    assert page["next_cursor"]
+
+    items = collect_pages(client, "/tasks", {"limit": 3})
+    assert [t["title"] for t in items] == [f"T{i}" for i in range(7)]
+
+
+def test_list_all_tasks_sort_by_deadline_nulls_last(client):
+    p = create_project(client)
+    create_task(client, p["id"], title="none-1")
+    create_task(client, p["id"], title="late", deadline="2031-01-01T00:00:00Z")
+    create_task(client, p["id"], title="early", deadline="2030-01-01T00:00:00Z")
+    create_task(client, p["id"], title="none-2")
+
+    items = collect_pages(client, "/tasks", {"sort": "deadline", "limit": 1})
+    assert [t["title"] for t in items] == ["early", "late", "none-1", "none-2"]
+
+    items = collect_pages(client, "/tasks", {"sort": "deadline", "order": "desc", "limit": 1})
+    assert [t["title"] for t in items] == ["late", "early", "none-2", "none-1"]
+
+
+def test_list_all_tasks_sort_by_priority(client):
+    p = create_project(client)
+    for priority in ["urgent", "low", "high", "medium"]:
+        create_task(client, p["id"], title=priority, priority=priority)
+
+    items = collect_pages(client, "/tasks", {"sort": "priority", "limit": 2})
+    assert [t["title"] for t in items] == ["low", "medium", "high", "urgent"]
+
+
+def test_list_all_tasks_rejects_bad_cursor(client):
+    r = client.get("/tasks", params={"after": "not-a-cursor"})
+    assert r.status_code == 400
+
+    p = create_project(client)
+    create_task(client, p["id"])
+    create_task(client, p["id"])
+    cursor = client.get("/tasks", params={"limit": 1}).json()["next_cursor"]
+    r = client.get("/tasks", params={"after": cursor, "sort": "deadline"})
+    assert r.status_code == 400
+
+
+def test_list_tasks_by_project_paginated(client):
+    p = create_project(client)
+    other = create_project(client, name="Other")
+    for i in range(5):
+        create_task(client, p["id"], title=f"T{i}")
+    create_task(client, other["id"], title="elsewhere")
+
+    r = client.get(f"/projects/{p['id']}/tasks", params={"limit": 2, "include_total": True})
+    assert r.status_code == 200, r.text
+    page = r.json()
+    assert page["total"] == 5
+    assert len(page["items"]) == 2
+
+    items = collect_pages(client, f"/projects/{p['id']}/tasks", {"limit": 2})
+    assert [t["title"] for t in items] == [f"T{i}" for i in range(5)]
+
+
+def test_list_tasks_page_size_is_capped(client):
+    from app.core.settings import settings
+
+    p = create_project(client)
+    r = client.get(f"/projects/{p['id']}/tasks", params={"limit": settings.MAX_PAGE_SIZE + 1000})
+    assert r.status_code == 200, r.text
+    assert r.json()["page_size"] == settings.MAX_PAGE_SIZE
+
+
+# ---------- Batch endpoints ----------
+
+def test_batch_create_tasks_with_partial_failure(client):
+    p = create_project(client)
+    r = client.post(
+        f"/projects/{p['id']}/tasks:batch",
+        json={"items": [
+            {"title": "one"},
+            {"title": ""},
+            {"title": "three", "status": "done", "priority": "urgent"},
+            {"title": "bad", "status": "In Progress"},
+        ]},
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 2
+    assert [res["status"] for res in data["results"]] == [201, 422, 201, 422]
+    assert data["results"][0]["task"]["title"] == "one"
+    assert data["results"][2]["task"]["status"] == "done"
+
+    titles = [t["title"] for t in client.get(f"/projects/{p['id']}/tasks").json()]
+    assert titles == ["one", "three"]
+
+
+def test_batch_create_tasks_project_not_found(client):
+    r = client.post("/projects/999999/tasks:batch", json={"items": [{"title": "x"}]})
+    assert r.status_code == 404
+
+
+def test_batch_create_tasks_too_large(client):
+    from app.core.settings import settings
+
+    p = create_project(client)
+    items = [{"title": "x"}] * (settings.MAX_BATCH_SIZE + 1)
+    r = client.post(f"/projects/{p['id']}/tasks:batch", json={"items": items})
+    assert r.status_code == 413
+
+
+def test_batch_update_tasks(client, db_session):
+    from app.models.project import Project
+    from app.models.task import Task
+
+    p = create_project(client)
+    ids = [create_task(client, p["id"], title=f"T{i}")["id"] for i in range(3)]
+
+    other = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(other)
+    db_session.flush()
+    foreign = Task(project_id=other.id, owner_id="someone_else", title="Hidden")
+    db_session.add(foreign)
+    db_session.commit()
+
+    r = client.patch("/tasks:batch", json={"items": [
+        {"id": ids[0], "status": "done"},
+        {"id": ids[1], "status": "done"},
+        {"id": ids[2], "title": "renamed", "priority": "high"},
+        {"id": foreign.id, "status": "done"},
+        {"id": ids[0], "status": "in_progress"},
+        {"id": ids[1], "status": "nope"},
+    ]})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert [res["status"] for res in data["results"]] == [200, 200, 200, 404, 409, 422]
+    assert data["succeeded"] == 3
+
+    by_id = {t["id"]: t for t in client.get(f"/projects/{p['id']}/tasks").json()}
+    assert by_id[ids[0]]["status"] == "done"
+    assert by_id[ids[1]]["status"] == "done"
+    assert by_id[ids[2]]["title"] == "renamed"
+    assert by_id[ids[2]]["status"] == "not_started"
+
+    db_session.refresh(foreign)
+    assert foreign.status == "not_started"
+
+
+def test_writes_cannot_touch_other_owners_rows(client, db_session):
+    from app.models.project import Project
+    from app.models.task import Task
+
+    other = Project(owner_id="someone_else", name="Theirs")
+    db_session.add(other)
+    db_session.flush()
+    foreign = Task(project_id=other.id, owner_id="someone_else", title="Hidden")
+    db_session.add(foreign)
+    db_session.commit()
+
+    assert client.post(f"/projects/{other.id}/tasks", json={"title": "x"}).status_code == 404
+    assert client.patch(f"/tasks/{foreign.id}", json={"status": "done"}).status_code == 404
+    assert client.delete(f"/tasks/{foreign.id}").status_code == 404
+    assert client.put(f"/projects/{other.id}", json={"name": "mine"}).status_code == 404
+    assert client.delete(f"/projects/{other.id}").status_code == 404
+
+    db_session.refresh(foreign)
+    assert foreign.status == "not_started"
+
+
+def test_patch_with_empty_body_returns_task(client):
+    p = create_project(client)
+    task = create_task(client, p["id"], title="same")
+    r = client.patch(f"/tasks/{task['id']}", json={})
+    assert r.status_code == 200, r.text
+    assert r.json()["title"] == "same"
+
+
+# updated_at is now(), which only moves between committed transactions
+@pytest.mark.commits
+def test_task_lists_conditional_get(client):
+    p = create_project(client)
+    task = create_task(client, p["id"], title="one")
+
+    for url in (f"/projects/{p['id']}/tasks", "/tasks"):
+        etag = client.get(url).headers["ETag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+    etag = client.get(f"/projects/{p['id']}/tasks").headers["ETag"]
+    client.patch(f"/tasks/{task['id']}", json={"status": "done"})
+    r = client.get(f"/projects/{p['id']}/tasks", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()[0]["status"] == "done"
+
+    assert client.get("/projects/999999/tasks", headers={"If-None-Match": "*"}).status_code == 404
+
+
+@pytest.mark.commits
+def test_task_list_etag_sees_a_late_commit_from_an_early_transaction(client):
+    import psycopg
+
+    from app.core.change_feed import listen_conninfo
+    from app.core.response_cache import get_response_cache, project_scope
+    from app.core.settings import settings
+
+    p = create_project(client)
+    early, later = (create_task(client, p["id"], title=t) for t in ("early", "later"))
+    url = f"/projects/{p['id']}/tasks"
+
+    with psycopg.connect(listen_conninfo(settings.DATABASE_URL)) as conn:
+        # Starts first, so its now() is older than the next write's
+        conn.execute("SELECT now()")
+        client.patch(f"/tasks/{later['id']}", json={"title": "later v2"})
+        conn.execute(
+            "UPDATE tasks SET title = 'early v2', updated_at = now(),"
+            " change_xid = pg_current_xact_id()::text::bigint WHERE id = %s",
+            (early["id"],),
+        )
+        etag = client.get(url).headers["ETag"]
+        conn.commit()
+    # As the app's own write paths do; the ETag is then recomputed
+    get_response_cache().bump(project_scope(p["id"]))
+
+    # Count, max id and max updated_at are all unchanged; change_xid isn't
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert {t["title"] for t in r.json()} == {"early v2", "later v2"}
+
+
+# updated_at is now(), which only moves between committed transactions
+@pytest.mark.commits
+def test_patch_task_if_match(client):
+    p = create_project(client)
+    task = create_task(client, p["id"], title="v1")
+    etag = client.get(f"/tasks/{task['id']}").headers["ETag"]
+    assert client.get(f"/tasks/{task['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    r = client.patch(f"/tasks/{task['id']}", json={"title": "v2"}, headers={"If-Match": etag})
+    assert r.status_code == 200, r.text
+
+    r = client.patch(f"/tasks/{task['id']}", json={"title": "v3"}, headers={"If-Match": etag})
+    assert r.status_code == 412
+    r = client.patch(f"/tasks/{task['id']}", json={"title": "v3"}, headers={"If-Match": "*"})
+    assert r.status_code == 200
+    assert r.json()["title"] == "v3"
+
+
+def test_list_bytes_match_model_serialization(client, db_session):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+
+    from app.models.task import Task
+    from app.schemas.task import TaskRead
+
+    p = create_project(client)
+    create_task(client, p["id"], title='Ünïcode "quoted" <tag>', deadline="2030-05-01T10:30:00.250+02:00")
+    create_task(client, p["id"], title="plain", status="done", priority="urgent")
+
+    tasks = db_session.scalars(select(Task).order_by(Task.id)).all()
+    models = [TaskRead.model_validate(t) for t in tasks]
+    expected = JSONResponse(jsonable_encoder(models)).body
+
+    assert client.get(f"/projects/{p['id']}/tasks").content == expected
+
+    page = client.get("/tasks?limit=1").json()
+    expected_page = jsonable_encoder({
+        "items": models[:1],
+        "page_size": 1,
+        "total": None,
+        "next_cursor": page["next_cursor"],
+    })
+    assert client.get("/tasks?limit=1").content == JSONResponse(expected_page).body
+
+
+def due_in(days: float) -> str:
+    from datetime import datetime, timedelta, timezone
+    return (datetime.now(timezone.utc) + timedelta(days=days)).isoformat()
+
+
+def test_upcoming_and_overdue_buckets(client):
+    p = create_project(client)
+    soon = create_task(client, p["id"], title="soon", deadline=due_in(3))
+    later = create_task(client, p["id"], title="later", deadline=due_in(30))
+    recent = create_task(client, p["id"], title="recent", deadline=due_in(-3))
+    old = create_task(client, p["id"], title="old", deadline=due_in(-30))
+    create_task(client, p["id"], title="done", status="done", deadline=due_in(3))
+    create_task(client, p["id"], title="undated")
+
+    r = client.get("/tasks/upcoming")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [(t["id"], t["bucket"]) for t in body["items"]] == [
+        (soon["id"], "this_week"),
+        (later["id"], "later"),
+    ]
+    assert body["counts"] == {"today": 0, "this_week": 1, "later": 1}
+
+    # Most recently missed first
+    body = client.get("/tasks/overdue").json()
+    assert [(t["id"], t["bucket"]) for t in body["items"]] == [
+        (recent["id"], "this_week"),
+        (old["id"], "earlier"),
+    ]
+    assert body["counts"] == {"earlier": 1, "this_week": 1, "today": 0}
+
+    # Counts still cover every bucket when the items are filtered to one
+    body = client.get("/tasks/overdue?bucket=earlier").json()
+    assert [t["id"] for t in body["items"]] == [old["id"]]
+    assert body["counts"] == {"earlier": 1, "this_week": 1, "today": 0}
+
+
+def test_due_lists_paginate(client):
+    p = create_project(client)
+    ids = [create_task(client, p["id"], deadline=due_in(d))["id"] for d in (2, 4, 30, 60)]
+
+    first = client.get("/tasks/upcoming?limit=3").json()
+    assert [t["id"] for t in first["items"]] == ids[:3]
+    assert first["counts"] == {"today": 0, "this_week": 2, "later": 2}
+
+    second = client.get(f"/tasks/upcoming?limit=3&after={first['next_cursor']}").json()
+    assert [t["id"] for t in second["items"]] == ids[3:]
+    assert second["next_cursor"] is None
+    assert second["counts"] is None
+
+    r = client.get(f"/tasks/overdue?after={first['next_cursor']}")
+    assert r.status_code == 400
+
+
+def test_due_lists_reject_bad_parameters(client):
+    r = client.get("/tasks/upcoming?bucket=earlier")
+    assert r.status_code == 400
+    assert "today, this_week, later" in r.json()["detail"]
+    r = client.get("/tasks/overdue?tz=Mars/Olympus_Mons")
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Unknown time zone"
+
+
+def test_due_windows_start_days_in_the_given_time_zone():
+    from datetime import datetime, timezone
+    from zoneinfo import ZoneInfo
+
+    from app.api.v1.tasks import due_windows
+    from app.schemas.task import DueBucket
+
+    tz = ZoneInfo("America/New_York")
+    # 01:30 UTC on the 10th is still the evening of the 9th in New York
+    now = datetime(2026, 3, 10, 1, 30, tzinfo=timezone.utc)
+    today, week, later = due_windows(False, tz, now)
+    assert today.bucket == DueBucket.today
+    assert today.end == datetime(2026, 3, 10, tzinfo=tz)
+    assert week.end == datetime(2026, 3, 16, tzinfo=tz)
+    assert later.end is None
+
+    earlier, week, today = due_windows(True, tz, now)
+    assert earlier.start is None
+    assert earlier.end == datetime(2026, 3, 3, tzinfo=tz)
+    assert today.start == datetime(2026, 3, 9, tzinfo=tz)
+    assert today.end == now
@@ -36,12 +36,80 @@ async function request(path, { method = "GET", body, headers = {}, getToken } =
   return res.json()
 }
 
+// Server-Sent Events over fetch, so the Authorization header can be sent
+// (EventSource can't). Reconnects after `retryMs`; a reconnect is reported
+// as "resync" since events may have been missed in between.
+function subscribe(path, { getToken, onEvent, retryMs = 3000 } = {}) {
+  const controller = new AbortController()
+  let connected = false
+  // The server ends the stream with `reauth` when the token it was opened
+  // with expires (or the signing keys rotate): reconnect at once, fresh token
+  let reauth = false
+
+  const parseBlock = (block) => {
+    if (!block || block.startsWith(":")) return // heartbeat
+    let event = "message"
+    let data = ""
+    for (const line of block.split("\n")) {
+      if (line.startsWith("event: ")) event = line.slice(7)
+      else if (line.startsWith("data: ")) data += line.slice(6)
+    }
+    if (event === "ready") {
+      if (connected) onEvent("resync", {})
+      connected = true
+      return
+    }
+    if (event === "reauth") {
+      reauth = true
+      return
+    }
+    onEvent(event, data ? JSON.parse(data) : {})
+  }
+
+  const run = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const token = getToken ? await getToken(reauth ? { skipCache: true } : undefined) : null
+        reauth = false
+        const res = await fetch(`${API_BASE_URL}${path}`, {
+          headers: {
+            Accept: "text/event-stream",
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
+          },
+          signal: controller.signal,
+        })
+        if (!res.ok || !res.body) throw new Error(`Stream failed: ${res.status}`)
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+        let buffer = ""
+        for (;;) {
+          const { value, done } = await reader.read()
+          if (done) break
+          buffer += value
+          let end
+          while ((end = buffer.indexOf("\n\n")) !== -1) {
+            parseBlock(buffer.slice(0, end))
+            buffer = buffer.slice(end + 2)
+          }
+        }
+        if (reauth) continue
+      } catch {
+        if (controller.signal.aborted) return
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs))
+    }
+  }
+
+  run()
+  return () => controller.abort()
+}
+
 export const apiClient = {
   get: (path, opts) => request(path, { ...opts, method: "GET" }),
   post: (path, body, opts) => request(path, { ...opts, method: "POST", body }),
   patch: (path, body, opts) => request(path, { ...opts, method: "PATCH", body }),
   put: (path, body, opts) => request(path, { ...opts, method: "PUT", body }),
   delete: (path, opts) => request(path, { ...opts, method: "DELETE" }),
+  subscribe,
   baseUrl: API_BASE_URL,
 }
 
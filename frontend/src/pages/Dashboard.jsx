@@ -1,66 +1,34 @@
-import React, { useEffect, useMemo, useState } from "react"
+import React, { useEffect, useState } from "react"
 import { useAuth } from "@clerk/clerk-react"
 import StatCard from "../components/ui/StatCard"
 import { api } from "../services/api"
 
 function Dashboard() {
   const { getToken } = useAuth()
-  const [projects, setProjects] = useState([])
-  const [tasks, setTasks] = useState([])
+  const [stats, setStats] = useState([])
+  const [recentTasks, setRecentTasks] = useState([])
+  const [recentProjects, setRecentProjects] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
+  // Bumped by pushed change events to reload
+  const [version, setVersion] = useState(0)
 
-  const stats = useMemo(() => {
-    const totalProjects = projects.length
-    const totalTasks = tasks.length
-    const completed = tasks.filter((t) => t.status === "completed" || t.status === "done").length
-    const inProgress = tasks.filter((t) => t.status === "in_progress").length
-    return [
-      {
-        title: "Total Projects",
-        value: totalProjects.toString(),
-        hint: "Live from your workspace",
-        icon: "PR",
-        accent: "indigo",
-      },
-      {
-        title: "Total Tasks",
-        value: totalTasks.toString(),
-        hint: `${inProgress} in progress`,
-        icon: "TS",
-        accent: "amber",
-      },
-      {
-        title: "Completed Tasks",
-        value: completed.toString(),
-        hint: `${totalTasks ? Math.round((completed / Math.max(totalTasks, 1)) * 100) : 0}% complete`,
-        icon: "OK",
-        accent: "emerald",
-      },
-    ]
-  }, [projects, tasks])
+  useEffect(() => api.subscribeReload(getToken, () => true, () => setVersion((v) => v + 1)), [getToken])
 
   useEffect(() => {
     const load = async () => {
       setLoading(true)
       setError(null)
       try {
-        const proj = await api.getProjects(getToken)
-        setProjects(proj || [])
-        if (proj?.length) {
-          const taskLists = await Promise.all(
-            proj.map(async (p) => {
-              try {
-                return await api.getTasks(p.id, getToken)
-              } catch {
-                return []
-              }
-            })
-          )
-          setTasks(taskLists.flat())
-        } else {
-          setTasks([])
-        }
+        // A fixed two requests, however many projects there are: the
+        // rollup brings the five latest projects along
+        const [dashboard, recent] = await Promise.all([
+          api.getDashboard(getToken),
+          api.getRecentTasks(5, getToken),
+        ])
+        setStats(dashboard.stats)
+        setRecentTasks(recent)
+        setRecentProjects(dashboard.recentProjects)
       } catch (err) {
         setError("Unable to load workspace data.")
       } finally {
@@ -68,23 +36,7 @@ function Dashboard() {
       }
     }
     load()
-  }, [getToken])
-
-  const recentTasks = useMemo(
-    () =>
-      [...tasks]
-        .sort((a, b) => new Date(b.updated_at || b.created_at) - new Date(a.updated_at || a.created_at))
-        .slice(0, 5),
-    [tasks]
-  )
-
-  const recentProjects = useMemo(
-    () =>
-      [...projects]
-        .sort((a, b) => new Date(b.updated_at || b.created_at) - new Date(a.updated_at || a.created_at))
-        .slice(0, 5),
-    [projects]
-  )
+  }, [getToken, version])
 
   return (
     <div className="dashboard page-shell">
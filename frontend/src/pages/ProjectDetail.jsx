@@ -1,4 +1,4 @@
-﻿import React, { useEffect, useMemo, useState } from "react"
+﻿import React, { useEffect, useMemo, useRef, useState } from "react"
 import { DndContext, closestCenter, useDroppable, useDraggable } from "@dnd-kit/core"
 import { useAuth } from "@clerk/clerk-react"
 import { useNavigate, useParams } from "react-router-dom"
@@ -53,17 +53,15 @@ function ProjectDetail() {
     setLoading(true)
     setError(null)
     try {
-      const [proj, taskRes] = await Promise.all([
+      // Every task of the project, page by page: the board needs all of
+      // them, and the unpaginated list is refused past MAX_PAGE_SIZE
+      const [proj, projectTasks] = await Promise.all([
         api.getProject(projectId, getToken),
-        api.listTasksByProject(projectId, { ...filters, page: filters.page }, getToken),
+        api.getTasks(projectId, getToken),
       ])
       setProject(proj)
-      setTasks(taskRes?.items || [])
-      setPagination({
-        page: taskRes?.page || 1,
-        page_size: taskRes?.page_size || filters.page_size,
-        total: taskRes?.total || 0,
-      })
+      setTasks(projectTasks)
+      setPagination({ page: 1, page_size: projectTasks.length || filters.page_size, total: projectTasks.length })
     } catch (err) {
       setError("Unable to load project.")
     } finally {
@@ -75,6 +73,19 @@ function ProjectDetail() {
     loadData()
   }, [projectId, getToken, filters.page, filters.page_size, filters.status, filters.priority, filters.q, filters.sort_by, filters.sort_order])
 
+  // Reload when this project changes elsewhere (another tab, another device)
+  const loadDataRef = useRef(loadData)
+  loadDataRef.current = loadData
+  useEffect(
+    () =>
+      api.subscribeReload(
+        getToken,
+        (data) => data.project_id === Number(projectId),
+        () => loadDataRef.current()
+      ),
+    [projectId, getToken]
+  )
+
   const openNewTask = () => {
     setTaskForm({ title: "", status: statusOptions[0].value, priority: priorityOptions[1].value, deadline: "" })
     setTaskMode("create")
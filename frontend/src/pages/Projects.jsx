@@ -41,8 +41,9 @@ function Projects() {
         const taskEntries = await Promise.all(
           data.map(async (proj) => {
             try {
-              const tasks = await api.getTasks(proj.id, getToken)
-              return [proj.id, tasks || []]
+              // Totals come with the project; only the preview is fetched
+              const res = await api.listTasksByProject(proj.id, { limit: 3 }, getToken)
+              return [proj.id, res.items]
             } catch {
               return [proj.id, []]
             }
@@ -198,7 +199,8 @@ function Projects() {
           <div className="project-grid modern">
             {projects.map((project) => {
               const previewTasks = (tasksByProject[project.id] || []).slice(0, 3)
-              const remaining = Math.max((tasksByProject[project.id] || []).length - 3, 0)
+              const remaining = Math.max((project.task_count || 0) - previewTasks.length, 0)
+              const completion = project.task_count ? Math.round((project.done_count / project.task_count) * 100) : 0
               return (
                 <div
                   key={project.id}
@@ -233,6 +235,11 @@ function Projects() {
                     {previewTasks.length === 0 && <div className="muted">No tasks yet.</div>}
                     {remaining > 0 && <div className="muted">+{remaining} more</div>}
                   </div>
+                  {project.task_count > 0 && (
+                    <div className="muted">
+                      {project.done_count}/{project.task_count} done ({completion}%) · {project.in_progress_count} in progress
+                    </div>
+                  )}
                   <div className="project-actions">
                     <button
                       type="button"
@@ -17,37 +17,44 @@ const buildQuery = (params = {}) => {
   return qs ? `?${qs}` : ""
 }
 
+// Every item of a paginated list, one MAX_PAGE_SIZE page at a time (the
+// unpaginated shape is capped server-side)
+const fetchAllPages = async (path, getToken) => {
+  const all = []
+  let after = null
+  do {
+    const page = await apiClient.get(`${path}${buildQuery({ limit: 200, after })}`, { getToken })
+    all.push(...(page?.items || []))
+    after = page?.next_cursor
+  } while (after)
+  return all
+}
+
 export const api = {
   getDashboard: async (getToken) => {
-    const projects = await apiClient.get("/projects", { getToken })
-    let tasks = []
-    for (const proj of projects) {
-      try {
-        const res = await apiClient.get(`/projects/${proj.id}/tasks`, { getToken })
-        const items = Array.isArray(res) ? res : res?.items || []
-        tasks = tasks.concat(items || [])
-      } catch {}
-    }
-    const completed = tasks.filter((t) => t.status === "done").length
-    const inProgress = tasks.filter((t) => t.status === "in_progress").length
+    const data = await apiClient.get("/dashboard", { getToken })
+    const total = data?.task_count || 0
+    const completed = data?.status_counts?.done || 0
+    const inProgress = data?.status_counts?.in_progress || 0
     return {
       stats: [
-        { title: "Total Projects", value: String(projects.length), hint: "Live data", icon: "PR", accent: "indigo" },
-        { title: "Total Tasks", value: String(tasks.length), hint: `${inProgress} in progress`, icon: "TS", accent: "amber" },
+        { title: "Total Projects", value: String(data?.project_count || 0), hint: "Live data", icon: "PR", accent: "indigo" },
+        { title: "Total Tasks", value: String(total), hint: `${inProgress} in progress`, icon: "TS", accent: "amber" },
         {
           title: "Completed Tasks",
           value: String(completed),
-          hint: `${tasks.length ? Math.round((completed / Math.max(tasks.length, 1)) * 100) : 0}% complete`,
+          hint: `${total ? Math.round((completed / Math.max(total, 1)) * 100) : 0}% complete`,
           icon: "OK",
           accent: "emerald",
         },
       ],
-      upcoming: [],
-      highlights: [],
+      upcoming: data?.upcoming || [],
+      highlights: data?.projects || [],
+      recentProjects: data?.recent_projects || [],
     }
   },
 
-  getProjects: (getToken) => apiClient.get("/projects", { getToken }),
+  getProjects: (getToken) => fetchAllPages("/projects", getToken),
   getProject: (projectId, getToken) => apiClient.get(`/projects/${projectId}`, { getToken }),
   getProjectById: (projectId, getToken) => apiClient.get(`/projects/${projectId}`, { getToken }),
   createProject: (payload, getToken) => apiClient.post("/projects", payload, { getToken }),
@@ -66,25 +73,51 @@ export const api = {
       total: res?.total ?? (res?.items ? res.items.length : 0),
     }
   },
-  getTasks: async (projectId, getToken) => {
-    if (projectId) {
-      const res = await api.listTasksByProject(projectId, {}, getToken)
-      return res.items
-    }
-    const projects = await apiClient.get("/projects", { getToken })
-    const all = []
-    for (const proj of projects) {
-      try {
-        const t = await api.listTasksByProject(proj.id, {}, getToken)
-        all.push(...(t.items || []))
-      } catch {}
-    }
-    return all
+  getTasks: (projectId, getToken) =>
+    fetchAllPages(projectId ? `/projects/${projectId}/tasks` : "/tasks", getToken),
+  // Open tasks by due window; `counts` per bucket comes with the first page
+  getUpcomingTasks: (params = {}, getToken) =>
+    apiClient.get(`/tasks/upcoming${buildQuery(params)}`, { getToken }),
+  getOverdueTasks: (params = {}, getToken) =>
+    apiClient.get(`/tasks/overdue${buildQuery(params)}`, { getToken }),
+  getRecentTasks: async (limit, getToken) => {
+    const page = await apiClient.get(`/tasks${buildQuery({ sort: "updated_at", order: "desc", limit })}`, { getToken })
+    return page?.items || []
   },
   createTask: (projectId, payload, getToken) => apiClient.post(`/projects/${projectId}/tasks`, payload, { getToken }),
   updateTask: (taskId, payload, getToken) => apiClient.patch(`/tasks/${taskId}`, payload, { getToken }),
   deleteTask: (taskId, getToken) => apiClient.delete(`/tasks/${taskId}`, { getToken }),
 
+  search: (q, params = {}, getToken) =>
+    apiClient.get(`/search${buildQuery({ q, ...params })}`, { getToken }),
+
+  // Full snapshot without `since`; then only changes and deleted ids since that cursor
+  sync: (since, getToken) => apiClient.get(`/sync${buildQuery({ since })}`, { getToken }),
+
+  // onEvent("change", {type, action, id, project_id}) or onEvent("resync", {});
+  // returns an unsubscribe function
+  subscribeChanges: (getToken, onEvent) => apiClient.subscribe("/changes", { getToken, onEvent }),
+
+  // Calls `reload` once for a burst of matching changes (or a resync): the
+  // first schedules it `delayMs` later and the rest of the burst joins it,
+  // so a 200-task batch reloads once rather than 200 times
+  subscribeReload: (getToken, matches, reload, delayMs = 250) => {
+    let timer = null
+    const unsubscribe = api.subscribeChanges(getToken, (event, data) => {
+      if (event !== "resync" && !matches(data)) return
+      if (timer === null) {
+        timer = setTimeout(() => {
+          timer = null
+          reload()
+        }, delayMs)
+      }
+    })
+    return () => {
+      clearTimeout(timer)
+      unsubscribe()
+    }
+  },
+
   statusLabels,
 }
 